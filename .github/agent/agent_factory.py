@@ -3,10 +3,22 @@ Agent Factory
 =============
 Loads, registers, and manages agents.
 Discovers generated agents and creates new ones.
+
+Generated agents are discovered without importing them: a manifest
+(agent_manifest.json) keeps each file's size, mtime and sha256 plus the
+agent class and name found by parsing the source. Unchanged files are
+taken from the manifest as-is, changed ones are re-parsed (never
+imported), and each agent is registered as a LazyAgent that imports its
+module on first use. Startup cost no longer grows with the number of
+spawned agents.
 """
 
+import ast
+import hashlib
+import json
 import os
 import sys
+import threading
 import importlib
 import importlib.util
 from typing import Dict, List, Optional, Any
@@ -15,11 +27,15 @@ import yaml
 
 from agents.base_agent import BaseAgent, TaskAgent, OrchestratorAgent
 
-
 # Paths
 AGENT_DIR = Path(__file__).parent
 CONFIG_PATH = AGENT_DIR / "config" / "agents.yaml"
 GENERATED_DIR = AGENT_DIR / "agents" / "generated"
+MANIFEST_PATH = Path(
+    os.environ.get("AGENT_MANIFEST", str(AGENT_DIR / "cache" / "agent_manifest.json"))
+)
+
+AGENT_BASE_NAMES = {"BaseAgent", "TaskAgent", "OrchestratorAgent"}
 
 
 def load_config() -> Dict[str, Any]:
@@ -54,6 +70,183 @@ def get_auto_spawn_config() -> Dict[str, Any]:
     )
 
 
+# ============================================
+# GENERATED AGENT MANIFEST
+# ============================================
+
+
+def file_sha256(file_path: Path) -> str:
+    return hashlib.sha256(file_path.read_bytes()).hexdigest()
+
+
+def _string_arg(call: ast.Call, keyword: str, position: int) -> Optional[str]:
+    """Literal string passed to call as keyword or positional argument."""
+    for kw in call.keywords:
+        if kw.arg == keyword:
+            value = kw.value
+            break
+    else:
+        if len(call.args) <= position:
+            return None
+        value = call.args[position]
+    if isinstance(value, ast.Constant) and isinstance(value.value, str):
+        return value.value
+    return None
+
+
+def scan_agent_source(source: str) -> Optional[Dict[str, str]]:
+    """
+    Find the agent class in a generated agent's source without importing it.
+
+    Returns:
+        {"class": ..., "name": ..., "description": ...} ("name" is empty
+        when the super().__init__ call does not pass a literal), or None
+    """
+    tree = ast.parse(source)
+    for node in tree.body:
+        if not isinstance(node, ast.ClassDef):
+            continue
+        bases = {
+            base.id if isinstance(base, ast.Name) else getattr(base, "attr", "")
+            for base in node.bases
+        }
+        if not bases & AGENT_BASE_NAMES:
+            continue
+
+        info = {"class": node.name, "name": "", "description": ""}
+        for call in ast.walk(node):
+            if (
+                isinstance(call, ast.Call)
+                and isinstance(call.func, ast.Attribute)
+                and call.func.attr == "__init__"
+            ):
+                info["name"] = _string_arg(call, "name", 0) or ""
+                info["description"] = _string_arg(call, "description", 1) or ""
+                break
+        return info
+    return None
+
+
+class AgentManifest:
+    """File stat + hash → agent class/name for agents/generated/*.py."""
+
+    def __init__(self, path: Path = MANIFEST_PATH):
+        self.path = path
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        if path.exists():
+            try:
+                self.entries = json.loads(path.read_text(encoding="utf-8"))
+            except (json.JSONDecodeError, OSError):
+                self.entries = {}
+        self.dirty = False
+
+    def lookup(self, file_path: Path) -> Optional[Dict[str, Any]]:
+        """
+        Manifest entry for a file, re-parsed only if its content changed.
+
+        Returns None when the file holds no agent class.
+        """
+        stat = file_path.stat()
+        entry = self.entries.get(file_path.name)
+        if entry and entry["size"] == stat.st_size and entry["mtime"] == stat.st_mtime:
+            return entry
+
+        digest = file_sha256(file_path)
+        if entry and entry["sha256"] == digest:
+            entry.update(size=stat.st_size, mtime=stat.st_mtime)  # touched only
+            self.dirty = True
+            return entry
+
+        info = scan_agent_source(file_path.read_text(encoding="utf-8"))
+        if info is None:
+            self.forget(file_path.name)
+            return None
+        entry = {
+            **info,
+            "sha256": digest,
+            "size": stat.st_size,
+            "mtime": stat.st_mtime,
+        }
+        self.entries[file_path.name] = entry
+        self.dirty = True
+        return entry
+
+    def forget(self, file_name: str) -> None:
+        if self.entries.pop(file_name, None) is not None:
+            self.dirty = True
+
+    def prune(self, file_names: List[str]) -> None:
+        """Drop entries of deleted files."""
+        for file_name in set(self.entries) - set(file_names):
+            self.forget(file_name)
+
+    def save(self) -> None:
+        if not self.dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(self.entries, indent=1), encoding="utf-8")
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+
+
+class LazyAgent:
+    """
+    Registry entry for a generated agent; imports and instantiates the
+    agent class on first use and delegates everything to it.
+    """
+
+    def __init__(self, factory: "AgentFactory", file_path: Path, entry: Dict[str, Any]):
+        self.name = entry["name"]
+        self.description = entry.get("description", "")
+        self.file_path = file_path
+        self.class_name = entry["class"]
+        self.sha256 = entry["sha256"]
+        self._factory = factory
+        self._agent: Optional[BaseAgent] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._agent is not None
+
+    def load(self) -> Optional[BaseAgent]:
+        if self._agent is None:
+            with self._lock:
+                if self._agent is None:
+                    self._agent = self._factory._load_agent_from_file(
+                        self.file_path, self.class_name
+                    )
+        return self._agent
+
+    def execute(self, context: Dict[str, Any]) -> Dict[str, Any]:
+        agent = self.load()
+        if agent is None:
+            return {
+                "status": "failure",
+                "message": f"Agent {self.name} failed to load from {self.file_path.name}",
+                "agent": self.name,
+            }
+        return agent.execute(context)
+
+    def __getattr__(self, attr: str) -> Any:
+        if attr.startswith("_"):
+            raise AttributeError(attr)
+        agent = self.load()
+        if agent is None:
+            raise AttributeError(attr)
+        return getattr(agent, attr)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.loaded else "lazy"
+        return f"<LazyAgent {self.name} ({self.class_name}, {state})>"
+
+
+# ============================================
+# FACTORY
+# ============================================
+
+
 class AgentFactory:
     """Factory for creating and managing agents."""
 
@@ -61,6 +254,9 @@ class AgentFactory:
         self.agents: Dict[str, BaseAgent] = {}
         self.config = load_config()
         self.safety = get_safety_config()
+        self.manifest = AgentManifest()
+        # file name -> LazyAgent of the content last discovered
+        self._generated: Dict[str, LazyAgent] = {}
         self._ensure_generated_dir()
 
     def _ensure_generated_dir(self):
@@ -122,29 +318,58 @@ class AgentFactory:
 
     def discover_generated_agents(self) -> List[BaseAgent]:
         """
-        Discover and load agents from the generated directory.
+        Discover agents in the generated directory.
+
+        Files are matched against the manifest and registered as LazyAgents;
+        nothing is imported here. A file whose content did not change keeps
+        its LazyAgent (and the agent it already loaded).
         """
         discovered = []
 
         if not GENERATED_DIR.exists():
             return discovered
 
-        for file in GENERATED_DIR.glob("*.py"):
-            if file.name.startswith("_"):
-                continue
-
+        files = sorted(
+            f for f in GENERATED_DIR.glob("*.py") if not f.name.startswith("_")
+        )
+        for file in files:
             try:
-                agent = self._load_agent_from_file(file)
-                if agent:
-                    discovered.append(agent)
-                    self.register(agent)
+                entry = self.manifest.lookup(file)
+                if entry is None:
+                    continue
+                lazy = self._generated.get(file.name)
+                if lazy is not None and lazy.sha256 == entry["sha256"]:
+                    pass  # unchanged: keep it (and anything it loaded)
+                elif entry["name"]:
+                    lazy = LazyAgent(self, file, entry)
+                else:
+                    # Name is not a literal: import once to learn it
+                    agent = self._load_agent_from_file(file, entry["class"])
+                    if not agent:
+                        continue
+                    entry["name"] = agent.name
+                    self.manifest.dirty = True
+                    lazy = LazyAgent(self, file, entry)
+                    lazy._agent = agent
+
+                self._generated[file.name] = lazy
+                discovered.append(lazy)
+                self.register(lazy)
             except Exception as e:
                 print(f"Failed to load agent from {file}: {e}")
 
+        self.manifest.prune([f.name for f in files])
+        try:
+            self.manifest.save()
+        except OSError as e:
+            print(f"Could not save agent manifest: {e}")
+
         return discovered
 
-    def _load_agent_from_file(self, file_path: Path) -> Optional[BaseAgent]:
-        """Load an agent class from a Python file."""
+    def _load_agent_from_file(
+        self, file_path: Path, class_name: Optional[str] = None
+    ) -> Optional[BaseAgent]:
+        """Load an agent class from a Python file (class_name if known)."""
         module_name = f"generated.{file_path.stem}"
 
         spec = importlib.util.spec_from_file_location(module_name, file_path)
@@ -160,9 +385,11 @@ class AgentFactory:
             print(f"Error loading module {file_path}: {e}")
             return None
 
+        candidates = [class_name] if class_name else dir(module)
+
         # Find BaseAgent subclass in module
-        for attr_name in dir(module):
-            attr = getattr(module, attr_name)
+        for attr_name in candidates:
+            attr = getattr(module, attr_name, None)
             if (
                 isinstance(attr, type)
                 and issubclass(attr, BaseAgent)
@@ -3,38 +3,220 @@ LLM Client
 ==========
 Client for calling LLM API (OpenAI/Claude) to generate code.
 Used by spawn_agent to create new agent code.
+
+The SDK client is created once and reused, so its HTTP connection pool
+is shared by every call. On top of it:
+
+- Responses are cached by a hash of provider, model, max_tokens and
+  prompt (llm_cache.json), so a prompt sent again within LLM_CACHE_TTL_HOURS
+  costs nothing. Fix prompts skip the cache (use_cache=False): a fix that
+  did not work must not come back for the same error.
+- Rate limits, 5xx responses, timeouts and connection errors are retried
+  with exponential backoff.
+- generate_batch sends its uncached prompts concurrently. Callers that can
+  wait (spawning agents) pass batch=True: LLM_BATCH_MIN or more prompts
+  then go out as one provider batch job (OpenAI Batch API / Anthropic
+  Message Batches, half the price, minutes to answer) that is polled for
+  up to LLM_BATCH_TIMEOUT; whatever it did not answer is sent directly.
+  LLM_BATCH=0 turns batch jobs off everywhere.
+
+LLM_BASE_URL points both SDKs at another endpoint, e.g. a local fake
+server for testing.
 """
 
+import hashlib
 import os
 import json
-from typing import Optional, Dict, Any
-
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Tuple
 
 # Check which API is available
 OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY")
 ANTHROPIC_API_KEY = os.environ.get("ANTHROPIC_API_KEY")
+LLM_BASE_URL = os.environ.get("LLM_BASE_URL") or None
+
+OPENAI_MODEL = os.environ.get("OPENAI_MODEL", "gpt-4o-mini")
+ANTHROPIC_MODEL = os.environ.get("ANTHROPIC_MODEL", "claude-sonnet-4-20250514")
+TEMPERATURE = 0.7
+
+SYSTEM_PROMPT = """You are a Python code generator for autonomous agents.
+Generate ONLY valid Python code, no explanations or markdown.
+The code should define a class that inherits from BaseAgent.
+Include proper imports and type hints."""
+
+# Cache
+AGENT_DIR = Path(__file__).parent
+CACHE_PATH = Path(
+    os.environ.get("AGENT_LLM_CACHE", str(AGENT_DIR / "cache" / "llm_cache.json"))
+)
+CACHE_TTL_HOURS = float(os.environ.get("LLM_CACHE_TTL_HOURS", "24"))
+
+# Retries
+MAX_RETRIES = int(os.environ.get("LLM_MAX_RETRIES", "3"))
+RETRY_BASE_DELAY = float(os.environ.get("LLM_RETRY_BASE_DELAY", "1.0"))
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504, 529}
+
+# Batching
+BATCH_ENABLED = os.environ.get("LLM_BATCH", "1") != "0"
+BATCH_MIN = int(os.environ.get("LLM_BATCH_MIN", "3"))
+BATCH_POLL_SECONDS = float(os.environ.get("LLM_BATCH_POLL", "10"))
+BATCH_TIMEOUT = float(os.environ.get("LLM_BATCH_TIMEOUT", "600"))
+DIRECT_WORKERS = int(os.environ.get("LLM_WORKERS", "4"))
+
+
+def extract_code(content: str) -> str:
+    """Code from a completion, without markdown fences."""
+    if "```python" in content:
+        content = content.split("```python")[1].split("```")[0]
+    elif "```" in content:
+        content = content.split("```")[1].split("```")[0]
+    return content.strip()
+
+
+def is_retryable(error: Exception) -> bool:
+    """Rate limit, server error, timeout or connection error."""
+    status = getattr(error, "status_code", None)
+    if status is not None:
+        return status in RETRYABLE_STATUS
+    name = type(error).__name__
+    return "Timeout" in name or "Connection" in name
+
+
+# ============================================
+# RESPONSE CACHE
+# ============================================
+
+
+class ResponseCache:
+    """Completions keyed by a hash of provider, model, max_tokens and prompt."""
+
+    def __init__(self, path: Path = CACHE_PATH, ttl_hours: float = CACHE_TTL_HOURS):
+        self.path = path
+        self.ttl = ttl_hours * 3600
+        self._lock = threading.Lock()
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        if path.exists():
+            try:
+                self.entries = json.loads(path.read_text(encoding="utf-8"))
+            except (json.JSONDecodeError, OSError):
+                self.entries = {}
+
+    @staticmethod
+    def key(provider: str, model: str, prompt: str, max_tokens: int) -> str:
+        raw = f"{provider}\n{model}\n{max_tokens}\n{prompt}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self.entries.get(key)
+            if not entry:
+                return None
+            if self.ttl > 0 and time.time() - entry["ts"] > self.ttl:
+                del self.entries[key]
+                return None
+            return entry["text"]
+
+    def put(self, key: str, text: str) -> None:
+        with self._lock:
+            now = time.time()
+            self.entries = {
+                k: v
+                for k, v in self.entries.items()
+                if self.ttl <= 0 or now - v["ts"] <= self.ttl
+            }
+            self.entries[key] = {"text": text, "ts": now}
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = self.path.with_suffix(".tmp")
+                tmp_path.write_text(json.dumps(self.entries), encoding="utf-8")
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                print(f"[LLM] Could not save response cache: {e}")
+
+
+# ============================================
+# CLIENT
+# ============================================
 
 
 class LLMClient:
     """Client for LLM API calls."""
 
-    def __init__(self):
+    def __init__(self, base_url: Optional[str] = LLM_BASE_URL):
         self.api_key = OPENAI_API_KEY or ANTHROPIC_API_KEY
         self.provider = (
             "openai" if OPENAI_API_KEY else "anthropic" if ANTHROPIC_API_KEY else None
         )
+        self.model = OPENAI_MODEL if self.provider == "openai" else ANTHROPIC_MODEL
+        self.base_url = base_url
+        self.cache = ResponseCache()
+        self.stats = {"calls": 0, "cache_hits": 0, "batched": 0, "retries": 0}
+        self._sdk_client = None
+        self._lock = threading.Lock()
 
     def is_available(self) -> bool:
         """Check if LLM API is available."""
         return self.api_key is not None
 
-    def generate_code(self, prompt: str, max_tokens: int = 2000) -> Optional[str]:
+    def _count(self, stat: str, n: int = 1) -> None:
+        with self._lock:
+            self.stats[stat] += n
+
+    def summary(self) -> str:
+        s = self.stats
+        return (
+            f"{s['calls']} call(s), {s['batched']} batched, "
+            f"{s['cache_hits']} cached, {s['retries']} retried"
+        )
+
+    def _client(self):
+        """SDK client, created once (raises ImportError without the package)."""
+        if self._sdk_client is None:
+            with self._lock:
+                if self._sdk_client is None:
+                    kwargs = {"api_key": self.api_key, "max_retries": 0}
+                    if self.base_url:
+                        kwargs["base_url"] = self.base_url
+                    if self.provider == "openai":
+                        import openai
+
+                        self._sdk_client = openai.OpenAI(**kwargs)
+                    else:
+                        import anthropic
+
+                        self._sdk_client = anthropic.Anthropic(**kwargs)
+        return self._sdk_client
+
+    def _cache_key(self, prompt: str, max_tokens: int) -> str:
+        return ResponseCache.key(self.provider or "", self.model, prompt, max_tokens)
+
+    def _with_retries(self, call):
+        """Run call, retrying retryable errors with exponential backoff."""
+        for attempt in range(MAX_RETRIES + 1):
+            try:
+                return call()
+            except Exception as e:
+                if attempt >= MAX_RETRIES or not is_retryable(e):
+                    raise
+                delay = RETRY_BASE_DELAY * (2**attempt) * random.uniform(0.8, 1.2)
+                print(f"[LLM] {type(e).__name__}, retrying in {delay:.1f}s")
+                self._count("retries")
+                time.sleep(delay)
+
+    def generate_code(
+        self, prompt: str, max_tokens: int = 2000, use_cache: bool = True
+    ) -> Optional[str]:
         """
         Generate code using LLM API.
 
         Args:
             prompt: The prompt describing what code to generate
             max_tokens: Maximum tokens in response
+            use_cache: Read and write the response cache
 
         Returns:
             Generated code string or None if failed
@@ -43,49 +225,46 @@ class LLMClient:
             print("[LLM] No API key available, using template fallback")
             return None
 
+        key = self._cache_key(prompt, max_tokens)
+        if use_cache:
+            cached = self.cache.get(key)
+            if cached is not None:
+                self._count("cache_hits")
+                return cached
+
         try:
             if self.provider == "openai":
-                return self._call_openai(prompt, max_tokens)
+                content = self._call_openai(prompt, max_tokens)
             elif self.provider == "anthropic":
-                return self._call_anthropic(prompt, max_tokens)
+                content = self._call_anthropic(prompt, max_tokens)
+            else:
+                return None
         except Exception as e:
             print(f"[LLM] Error calling API: {e}")
             return None
 
-        return None
+        if not content:
+            return None
+        code = extract_code(content)
+        if use_cache:
+            self.cache.put(key, code)
+        return code
 
     def _call_openai(self, prompt: str, max_tokens: int) -> Optional[str]:
         """Call OpenAI API."""
         try:
-            import openai
-
-            client = openai.OpenAI(api_key=self.api_key)
-
-            response = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": """You are a Python code generator for autonomous agents.
-Generate ONLY valid Python code, no explanations or markdown.
-The code should define a class that inherits from BaseAgent.
-Include proper imports and type hints.""",
-                    },
-                    {"role": "user", "content": prompt},
-                ],
-                max_tokens=max_tokens,
-                temperature=0.7,
+            client = self._client()
+
+            response = self._with_retries(
+                lambda: client.chat.completions.create(
+                    model=self.model,
+                    messages=self._openai_messages(prompt),
+                    max_tokens=max_tokens,
+                    temperature=TEMPERATURE,
+                )
             )
-
-            content = response.choices[0].message.content
-
-            # Extract code from markdown if present
-            if "```python" in content:
-                content = content.split("```python")[1].split("```")[0]
-            elif "```" in content:
-                content = content.split("```")[1].split("```")[0]
-
-            return content.strip()
+            self._count("calls")
+            return response.choices[0].message.content
 
         except ImportError:
             print("[LLM] openai package not installed")
@@ -97,29 +276,15 @@ Include proper imports and type hints.""",
     def _call_anthropic(self, prompt: str, max_tokens: int) -> Optional[str]:
         """Call Anthropic/Claude API."""
         try:
-            import anthropic
-
-            client = anthropic.Anthropic(api_key=self.api_key)
+            client = self._client()
 
-            response = client.messages.create(
-                model="claude-sonnet-4-20250514",
-                max_tokens=max_tokens,
-                system="""You are a Python code generator for autonomous agents.
-Generate ONLY valid Python code, no explanations or markdown.
-The code should define a class that inherits from BaseAgent.
-Include proper imports and type hints.""",
-                messages=[{"role": "user", "content": prompt}],
+            response = self._with_retries(
+                lambda: client.messages.create(
+                    **self._anthropic_params(prompt, max_tokens)
+                )
             )
-
-            content = response.content[0].text
-
-            # Extract code from markdown if present
-            if "```python" in content:
-                content = content.split("```python")[1].split("```")[0]
-            elif "```" in content:
-                content = content.split("```")[1].split("```")[0]
-
-            return content.strip()
+            self._count("calls")
+            return response.content[0].text
 
         except ImportError:
             print("[LLM] anthropic package not installed")
@@ -128,18 +293,223 @@ Include proper imports and type hints.""",
             print(f"[LLM] Anthropic error: {e}")
             return None
 
-    def review_code(self, code: str) -> Dict[str, Any]:
+    @staticmethod
+    def _openai_messages(prompt: str) -> List[Dict[str, str]]:
+        return [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": prompt},
+        ]
+
+    def _anthropic_params(self, prompt: str, max_tokens: int) -> Dict[str, Any]:
+        return {
+            "model": self.model,
+            "max_tokens": max_tokens,
+            "system": SYSTEM_PROMPT,
+            "messages": [{"role": "user", "content": prompt}],
+        }
+
+    # ============================================
+    # BATCHES
+    # ============================================
+
+    def generate_batch(
+        self,
+        prompts: List[str],
+        max_tokens: int = 2000,
+        use_cache: bool = True,
+        batch: bool = False,
+    ) -> List[Optional[str]]:
         """
-        Use LLM to review generated code for issues.
+        Generate code for many prompts with as few round trips as possible.
+
+        Cached prompts are answered from the cache and duplicates are sent
+        once; the rest are sent directly, concurrently.
+
+        Args:
+            use_cache: Read and write the response cache
+            batch: Send BATCH_MIN or more prompts as one provider batch job
+                first (cheaper, but may take up to BATCH_TIMEOUT)
 
         Returns:
-            Dict with "is_safe", "issues", "suggestions"
+            Generated code (or None) per prompt, in prompt order
         """
+        results: List[Optional[str]] = [None] * len(prompts)
         if not self.is_available():
-            # Can't review without API, assume OK
-            return {"is_safe": True, "issues": [], "suggestions": []}
+            print("[LLM] No API key available, using template fallback")
+            return results
+
+        pending: Dict[str, Tuple[str, List[int]]] = {}
+        for i, prompt in enumerate(prompts):
+            key = self._cache_key(prompt, max_tokens)
+            cached = self.cache.get(key) if use_cache else None
+            if cached is not None:
+                self._count("cache_hits")
+                results[i] = cached
+            else:
+                pending.setdefault(key, (prompt, []))[1].append(i)
+
+        outputs: Dict[str, str] = {}
+        if batch and BATCH_ENABLED and len(pending) >= BATCH_MIN:
+            outputs = self._run_batch(pending, max_tokens, use_cache)
+
+        direct = [(key, prompt) for key, (prompt, _) in pending.items()]
+        direct = [(key, prompt) for key, prompt in direct if key not in outputs]
+        if direct:
+            workers = max(1, min(DIRECT_WORKERS, len(direct)))
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                codes = pool.map(
+                    lambda item: self.generate_code(item[1], max_tokens, False),
+                    direct,
+                )
+                for (key, _), code in zip(direct, codes):
+                    if code:
+                        outputs[key] = code
+                        if use_cache:
+                            self.cache.put(key, code)
+
+        for key, (_, indexes) in pending.items():
+            for i in indexes:
+                results[i] = outputs.get(key)
+        return results
+
+    def _run_batch(
+        self,
+        pending: Dict[str, Tuple[str, List[int]]],
+        max_tokens: int,
+        use_cache: bool = True,
+    ) -> Dict[str, str]:
+        """Submit one batch job and wait for it; returns {cache key: code}."""
+        requests = {key: prompt for key, (prompt, _) in pending.items()}
+        print(f"[LLM] Submitting batch of {len(requests)} prompt(s)")
+        try:
+            if self.provider == "openai":
+                contents = self._batch_openai(requests, max_tokens)
+            else:
+                contents = self._batch_anthropic(requests, max_tokens)
+        except Exception as e:
+            print(f"[LLM] Batch failed, sending prompts directly: {e}")
+            return {}
+
+        outputs = {}
+        for key, content in contents.items():
+            if content:
+                outputs[key] = extract_code(content)
+                if use_cache:
+                    self.cache.put(key, outputs[key])
+        self._count("batched", len(outputs))
+        print(f"[LLM] Batch answered {len(outputs)}/{len(requests)} prompt(s)")
+        return outputs
+
+    def _poll(self, fetch, finished):
+        """Poll fetch() until finished(obj); None after BATCH_TIMEOUT."""
+        deadline = time.monotonic() + BATCH_TIMEOUT
+        while True:
+            obj = self._with_retries(fetch)
+            if finished(obj):
+                return obj
+            if time.monotonic() >= deadline:
+                return None
+            time.sleep(BATCH_POLL_SECONDS)
+
+    def _batch_openai(
+        self, requests: Dict[str, str], max_tokens: int
+    ) -> Dict[str, str]:
+        client = self._client()
+        lines = [
+            json.dumps(
+                {
+                    "custom_id": key,
+                    "method": "POST",
+                    "url": "/v1/chat/completions",
+                    "body": {
+                        "model": self.model,
+                        "messages": self._openai_messages(prompt),
+                        "max_tokens": max_tokens,
+                        "temperature": TEMPERATURE,
+                    },
+                }
+            )
+            for key, prompt in requests.items()
+        ]
+        batch_file = self._with_retries(
+            lambda: client.files.create(
+                file=("agent_batch.jsonl", "\n".join(lines).encode("utf-8")),
+                purpose="batch",
+            )
+        )
+        batch = self._with_retries(
+            lambda: client.batches.create(
+                input_file_id=batch_file.id,
+                endpoint="/v1/chat/completions",
+                completion_window="24h",
+            )
+        )
+        self._count("calls")
 
-        prompt = f"""Review this Python agent code for safety and correctness.
+        done = self._poll(
+            lambda: client.batches.retrieve(batch.id),
+            lambda b: b.status in ("completed", "failed", "expired", "cancelled"),
+        )
+        if done is None:
+            print(f"[LLM] Batch {batch.id} timed out, cancelling")
+            client.batches.cancel(batch.id)
+            return {}
+        if done.status != "completed" or not done.output_file_id:
+            print(f"[LLM] Batch {batch.id} ended with status {done.status}")
+            return {}
+
+        contents = {}
+        output = self._with_retries(lambda: client.files.content(done.output_file_id))
+        for line in output.text.splitlines():
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            body = (item.get("response") or {}).get("body") or {}
+            choices = body.get("choices") or []
+            if choices:
+                contents[item["custom_id"]] = choices[0]["message"]["content"]
+        return contents
+
+    def _batch_anthropic(
+        self, requests: Dict[str, str], max_tokens: int
+    ) -> Dict[str, str]:
+        client = self._client()
+        batch = self._with_retries(
+            lambda: client.messages.batches.create(
+                requests=[
+                    {
+                        # custom_id is at most 64 chars: the sha256 hex fits
+                        "custom_id": key,
+                        "params": self._anthropic_params(prompt, max_tokens),
+                    }
+                    for key, prompt in requests.items()
+                ]
+            )
+        )
+        self._count("calls")
+
+        done = self._poll(
+            lambda: client.messages.batches.retrieve(batch.id),
+            lambda b: b.processing_status == "ended",
+        )
+        if done is None:
+            print(f"[LLM] Batch {batch.id} timed out, cancelling")
+            client.messages.batches.cancel(batch.id)
+            return {}
+
+        contents = {}
+        for entry in client.messages.batches.results(batch.id):
+            if entry.result.type == "succeeded":
+                contents[entry.custom_id] = entry.result.message.content[0].text
+        return contents
+
+    # ============================================
+    # REVIEW / FIX
+    # ============================================
+
+    @staticmethod
+    def review_prompt(code: str) -> str:
+        return f"""Review this Python agent code for safety and correctness.
 Check for:
 1. Security issues (file access, shell injection, etc.)
 2. Syntax errors
@@ -158,8 +528,9 @@ Respond in JSON format:
     "suggestions": ["suggestion1", "suggestion2"]
 }}"""
 
+    @staticmethod
+    def parse_review(response: Optional[str]) -> Dict[str, Any]:
         try:
-            response = self.generate_code(prompt, max_tokens=500)
             if response:
                 # Try to parse JSON from response
                 return json.loads(response)
@@ -168,21 +539,35 @@ Respond in JSON format:
 
         return {"is_safe": True, "issues": [], "suggestions": []}
 
-    def fix_code(self, code: str, error: str) -> Optional[str]:
+    def review_code(self, code: str) -> Dict[str, Any]:
         """
-        Use LLM to fix code based on error message.
-
-        Args:
-            code: Original code that failed
-            error: Error message from running the code
+        Use LLM to review generated code for issues.
 
         Returns:
-            Fixed code or None if can't fix
+            Dict with "is_safe", "issues", "suggestions"
         """
         if not self.is_available():
-            return None
+            # Can't review without API, assume OK
+            return {"is_safe": True, "issues": [], "suggestions": []}
 
-        prompt = f"""Fix this Python code based on the error:
+        return self.parse_review(
+            self.generate_code(self.review_prompt(code), max_tokens=500)
+        )
+
+    def review_many(
+        self, codes: List[str], batch: bool = False
+    ) -> List[Dict[str, Any]]:
+        """review_code for several files at once (see generate_batch)."""
+        if not self.is_available():
+            return [self.parse_review(None) for _ in codes]
+        responses = self.generate_batch(
+            [self.review_prompt(code) for code in codes], max_tokens=500, batch=batch
+        )
+        return [self.parse_review(response) for response in responses]
+
+    @staticmethod
+    def fix_prompt(code: str, error: str) -> str:
+        return f"""Fix this Python code based on the error:
 
 Error:
 {error}
@@ -194,7 +579,23 @@ Code:
 
 Return ONLY the fixed Python code, no explanations."""
 
-        return self.generate_code(prompt, max_tokens=2000)
+    def fix_code(self, code: str, error: str) -> Optional[str]:
+        """
+        Use LLM to fix code based on error message.
+
+        Args:
+            code: Original code that failed
+            error: Error message from running the code
+
+        Returns:
+            Fixed code or None if can't fix
+        """
+        if not self.is_available():
+            return None
+
+        return self.generate_code(
+            self.fix_prompt(code, error), max_tokens=2000, use_cache=False
+        )
 
 
 # Singleton instance
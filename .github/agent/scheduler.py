@@ -0,0 +1,355 @@
+"""
+Job Scheduler
+=============
+Runs jobs as a dependency graph with bounded parallelism.
+
+Jobs in config/jobs.yaml may declare:
+    depends_on: ["other-job"]     run after these jobs succeed
+    resources:  ["llm"]           resource classes the job holds while running
+
+A job starts as soon as its dependencies succeeded, a worker is free
+(AGENT_MAX_PARALLEL_JOBS) and every resource class it needs is below its
+limit (top-level `resource_limits` in jobs.yaml, default 1 per class). The
+job's agent is always an implicit resource with limit 1, because agent
+instances keep per-run state. Jobs whose dependency failed or was skipped
+are skipped, so a run takes about the time of its critical path.
+
+Check results are cached by command + the hashes of the job's input files
+(check_cache.json); a passing check whose inputs did not change is not run
+again.
+"""
+
+import hashlib
+import json
+import os
+import subprocess
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Paths
+AGENT_DIR = Path(__file__).parent
+REPO_ROOT = AGENT_DIR.parent.parent
+CHECK_CACHE_PATH = Path(
+    os.environ.get("AGENT_CHECK_CACHE", str(AGENT_DIR / "cache" / "check_cache.json"))
+)
+
+MAX_PARALLEL_JOBS = int(os.environ.get("AGENT_MAX_PARALLEL_JOBS", "4"))
+CHECK_WORKERS = int(os.environ.get("AGENT_CHECK_WORKERS", "4"))
+CHECK_TIMEOUT = 60
+
+
+# ============================================
+# DEPENDENCY GRAPH
+# ============================================
+
+
+def job_dependencies(job: Dict[str, Any]) -> List[str]:
+    deps = job.get("depends_on") or []
+    return [deps] if isinstance(deps, str) else list(deps)
+
+
+def job_resources(job: Dict[str, Any]) -> List[str]:
+    """Resource classes a job holds, including its agent."""
+    resources = job.get("resources") or []
+    if isinstance(resources, str):
+        resources = [resources]
+    return list(resources) + [f"agent:{job.get('agent', 'meta-agent')}"]
+
+
+def validate_graph(jobs: List[Dict[str, Any]]) -> List[str]:
+    """
+    Check names, dependencies and cycles.
+
+    Returns:
+        Job names in a topological order
+
+    Raises:
+        ValueError: duplicate name, unknown dependency or cycle
+    """
+    by_name: Dict[str, Dict[str, Any]] = {}
+    for job in jobs:
+        name = job.get("name", "unknown")
+        if name in by_name:
+            raise ValueError(f"Duplicate job name: {name}")
+        by_name[name] = job
+
+    for name, job in by_name.items():
+        for dep in job_dependencies(job):
+            if dep not in by_name:
+                raise ValueError(f"Job {name} depends on unknown job: {dep}")
+
+    order: List[str] = []
+    state: Dict[str, str] = {}
+
+    def visit(name: str, path: List[str]):
+        if state.get(name) == "done":
+            return
+        if state.get(name) == "visiting":
+            raise ValueError(f"Dependency cycle: {' -> '.join(path + [name])}")
+        state[name] = "visiting"
+        for dep in job_dependencies(by_name[name]):
+            visit(dep, path + [name])
+        state[name] = "done"
+        order.append(name)
+
+    for name in by_name:
+        visit(name, [])
+    return order
+
+
+def critical_path(jobs: List[Dict[str, Any]], durations: Dict[str, float]) -> float:
+    """Longest chain of job durations through the dependency graph."""
+    by_name = {job.get("name", "unknown"): job for job in jobs}
+    finish: Dict[str, float] = {}
+    for name in validate_graph(jobs):
+        deps = job_dependencies(by_name[name])
+        start = max((finish[d] for d in deps), default=0.0)
+        finish[name] = start + durations.get(name, 0.0)
+    return max(finish.values(), default=0.0)
+
+
+# ============================================
+# CHECKS
+# ============================================
+
+
+def _path_digest(path: Path, hasher) -> None:
+    """Feed a file, or every file under a directory, into hasher."""
+    rel = os.path.relpath(path, REPO_ROOT)
+    if path.is_file():
+        hasher.update(f"{rel}|{path.stat().st_size}\n".encode("utf-8"))
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(65536), b""):
+                hasher.update(chunk)
+    elif path.is_dir():
+        for child in sorted(p for p in path.rglob("*") if p.is_file()):
+            _path_digest(child, hasher)
+    else:
+        hasher.update(f"{rel}|missing\n".encode("utf-8"))
+
+
+def job_inputs(job: Dict[str, Any]) -> List[str]:
+    """
+    Files a job's checks read: `check_inputs`, or the context input/output
+    paths that exist in the repo.
+    """
+    if job.get("check_inputs"):
+        return list(job["check_inputs"])
+    context = job.get("context", {}) or {}
+    candidates = context.get("input") or []
+    if isinstance(candidates, str):
+        candidates = [candidates]
+    candidates = list(candidates) + [context.get("output") or ""]
+    return [p for p in candidates if p and (REPO_ROOT / p).exists()]
+
+
+def inputs_hash(inputs: List[str]) -> Optional[str]:
+    """Hash of the input files' contents (None without inputs: not cacheable)."""
+    if not inputs:
+        return None
+    hasher = hashlib.sha256()
+    for rel in sorted(inputs):
+        _path_digest(REPO_ROOT / rel, hasher)
+    return hasher.hexdigest()
+
+
+class CheckCache:
+    """Passing check results keyed by command + input hash."""
+
+    def __init__(self, path: Path = CHECK_CACHE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        if path.exists():
+            try:
+                self.entries = json.loads(path.read_text(encoding="utf-8"))
+            except (json.JSONDecodeError, OSError):
+                self.entries = {}
+        self.hits = 0
+
+    @staticmethod
+    def key(command: str, digest: str) -> str:
+        return hashlib.sha256(f"{command}\n{digest}".encode("utf-8")).hexdigest()
+
+    def passed(self, command: str, digest: Optional[str]) -> bool:
+        if digest is None:
+            return False
+        with self._lock:
+            hit = self.key(command, digest) in self.entries
+            if hit:
+                self.hits += 1
+            return hit
+
+    def record(self, command: str, digest: Optional[str], success: bool) -> None:
+        if digest is None:
+            return
+        with self._lock:
+            key = self.key(command, digest)
+            if success:
+                self.entries[key] = {"command": command, "ts": time.time()}
+            else:
+                self.entries.pop(key, None)
+
+    def save(self) -> None:
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(".tmp")
+            tmp_path.write_text(json.dumps(self.entries, indent=1), encoding="utf-8")
+            os.replace(tmp_path, self.path)
+
+
+def run_check(command: str, cwd: str = None) -> Tuple[bool, str]:
+    """
+    Run a check command and return (success, output).
+    """
+    try:
+        result = subprocess.run(
+            command,
+            shell=True,
+            capture_output=True,
+            text=True,
+            timeout=CHECK_TIMEOUT,
+            cwd=cwd or str(REPO_ROOT),
+        )
+        return result.returncode == 0, result.stdout + result.stderr
+
+    except subprocess.TimeoutExpired:
+        return False, "Command timed out"
+    except Exception as e:
+        return False, str(e)
+
+
+def run_checks_parallel(
+    checks: List[str],
+    inputs: Optional[List[str]] = None,
+    cache: Optional[CheckCache] = None,
+    max_workers: int = CHECK_WORKERS,
+) -> Tuple[bool, List[str]]:
+    """
+    Run check commands concurrently (cached passes are skipped).
+
+    Returns:
+        (all_passed, list_of_failed_outputs) in check order
+    """
+    digest = inputs_hash(inputs or []) if cache is not None else None
+    pending = [c for c in checks if cache is None or not cache.passed(c, digest)]
+    if not pending:
+        return True, []
+
+    workers = max(1, min(max_workers, len(pending)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        outcomes = dict(zip(pending, pool.map(run_check, pending)))
+
+    failed_outputs = []
+    for check in pending:
+        success, output = outcomes[check]
+        if cache is not None:
+            cache.record(check, digest, success)
+        if not success:
+            failed_outputs.append(f"Check '{check}' failed:\n{output}")
+    return len(failed_outputs) == 0, failed_outputs
+
+
+# ============================================
+# SCHEDULER
+# ============================================
+
+
+class JobScheduler:
+    """Runs a job graph with bounded parallelism and resource classes."""
+
+    def __init__(
+        self,
+        run_job: Callable[[Dict[str, Any]], Dict[str, Any]],
+        max_workers: int = MAX_PARALLEL_JOBS,
+        resource_limits: Optional[Dict[str, int]] = None,
+    ):
+        self.run_job = run_job
+        self.max_workers = max(1, max_workers)
+        self.resource_limits = dict(resource_limits or {})
+        self.durations: Dict[str, float] = {}
+
+    def _fits(self, job: Dict[str, Any], in_use: Dict[str, int]) -> bool:
+        return all(
+            in_use.get(r, 0) < self.resource_limits.get(r, 1)
+            for r in job_resources(job)
+        )
+
+    def _timed(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        started = time.perf_counter()
+        try:
+            return self.run_job(job)
+        finally:
+            self.durations[job.get("name", "unknown")] = time.perf_counter() - started
+
+    def run(self, jobs: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """Run every job once; returns {job name: result} in topological order."""
+        order = validate_graph(jobs)
+        by_name = {job.get("name", "unknown"): job for job in jobs}
+        results: Dict[str, Dict[str, Any]] = {}
+        waiting = list(order)
+        in_use: Dict[str, int] = {}
+        running = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while waiting or running:
+                progressed = False
+                for name in list(waiting):
+                    job = by_name[name]
+                    deps = job_dependencies(job)
+                    blocked = [
+                        d
+                        for d in deps
+                        if d in results and results[d].get("status") != "success"
+                    ]
+                    if blocked:
+                        waiting.remove(name)
+                        progressed = True
+                        print(
+                            f"[SCHED] Skipping {name}: dependency {blocked[0]} did not succeed"
+                        )
+                        results[name] = {
+                            "job": name,
+                            "status": "skipped",
+                            "message": f"Dependency {blocked[0]} did not succeed",
+                            "agent": job.get("agent", "meta-agent"),
+                        }
+                        continue
+                    if any(d not in results for d in deps):
+                        continue
+                    if len(running) >= self.max_workers or not self._fits(job, in_use):
+                        continue
+                    waiting.remove(name)
+                    progressed = True
+                    for r in job_resources(job):
+                        in_use[r] = in_use.get(r, 0) + 1
+                    running[pool.submit(self._timed, job)] = name
+
+                if not running:
+                    if progressed:
+                        continue  # skips above may have settled more jobs
+                    for name in waiting:  # resource limit below 1
+                        results[name] = {
+                            "job": name,
+                            "status": "failure",
+                            "message": "Job cannot be scheduled (resource limits)",
+                        }
+                    break
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    for r in job_resources(by_name[name]):
+                        in_use[r] -= 1
+                    try:
+                        results[name] = future.result()
+                    except Exception as e:
+                        results[name] = {
+                            "job": name,
+                            "status": "failure",
+                            "message": f"Job crashed: {e}",
+                        }
+
+        return {name: results[name] for name in order}
@@ -9,7 +9,7 @@ import os
 import re
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 
 from agent_factory import get_factory, get_auto_spawn_config, GENERATED_DIR
 from llm_client import get_llm_client
@@ -154,6 +154,36 @@ def spawn_agent_from_template(
         return None
 
 
+def _spawn_prompt(
+    name: str, purpose: str, task_description: str, safety: Dict[str, Any]
+) -> str:
+    """LLM prompt for one agent implementation."""
+    class_name = sanitize_class_name(name)
+    allowed_paths = safety.get("allowed_paths", [])
+    forbidden_paths = safety.get("forbidden_paths", [])
+
+    return f"""Generate a Python agent class with the following requirements:
+
+Agent Name: {name}
+Class Name: {class_name}
+Purpose: {purpose}
+
+Task Description:
+{task_description}
+
+Requirements:
+1. Inherit from TaskAgent (from agents.base_agent import TaskAgent)
+2. Implement the run(self, context: Dict[str, Any]) method
+3. Return a dict with "status", "message", and optionally "data"
+4. Use self.safe_write(path, content) for any file writes
+5. Allowed paths: {allowed_paths}
+6. Forbidden paths: {forbidden_paths}
+
+The agent should be safe, handle errors gracefully, and log its actions.
+
+Generate ONLY the Python code, no explanations."""
+
+
 def spawn_agent_with_llm(
     name: str, purpose: str, task_description: str, context: Dict[str, Any] = None
 ) -> Optional[Path]:
@@ -169,66 +199,84 @@ def spawn_agent_with_llm(
     Returns:
         Path to the created file or None if failed
     """
+    return spawn_agents_with_llm(
+        [{"name": name, "purpose": purpose, "task_description": task_description}]
+    )[0]
+
+
+def spawn_agents_with_llm(specs: List[Dict[str, str]]) -> List[Optional[Path]]:
+    """
+    Create several agents with one LLM batch per step.
+
+    The implementations are generated in one batch, reviewed in one batch,
+    and the ones flagged unsafe are fixed in one batch.
+
+    Args:
+        specs: Dicts with "name", "purpose" and "task_description"
+
+    Returns:
+        Path to each created file (None if failed), in spec order
+    """
     factory = get_factory()
     llm = get_llm_client()
 
     # Check if we can spawn more
     if not factory.can_spawn_more():
         print(f"[SPAWN] Cannot spawn more agents (limit reached)")
-        return None
+        return [None] * len(specs)
 
     # Check if LLM is available
     if not llm.is_available():
         print(f"[SPAWN] LLM not available, using template fallback")
-        return spawn_agent_from_template(name, purpose)
-
-    # Build prompt for LLM
-    class_name = sanitize_class_name(name)
-    allowed_paths = factory.safety.get("allowed_paths", [])
-    forbidden_paths = factory.safety.get("forbidden_paths", [])
-
-    prompt = f"""Generate a Python agent class with the following requirements:
-
-Agent Name: {name}
-Class Name: {class_name}
-Purpose: {purpose}
-
-Task Description:
-{task_description}
-
-Requirements:
-1. Inherit from TaskAgent (from agents.base_agent import TaskAgent)
-2. Implement the run(self, context: Dict[str, Any]) method
-3. Return a dict with "status", "message", and optionally "data"
-4. Use self.safe_write(path, content) for any file writes
-5. Allowed paths: {allowed_paths}
-6. Forbidden paths: {forbidden_paths}
-
-The agent should be safe, handle errors gracefully, and log its actions.
-
-Generate ONLY the Python code, no explanations."""
+        return [spawn_agent_from_template(s["name"], s["purpose"]) for s in specs]
 
     # Generate code
-    code = llm.generate_code(prompt)
-
-    if not code:
-        print(f"[SPAWN] LLM failed to generate code, using template")
-        return spawn_agent_from_template(name, purpose)
+    prompts = [
+        _spawn_prompt(s["name"], s["purpose"], s["task_description"], factory.safety)
+        for s in specs
+    ]
+    # Spawning can wait for a batch job
+    codes = llm.generate_batch(prompts, batch=True)
 
     # Review code for safety
-    review = llm.review_code(code)
-    if not review.get("is_safe", True):
-        print(f"[SPAWN] Generated code flagged as unsafe: {review.get('issues')}")
-        # Try to fix
-        if review.get("issues"):
-            fixed = llm.fix_code(code, str(review["issues"]))
-            if fixed:
-                code = fixed
-            else:
-                print(f"[SPAWN] Could not fix code, using template")
-                return spawn_agent_from_template(name, purpose)
-
-    # Write file
+    generated = [i for i, code in enumerate(codes) if code]
+    reviews = llm.review_many([codes[i] for i in generated], batch=True)
+    reviews = dict(zip(generated, reviews))
+    unsafe = [i for i, review in reviews.items() if not review.get("is_safe", True)]
+    for i in unsafe:
+        print(
+            f"[SPAWN] Generated code for {specs[i]['name']} flagged as unsafe: "
+            f"{reviews[i].get('issues')}"
+        )
+    # Try to fix
+    fixable = [i for i in unsafe if reviews[i].get("issues")]
+    fixes = llm.generate_batch(
+        [llm.fix_prompt(codes[i], str(reviews[i]["issues"])) for i in fixable],
+        use_cache=False,
+        batch=True,
+    )
+    for i, fixed in zip(fixable, fixes):
+        codes[i] = fixed
+        if not fixed:
+            print(f"[SPAWN] Could not fix code for {specs[i]['name']}")
+
+    paths: List[Optional[Path]] = []
+    for spec, code in zip(specs, codes):
+        if not code:
+            print(f"[SPAWN] No usable LLM code for {spec['name']}, using template")
+            paths.append(spawn_agent_from_template(spec["name"], spec["purpose"]))
+            continue
+        if not factory.can_spawn_more():
+            print(f"[SPAWN] Cannot spawn more agents (limit reached)")
+            paths.append(None)
+            continue
+        paths.append(_write_llm_agent(spec["name"], code))
+    return paths
+
+
+def _write_llm_agent(name: str, code: str) -> Optional[Path]:
+    """Write LLM-generated agent code to the generated directory."""
+    class_name = sanitize_class_name(name)
     file_name = sanitize_file_name(name)
     file_path = GENERATED_DIR / f"{file_name}.py"
 
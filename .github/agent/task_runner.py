@@ -3,11 +3,16 @@ Task Runner
 ===========
 Loads jobs from config and runs them with appropriate agents.
 Includes self-check and self-fix loop.
+
+Jobs run as a dependency graph (depends_on / resources in jobs.yaml) with
+bounded parallelism, and their checks run concurrently with cached passes;
+see scheduler.py.
 """
 
 import os
-import subprocess
 import sys
+import threading
+import time
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Any, Optional, Tuple
@@ -15,6 +20,15 @@ import yaml
 
 from agent_factory import load_all_agents, get_factory
 from llm_client import get_llm_client
+from scheduler import (
+    MAX_PARALLEL_JOBS,
+    CheckCache,
+    JobScheduler,
+    critical_path,
+    job_dependencies,
+    job_inputs,
+    run_checks_parallel,
+)
 
 
 # Paths
@@ -23,57 +37,32 @@ JOBS_PATH = AGENT_DIR / "config" / "jobs.yaml"
 REPORTS_DIR = AGENT_DIR / "reports"
 
 
-def load_jobs() -> List[Dict[str, Any]]:
-    """Load job configurations from YAML."""
+def load_jobs_config() -> Dict[str, Any]:
+    """Load the whole jobs.yaml (jobs, resource_limits, templates)."""
     if not JOBS_PATH.exists():
-        return []
+        return {}
     
     with open(JOBS_PATH, "r", encoding="utf-8") as f:
-        data = yaml.safe_load(f) or {}
-    
-    return data.get("jobs", [])
+        return yaml.safe_load(f) or {}
 
 
-def run_check(command: str, cwd: str = None) -> Tuple[bool, str]:
-    """
-    Run a check command and return (success, output).
-    """
-    try:
-        result = subprocess.run(
-            command,
-            shell=True,
-            capture_output=True,
-            text=True,
-            timeout=60,
-            cwd=cwd or str(AGENT_DIR.parent.parent)  # repo root
-        )
-        
-        success = result.returncode == 0
-        output = result.stdout + result.stderr
-        
-        return success, output
-        
-    except subprocess.TimeoutExpired:
-        return False, "Command timed out"
-    except Exception as e:
-        return False, str(e)
+def load_jobs() -> List[Dict[str, Any]]:
+    """Load job configurations from YAML."""
+    return load_jobs_config().get("jobs", [])
 
 
-def run_checks(checks: List[str]) -> Tuple[bool, List[str]]:
+def run_checks(
+    checks: List[str],
+    inputs: Optional[List[str]] = None,
+    cache: Optional[CheckCache] = None,
+) -> Tuple[bool, List[str]]:
     """
-    Run multiple check commands.
+    Run multiple check commands (concurrently; cached passes are skipped).
     
     Returns:
         (all_passed, list_of_failed_outputs)
     """
-    failed_outputs = []
-    
-    for check in checks:
-        success, output = run_check(check)
-        if not success:
-            failed_outputs.append(f"Check '{check}' failed:\n{output}")
-    
-    return len(failed_outputs) == 0, failed_outputs
+    return run_checks_parallel(checks, inputs=inputs, cache=cache)
 
 
 class TaskRunner:
@@ -81,10 +70,14 @@ class TaskRunner:
     
     def __init__(self):
         self.agents = load_all_agents()
-        self.jobs = load_jobs()
+        config = load_jobs_config()
+        self.jobs = config.get("jobs", [])
+        self.resource_limits = config.get("resource_limits", {}) or {}
         self.llm = get_llm_client()
         self.results: List[Dict[str, Any]] = []
         self.max_fix_attempts = 3
+        self.check_cache = CheckCache()
+        self._results_lock = threading.Lock()
     
     def run_job(self, job: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -123,7 +116,9 @@ class TaskRunner:
         # Run post-checks
         if checks:
             print(f"[RUNNER] Running {len(checks)} checks...")
-            checks_passed, failed_outputs = run_checks(checks)
+            checks_passed, failed_outputs = run_checks(
+                checks, job_inputs(job), self.check_cache
+            )
             
             if not checks_passed:
                 print(f"[RUNNER] Checks failed!")
@@ -145,7 +140,8 @@ class TaskRunner:
             # Could add more handlers: alert, rollback, etc.
         
         result["job"] = job_name
-        self.results.append(result)
+        with self._results_lock:
+            self.results.append(result)
         
         return result
     
@@ -163,6 +159,7 @@ class TaskRunner:
         """
         job_name = job.get("name", "unknown")
         checks = job.get("checks", [])
+        previous = None
         
         for attempt in range(1, self.max_fix_attempts + 1):
             print(f"[RUNNER] Fix attempt {attempt}/{self.max_fix_attempts}")
@@ -177,8 +174,15 @@ Context:
 
 Suggest a fix or adjustment to make the checks pass.
 Be specific about what needs to change."""
+            if previous:
+                fix_prompt += f"""
+
+This earlier suggestion did not make the checks pass:
+{previous}"""
             
-            suggestion = self.llm.generate_code(fix_prompt)
+            # Direct call, never cached: a suggestion that did not work must
+            # not be replayed when the same error comes back
+            suggestion = self.llm.generate_code(fix_prompt, use_cache=False)
             
             if not suggestion:
                 print(f"[RUNNER] LLM could not generate fix")
@@ -187,13 +191,16 @@ Be specific about what needs to change."""
             print(f"[RUNNER] LLM suggestion: {suggestion[:200]}...")
             
             # Re-run agent with fix context
+            previous = suggestion
             context["fix_suggestion"] = suggestion
             context["fix_attempt"] = attempt
             
             result = agent.execute(context)
             
             # Re-run checks
-            checks_passed, failed_outputs = run_checks(checks)
+            checks_passed, failed_outputs = run_checks(
+                checks, job_inputs(job), self.check_cache
+            )
             
             if checks_passed:
                 print(f"[RUNNER] Fix successful on attempt {attempt}!")
@@ -237,11 +244,32 @@ Be specific about what needs to change."""
         print("=" * 50)
         
         enabled_jobs = [j for j in self.jobs if j.get("enabled", True)]
+        enabled_names = {j.get("name", "unknown") for j in enabled_jobs}
+        # Dependencies on disabled jobs are treated as met
+        enabled_jobs = [
+            {**j, "depends_on": [d for d in job_dependencies(j) if d in enabled_names]}
+            for j in enabled_jobs
+        ]
         
         print(f"Found {len(enabled_jobs)} enabled jobs")
         
-        for job in enabled_jobs:
-            self.run_job(job)
+        scheduler = JobScheduler(
+            self.run_job,
+            max_workers=MAX_PARALLEL_JOBS,
+            resource_limits=self.resource_limits,
+        )
+        started = time.perf_counter()
+        # Scheduler order (topological), including jobs skipped for a failed dependency
+        self.results = list(scheduler.run(enabled_jobs).values())
+        elapsed = time.perf_counter() - started
+        self.check_cache.save()
+        print(
+            f"[RUNNER] Wall time {elapsed:.1f}s, critical path "
+            f"{critical_path(enabled_jobs, scheduler.durations):.1f}s, "
+            f"{self.check_cache.hits} cached check(s)"
+        )
+        if self.llm.is_available():
+            print(f"[RUNNER] LLM: {self.llm.summary()}")
         
         # Summary
         success_count = sum(1 for r in self.results if r.get("status") == "success")
@@ -23,6 +23,12 @@ from html import unescape
 from pathlib import Path
 from dotenv import load_dotenv
 
+sys.path.append(str(Path(__file__).parent.parent.parent / "pipeline_v2"))
+from article_handles import stable_handle, upsert_article
+from article_rules import RuleSet, parse_html
+from http_pool import next_page_url
+from topic_dedup import get_topic_dedup_index
+
 # Load environment
 env_path = Path(__file__).parent.parent.parent / ".env"
 load_dotenv(env_path)
@@ -169,6 +175,25 @@ class BlogContentGenerator:
         self.min_sources = 5
         self.min_blockquotes = 2
 
+        # Content rules compiled once against the thresholds above
+        self.content_rules = RuleSet(
+            sections=(
+                "sections",
+                {
+                    "section_keywords": self.SECTION_KEYWORDS,
+                    "min_sections": self.min_sections,
+                },
+            ),
+            generic=("phrases", {"phrases": self.GENERIC_PHRASES}),
+            contamination=("contamination", {"rules": self.CONTAMINATION_RULES}),
+            off_topic=(
+                "phrases",
+                {"phrases": [p.lower() for p in self.OFF_TOPIC_PHRASES]},
+            ),
+        )
+
+        self._dedup_synced = False
+
         self.required_sections = [
             "Direct Answer",
             "Key Information",
@@ -211,6 +236,87 @@ class BlogContentGenerator:
                         )
         return topics
 
+    def fetch_articles_since(self, updated_at_min=""):
+        """All blog articles (drafts included), optionally only those changed since"""
+        url = f"https://{SHOPIFY_STORE}.myshopify.com/admin/api/2024-04/blogs/{SHOPIFY_BLOG_ID}/articles.json"
+        headers = {"X-Shopify-Access-Token": SHOPIFY_TOKEN}
+        params = {"limit": 250, "fields": "id,title,handle,body_html"}
+        if updated_at_min:
+            params["updated_at_min"] = updated_at_min
+
+        articles = []
+        while url:
+            try:
+                r = requests.get(url, headers=headers, params=params, timeout=60)
+            except Exception as e:
+                self.log(f"Error fetching articles: {e}", "ERROR")
+                break
+            if r.status_code != 200:
+                break
+            articles.extend(r.json().get("articles", []))
+            url = next_page_url(r.headers.get("Link", ""))
+            params = None  # page_info URL already carries the query
+        return articles
+
+    def fetch_article_ids(self):
+        """Ids of all blog articles (drafts included); None if a page failed"""
+        url = f"https://{SHOPIFY_STORE}.myshopify.com/admin/api/2024-04/blogs/{SHOPIFY_BLOG_ID}/articles.json"
+        headers = {"X-Shopify-Access-Token": SHOPIFY_TOKEN}
+        params = {"limit": 250, "fields": "id"}
+
+        ids = set()
+        while url:
+            try:
+                r = requests.get(url, headers=headers, params=params, timeout=60)
+            except Exception as e:
+                self.log(f"Error fetching article ids: {e}", "ERROR")
+                return None
+            if r.status_code != 200:
+                return None
+            ids.update(str(a["id"]) for a in r.json().get("articles", []))
+            url = next_page_url(r.headers.get("Link", ""))
+            params = None  # page_info URL already carries the query
+        return ids
+
+    def dedup_index(self):
+        """Topic near-duplicate index, synced with Shopify once per run"""
+        index = get_topic_dedup_index()
+        if index is not None and not self._dedup_synced:
+            self._dedup_synced = True
+            added = index.sync(self.fetch_articles_since, self.fetch_article_ids)
+            self.log(f"Topic dedup index: {len(index.docs)} articles (+{added} synced)")
+        return index
+
+    def filter_duplicate_topics(self, topics, limit=None):
+        """First `limit` pending topics the blog (or an earlier topic) doesn't cover.
+
+        Only topics that will be generated this run are reserved; the rest
+        are not looked at. Duplicates of a published article are marked
+        status "duplicate" in their .md file so they don't come back as
+        pending; duplicates of a topic reserved this run just wait.
+        """
+        index = self.dedup_index()
+        if index is None:
+            return topics[:limit]
+
+        kept = []
+        for topic in topics:
+            if limit is not None and len(kept) >= limit:
+                break
+            dup = index.find_duplicate(topic["title"])
+            if dup:
+                self.log(
+                    f"Skipping '{topic['title']}': duplicates '{dup['title']}' "
+                    f"(ID {dup['id']}, {dup['match']} {dup['score']:.2f})",
+                    "WARNING",
+                )
+                if not dup["reserved"]:
+                    self.update_topic_status(topic["filepath"], "duplicate")
+                continue
+            index.reserve(topic["title"], key=topic["filename"])
+            kept.append(topic)
+        return kept
+
     def generate_ai_images(self, topic, num_images=4):
         """Generate AI images using Pollinations.ai with CINEMATIC style"""
         self.log(f"Generating {num_images} AI images for: {topic}", "IMAGE")
@@ -509,10 +615,12 @@ class BlogContentGenerator:
         """Comprehensive content validation following META-PROMPT standards"""
         issues = []
         warnings = []
-        text = re.sub(r"<[^>]+>", " ", html or "")
-        text_lower = text.lower()
-        html_lower = (html or "").lower()
+        doc = parse_html(html or "")
+        text = doc.text
+        text_lower = doc.text_lower
+        html_lower = doc.html_lower
         topic_lower = topic.lower()
+        rules = self.content_rules.evaluate(html or "", title=topic)
 
         # ==================== CRITICAL CHECKS ====================
 
@@ -533,7 +641,7 @@ class BlogContentGenerator:
 
         # ==================== WORD COUNT CHECK ====================
 
-        word_count = len(text.split())
+        word_count = doc.word_count
         if word_count < self.min_word_count:
             issues.append(
                 f"Word count too low: {word_count} (min: {self.min_word_count})"
@@ -545,33 +653,17 @@ class BlogContentGenerator:
 
         # ==================== SECTION STRUCTURE CHECK ====================
 
-        headings = re.findall(r"<h[23][^>]*>([^<]+)</h[23]>", html, re.I)
-        heading_texts = [h.lower() for h in headings]
-
-        found_sections = []
-        missing_sections = []
+        found_sections = rules["sections"]["found"]
+        missing_sections = rules["sections"]["missing"]
 
-        for section, keywords in self.SECTION_KEYWORDS.items():
-            found = False
-            for heading in heading_texts:
-                if any(kw in heading for kw in keywords):
-                    found = True
-                    found_sections.append(section)
-                    break
-            if not found:
-                missing_sections.append(section)
-
-        if len(found_sections) < self.min_sections:
+        if not rules["sections"]["pass"]:
             issues.append(
                 f"Missing sections ({len(found_sections)}/{self.min_sections}): {', '.join(missing_sections[:3])}"
             )
 
         # ==================== GENERIC CONTENT CHECK ====================
 
-        found_generic = []
-        for phrase in self.GENERIC_PHRASES:
-            if phrase in text_lower:
-                found_generic.append(phrase)
+        found_generic = rules["generic"]["found"]
 
         if len(found_generic) >= 2:
             issues.append(f"Generic content detected: '{found_generic[0][:30]}...'")
@@ -580,30 +672,27 @@ class BlogContentGenerator:
 
         # ==================== TOPIC CONTAMINATION CHECK ====================
 
-        contamination_issues = []
-        for topic_key, bad_words in self.CONTAMINATION_RULES.items():
-            if topic_key in topic_lower:
-                for word in bad_words:
-                    if word in text_lower:
-                        contamination_issues.append(
-                            f"'{word}' in '{topic_key}' article"
-                        )
+        contamination_issues = [
+            f"'{word}' in '{topic_key}' article"
+            for topic_key, word in rules["contamination"]["matches"]
+        ]
 
         if contamination_issues:
             issues.append(f"Off-topic content: {contamination_issues[0]}")
 
         # Check OFF_TOPIC_PHRASES (from slow_careful_fix.py)
-        found_off_topic = []
-        for phrase in self.OFF_TOPIC_PHRASES:
-            if phrase.lower() in text_lower and phrase.lower() not in topic_lower:
-                found_off_topic.append(phrase)
+        found_off_topic = [
+            phrase
+            for phrase in rules["off_topic"]["found"]
+            if phrase not in topic_lower
+        ]
 
         if found_off_topic:
             issues.append(f"Off-topic phrase detected: '{found_off_topic[0]}'")
 
         # ==================== IMAGE CHECKS ====================
 
-        img_urls = re.findall(r'<img[^>]+src=["\']([^"\']+)["\']', html or "")
+        img_urls = [img["src"] for img in doc.images if img["src"]]
         img_count = len(img_urls)
 
         if img_count < self.min_images:
@@ -637,7 +726,7 @@ class BlogContentGenerator:
 
         # ==================== BLOCKQUOTE CHECK ====================
 
-        blockquote_count = html.count("<blockquote") if html else 0
+        blockquote_count = doc.count("blockquote")
         if blockquote_count < self.min_blockquotes:
             warnings.append(
                 f"Few blockquotes: {blockquote_count} (recommended: {self.min_blockquotes})"
@@ -645,7 +734,7 @@ class BlogContentGenerator:
 
         # ==================== TABLE CHECK ====================
 
-        table_count = html.count("<table") if html else 0
+        table_count = doc.count("table")
         if table_count < 1:
             warnings.append("No comparison table found")
 
@@ -1751,14 +1840,14 @@ class BlogContentGenerator:
         """Publish article to Shopify as draft"""
         self.log(f"Publishing to Shopify: {title}")
 
-        url = f"https://{SHOPIFY_STORE}.myshopify.com/admin/api/2024-04/blogs/{SHOPIFY_BLOG_ID}/articles.json"
+        api_base = f"https://{SHOPIFY_STORE}.myshopify.com/admin/api/2024-04"
         headers = {
             "X-Shopify-Access-Token": SHOPIFY_TOKEN,
             "Content-Type": "application/json",
         }
 
-        # Clean handle
-        handle = re.sub(r"[^a-z0-9-]", "", title.lower().replace(" ", "-"))[:200]
+        # Stable handle: a re-run for the same title updates, never duplicates
+        handle = stable_handle(title)
 
         # Generate meta description if not provided
         if not meta_description:
@@ -1784,18 +1873,22 @@ class BlogContentGenerator:
             payload["article"]["image"] = {"src": featured_image}
 
         try:
-            response = requests.post(url, json=payload, headers=headers)
-
-            if response.status_code == 201:
-                article_id = response.json()["article"]["id"]
+            article, created = upsert_article(
+                api_base, SHOPIFY_BLOG_ID, payload["article"], headers
+            )
+            article_id = article["id"]
+            if created:
                 self.log(f"Published! Article ID: {article_id}", "SUCCESS")
-                return article_id
             else:
                 self.log(
-                    f"Publish failed: {response.status_code} - {response.text}", "ERROR"
+                    f"Handle already published - updated Article ID: {article_id}",
+                    "SUCCESS",
                 )
-                return None
+            return article_id
 
+        except RuntimeError as e:
+            self.log(f"Publish failed: {e}", "ERROR")
+            return None
         except Exception as e:
             self.log(f"Publish error: {e}", "ERROR")
             return None
@@ -1831,6 +1924,20 @@ class BlogContentGenerator:
             else topic_file.replace(".md", "").replace("_", " ")
         )
 
+        # Near-duplicate check before any image/content generation
+        index = self.dedup_index()
+        if index is not None:
+            dup = index.find_duplicate(title, exclude_ids={f"reserved:{topic_file}"})
+            if dup:
+                self.log(
+                    f"Topic duplicates '{dup['title']}' (ID {dup['id']}, "
+                    f"{dup['match']} {dup['score']:.2f}), skipping",
+                    "WARNING",
+                )
+                if not dup["reserved"]:
+                    self.update_topic_status(filepath, "duplicate")
+                return None
+
         self.log(f"\n{'='*60}")
         self.log(f"Generating blog: {title}")
         self.log(f"Category: {self.detect_topic_category(title)}")
@@ -1961,6 +2068,9 @@ class BlogContentGenerator:
         # Update topic status
         if article_id:
             self.update_topic_status(filepath, "completed", article_id)
+            if index is not None:
+                index.upsert([{"id": article_id, "title": title}])
+                index.save()
 
             # Save quality report
             report = self.generate_quality_report(article_id, title, html_content)
@@ -1975,7 +2085,7 @@ class BlogContentGenerator:
 
     def generate_batch(self, count=5):
         """Generate content for multiple topics"""
-        topics = self.get_pending_topics()[:count]
+        topics = self.filter_duplicate_topics(self.get_pending_topics(), limit=count)
 
         self.log(f"\n{'='*60}")
         self.log(f"Batch generating {len(topics)} blogs")
@@ -41,10 +41,8 @@ except ImportError:
     print("⚠️ requests not installed. Run: pip install requests")
     sys.exit(1)
 
-try:
-    from bs4 import BeautifulSoup
-except ImportError:
-    BeautifulSoup = None
+sys.path.insert(0, str(Path(__file__).parent))
+from article_rules import summarize_html
 
 # ── Environment / Keys ──────────────────────────────────────────────
 GEMINI_API_KEY = os.environ.get("GEMINI_API_KEY", "") or os.environ.get(
@@ -93,13 +91,8 @@ TARGET_WORDS = 2200  # We aim for this (buffer above minimum)
 
 
 def _word_count(html: str) -> int:
-    """Count words in HTML content."""
-    if BeautifulSoup:
-        soup = BeautifulSoup(html, "html.parser")
-        text = soup.get_text(separator=" ", strip=True)
-    else:
-        text = re.sub(r"<[^>]+>", " ", html)
-    return len(text.split())
+    """Count words in HTML content (cached streaming summary, no DOM)."""
+    return summarize_html(html or "").word_count
 
 
 def _mask_secrets(text: str) -> str:
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""article_handles.py — Deterministic handles and idempotent article publish.
+
+batch_autopublish.generate_handle appended random.randint(1000, 9999) and
+BlogContentGenerator.publish_to_shopify POSTed unconditionally, so a retry
+after a timeout (the first POST may well have succeeded) created a second
+copy of the article, later removed by cleanup_duplicates.py /
+delete_batch_only.py.
+
+Here every topic gets one stable handle (slug of the title), and
+upsert_article looks the handle up before creating:
+
+    1. local index (article_handles.json: handle -> article id)
+    2. Shopify: GET blogs/<blog>/articles.json?handle=<handle>
+    3. only when both miss: POST; the new id is recorded immediately
+
+A hit becomes a PUT of the same payload (blogs/<blog>/articles/<id>.json),
+so repeating a publish is safe and costs one update instead of a duplicate
+plus a cleanup sweep. The handle is only re-created when a GET confirms
+the indexed article was deleted on Shopify.
+
+CLI:
+    python article_handles.py stats
+    python article_handles.py handle "<title>"
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import sys
+import threading
+import time
+from pathlib import Path
+
+try:
+    import requests
+except ImportError:  # resolved at call time; module stays importable
+    requests = None
+
+PIPELINE_DIR = Path(__file__).parent
+HANDLE_INDEX_FILE = Path(
+    os.environ.get(
+        "ARTICLE_HANDLE_INDEX_FILE", str(PIPELINE_DIR / "article_handles.json")
+    )
+)
+INDEX_VERSION = 1
+MAX_HANDLE_LENGTH = 200
+
+
+def stable_handle(title: str, max_length: int = MAX_HANDLE_LENGTH) -> str:
+    """URL handle derived only from the title (same title -> same handle)."""
+    handle = title.lower()
+    handle = re.sub(r"[^a-z0-9\s-]", "", handle)
+    handle = re.sub(r"\s+", "-", handle)
+    handle = re.sub(r"-+", "-", handle)
+    return handle.strip("-")[:max_length].rstrip("-")
+
+
+def _same_title(a: str, b: str) -> bool:
+    return " ".join((a or "").lower().split()) == " ".join((b or "").lower().split())
+
+
+class HandleIndex:
+    """Local handle -> article id map (JSON, atomic writes)."""
+
+    def __init__(self, path: Path = HANDLE_INDEX_FILE):
+        self.path = Path(path)
+        self.handles: dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        try:
+            payload = json.loads(self.path.read_text(encoding="utf-8"))
+        except (json.JSONDecodeError, OSError):
+            return
+        if payload.get("version") != INDEX_VERSION:
+            return
+        self.handles = payload.get("handles", {}) or {}
+
+    def save(self) -> None:
+        with self._lock:
+            payload = {"version": INDEX_VERSION, "handles": dict(self.handles)}
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        try:
+            tmp_path.write_text(
+                json.dumps(payload, ensure_ascii=False, indent=1), encoding="utf-8"
+            )
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"⚠️ handle index save failed: {e}")
+
+    def lookup(self, blog_id, handle: str) -> dict | None:
+        with self._lock:
+            return self.handles.get(f"{blog_id}/{handle}")
+
+    def record(self, blog_id, handle: str, article_id, title: str = "") -> None:
+        with self._lock:
+            self.handles[f"{blog_id}/{handle}"] = {
+                "article_id": article_id,
+                "title": title,
+                "ts": int(time.time()),
+            }
+        self.save()
+
+    def forget(self, blog_id, handle: str) -> None:
+        with self._lock:
+            removed = self.handles.pop(f"{blog_id}/{handle}", None)
+        if removed is not None:
+            self.save()
+
+
+_shared_index: HandleIndex | None = None
+
+
+def get_handle_index() -> HandleIndex:
+    """Process-wide handle index (loaded from disk once)."""
+    global _shared_index
+    if _shared_index is None:
+        _shared_index = HandleIndex()
+    return _shared_index
+
+
+def find_article_by_handle(
+    api_base: str, blog_id, handle: str, headers: dict, timeout: int = 30
+) -> dict | None:
+    """Existing article with this handle on Shopify, or None."""
+    resp = requests.get(
+        f"{api_base}/blogs/{blog_id}/articles.json",
+        headers=headers,
+        params={"handle": handle, "fields": "id,title,handle"},
+        timeout=timeout,
+    )
+    if resp.status_code != 200:
+        raise RuntimeError(f"Handle lookup failed: {resp.status_code}")
+    for article in resp.json().get("articles", []):
+        if article.get("handle") == handle:
+            return article
+    return None
+
+
+def _article_exists(article_url: str, headers: dict, timeout: int = 30) -> bool:
+    """False only when Shopify confirms the article is gone (404)."""
+    resp = requests.get(
+        article_url, headers=headers, params={"fields": "id"}, timeout=timeout
+    )
+    return resp.status_code != 404
+
+
+def upsert_article(
+    api_base: str,
+    blog_id,
+    article: dict,
+    headers: dict,
+    index: HandleIndex | None = None,
+    timeout: int = 60,
+) -> tuple[dict, bool]:
+    """Create the article, or update it if its handle was already published.
+
+    ``api_base`` is "https://<shop>.myshopify.com/admin/api/<version>" and
+    ``article`` the payload's "article" object (must carry "handle").
+    Returns (Shopify article, created). Raises RuntimeError on API errors.
+    """
+    if requests is None:
+        raise RuntimeError("requests is not installed")
+    index = index or get_handle_index()
+    handle = article["handle"]
+    title = article.get("title", "")
+
+    known = index.lookup(blog_id, handle)
+    existing_id = known["article_id"] if known else None
+    if existing_id is None:
+        found = find_article_by_handle(api_base, blog_id, handle, headers)
+        # Same handle but a different title is someone else's article;
+        # let Shopify suffix the new handle instead of overwriting it
+        if found and _same_title(found.get("title", ""), title):
+            existing_id = found["id"]
+
+    if existing_id is not None:
+        article_url = f"{api_base}/blogs/{blog_id}/articles/{existing_id}.json"
+        resp = requests.put(
+            article_url,
+            headers=headers,
+            json={"article": article},
+            timeout=timeout,
+        )
+        if resp.status_code == 200:
+            updated = resp.json()["article"]
+            index.record(blog_id, handle, updated["id"], title)
+            return updated, False
+        if resp.status_code != 404 or _article_exists(article_url, headers, timeout):
+            raise RuntimeError(
+                f"Failed to update article {existing_id}: {resp.status_code} - {resp.text}"
+            )
+        # Deleted on Shopify since it was indexed; create it again
+        index.forget(blog_id, handle)
+
+    resp = requests.post(
+        f"{api_base}/blogs/{blog_id}/articles.json",
+        headers=headers,
+        json={"article": article},
+        timeout=timeout,
+    )
+    if resp.status_code != 201:
+        raise RuntimeError(
+            f"Failed to create article: {resp.status_code} - {resp.text}"
+        )
+    created = resp.json()["article"]
+    index.record(blog_id, handle, created["id"], title)
+    return created, True
+
+
+def main():
+    if len(sys.argv) > 2 and sys.argv[1] == "handle":
+        print(stable_handle(sys.argv[2]))
+        return
+    index = get_handle_index()
+    print(f"Handle index: {index.path}")
+    print(f"Handles: {len(index.handles)}")
+
+
+if __name__ == "__main__":
+    main()
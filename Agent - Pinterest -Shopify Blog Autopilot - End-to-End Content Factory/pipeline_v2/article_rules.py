@@ -0,0 +1,550 @@
+#!/usr/bin/env python3
+"""article_rules.py — Shared article document + declared META-PROMPT rules.
+
+QualityGate, pre_publish_review, BlogContentGenerator.validate_content,
+QualityAgent, MetaPromptQualityAgent and validate_article.py each re-parsed
+the same body_html (BeautifulSoup trees, tag-strip regexes, str.count of
+raw markup) to measure the same things: word count, headings, links,
+images, blockquotes, tables, the Sources section, generic phrases.
+
+This module does the parsing once:
+
+    ArticleDocument   one html.parser pass over body_html collecting text,
+                      headings, links (with the H2 section they sit in),
+                      images, paragraphs, blockquotes and tag counts
+    parse_html(body)  process-wide cache, so every validator that looks at
+                      the same body in one run shares one traversal
+
+and declares the rules once as functions of a document (RULES). A RuleSet
+binds rules to a validator's own thresholds/phrase lists up front and
+evaluates them against the shared document; each validator keeps a thin
+adapter that turns the results into its existing report shape.
+
+    GATE_RULES = RuleSet(
+        word_count=("word_count", {"min_words": 1800, "max_words": 2500}),
+        generic=("phrases", {"phrases": GENERIC_PHRASES}),
+    )
+    results = GATE_RULES.evaluate(body_html, title=title)
+    results["word_count"]["pass"]
+
+Fixers that only need numbers (word count, heading outline, link/image
+inventory, blockquote/table counts) use summarize_html(), a small cached
+HtmlSummary, and only build a BeautifulSoup tree when they actually edit.
+"""
+
+from __future__ import annotations
+
+import inspect
+import re
+from collections import Counter
+from dataclasses import dataclass
+from functools import lru_cache
+from html.parser import HTMLParser
+from typing import Callable, NamedTuple
+
+# Text inside these elements is not visible content
+HIDDEN_TEXT_TAGS = {"style", "script", "template", "noscript"}
+VOID_TAGS = {"br", "hr", "img", "meta", "link", "input", "source", "wbr", "col"}
+HEADING_TAGS = {"h1", "h2", "h3", "h4", "h5", "h6"}
+# Elements whose text is captured (headings, links, paragraphs, quotes, list items)
+CAPTURE_TAGS = HEADING_TAGS | {"a", "p", "blockquote", "li", "figcaption"}
+
+KEBAB_RE = re.compile(r"^[a-z0-9]+(?:-[a-z0-9]+)*$")
+RAW_URL_TEXT_RE = re.compile(r"\s*https?://|\s*\S+\.(com|org|edu|gov)")
+YEAR_RE = re.compile(r"\b(19|20)\d{2}\b")
+
+
+class ArticleDocument(HTMLParser):
+    """Single-pass, tree-free view of an article body."""
+
+    def __init__(self, html: str):
+        super().__init__(convert_charrefs=True)
+        self.html = html or ""
+        self.tag_counts: Counter = Counter()
+        self.text_nodes: list[str] = []
+        self.headings: list[dict] = []
+        self.links: list[dict] = []
+        self.images: list[dict] = []
+        self.paragraphs: list[dict] = []
+        self.blockquotes: list[str] = []
+        self.list_items: list[dict] = []
+        self.ids: list[str] = []
+        self._hidden_depth = 0
+        self._h2_index = -1
+        self._frames: list[dict] = []
+        self.feed(self.html)
+        self.close()
+
+    # ------------------------------------------------------------------
+    # Parser callbacks
+    # ------------------------------------------------------------------
+    def handle_starttag(self, tag, attrs):
+        attr_map = {name: (value or "") for name, value in attrs}
+        self.tag_counts[tag] += 1
+        if attr_map.get("id"):
+            self.ids.append(attr_map["id"])
+        for frame in self._frames:
+            frame["children"] += 1
+
+        if tag in HIDDEN_TEXT_TAGS:
+            self._hidden_depth += 1
+        elif tag == "img":
+            self.images.append(
+                {
+                    "src": attr_map.get("src", ""),
+                    "alt": attr_map.get("alt", ""),
+                    "has_alt": "alt" in attr_map,
+                    "h2_index": self._h2_index,
+                }
+            )
+        if tag == "h2":
+            self._h2_index += 1
+        if tag in CAPTURE_TAGS:
+            self._frames.append(
+                {"tag": tag, "attrs": attr_map, "parts": [], "children": 0}
+            )
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if tag in HIDDEN_TEXT_TAGS:
+            self._hidden_depth = max(0, self._hidden_depth - 1)
+            return
+        if tag not in CAPTURE_TAGS:
+            return
+        for idx in range(len(self._frames) - 1, -1, -1):
+            if self._frames[idx]["tag"] == tag:
+                # Implicitly close anything opened inside (e.g. unclosed <li>)
+                while len(self._frames) > idx:
+                    self._finish(self._frames.pop())
+                break
+
+    def handle_data(self, data):
+        if self._hidden_depth:
+            return
+        text = data.strip()
+        if not text:
+            return
+        self.text_nodes.append(text)
+        for frame in self._frames:
+            frame["parts"].append(text)
+
+    def close(self):
+        super().close()
+        while self._frames:
+            self._finish(self._frames.pop())
+
+    def _finish(self, frame: dict) -> None:
+        tag = frame["tag"]
+        attrs = frame["attrs"]
+        text = " ".join(frame["parts"])
+        if tag in HEADING_TAGS:
+            self.headings.append(
+                {
+                    "level": int(tag[1]),
+                    "id": attrs.get("id", ""),
+                    "has_id": "id" in attrs,
+                    "text": text,
+                    "h2_index": self._h2_index,
+                }
+            )
+        elif tag == "a":
+            self.links.append(
+                {
+                    "href": attrs.get("href", "").strip(),
+                    "rel": attrs.get("rel", ""),
+                    "target": attrs.get("target", ""),
+                    "text": text,
+                    "h2_index": self._h2_index,
+                }
+            )
+        elif tag == "p":
+            self.paragraphs.append(
+                {"text": text, "empty": not text and not frame["children"]}
+            )
+        elif tag == "blockquote":
+            self.blockquotes.append(text)
+        elif tag == "li":
+            self.list_items.append({"text": text, "h2_index": self._h2_index})
+
+    # ------------------------------------------------------------------
+    # Derived views (computed on first use)
+    # ------------------------------------------------------------------
+    @property
+    def text(self) -> str:
+        """Visible text, same as soup.get_text(" ", strip=True)."""
+        if not hasattr(self, "_text"):
+            self._text = " ".join(self.text_nodes)
+        return self._text
+
+    @property
+    def text_lower(self) -> str:
+        if not hasattr(self, "_text_lower"):
+            self._text_lower = self.text.lower()
+        return self._text_lower
+
+    @property
+    def html_lower(self) -> str:
+        if not hasattr(self, "_html_lower"):
+            self._html_lower = self.html.lower()
+        return self._html_lower
+
+    @property
+    def word_count(self) -> int:
+        if not hasattr(self, "_word_count"):
+            self._word_count = len(self.text.split())
+        return self._word_count
+
+    def count(self, *tags: str) -> int:
+        return sum(self.tag_counts.get(tag, 0) for tag in tags)
+
+    def headings_at(self, *levels: int) -> list[dict]:
+        return [h for h in self.headings if h["level"] in levels]
+
+    def h2_titles(self) -> list[dict]:
+        """H2 headings in document order (index matches link/image h2_index)."""
+        return sorted(self.headings_at(2), key=lambda h: h["h2_index"])
+
+    def section_index(self, predicate: Callable[[dict], bool]) -> int:
+        """h2_index of the first H2 matching predicate, or -1."""
+        for heading in self.h2_titles():
+            if predicate(heading):
+                return heading["h2_index"]
+        return -1
+
+    def links_in_section(self, h2_index: int) -> list[dict]:
+        if h2_index < 0:
+            return []
+        return [link for link in self.links if link["h2_index"] == h2_index]
+
+
+@lru_cache(maxsize=32)
+def parse_html(body_html: str) -> ArticleDocument:
+    """Shared parse of one body; validators in the same process reuse it."""
+    return ArticleDocument(body_html or "")
+
+
+class HtmlSummary(NamedTuple):
+    """Numbers-only view of a body (no text nodes kept)."""
+
+    word_count: int
+    outline: tuple  # ((level, id, text), ...) in document order
+    links: tuple  # ((href, rel, text), ...)
+    images: tuple  # ((src, alt), ...)
+    blockquotes: int
+    tables: int
+    paragraphs: int
+    first_paragraph: str
+
+
+@lru_cache(maxsize=256)
+def summarize_html(body_html: str) -> HtmlSummary:
+    """Cached one-pass summary of body_html (word count, outline, inventories)."""
+    doc = parse_html(body_html or "")
+    return HtmlSummary(
+        word_count=doc.word_count,
+        outline=tuple((h["level"], h["id"], h["text"]) for h in doc.headings),
+        links=tuple((l["href"], l["rel"], l["text"]) for l in doc.links),
+        images=tuple((img["src"], img["alt"]) for img in doc.images),
+        blockquotes=doc.count("blockquote"),
+        tables=doc.count("table"),
+        paragraphs=doc.count("p"),
+        first_paragraph=doc.paragraphs[0]["text"] if doc.paragraphs else "",
+    )
+
+
+def count_words(html: str) -> int:
+    """Visible word count of a fragment (uncached; for one-off fragments)."""
+    return ArticleDocument(html or "").word_count
+
+
+# ============================================================================
+# Rules
+# ============================================================================
+@dataclass(frozen=True)
+class Rule:
+    name: str
+    description: str
+    check: Callable[..., dict]
+
+
+RULES: dict[str, Rule] = {}
+
+
+def rule(name: str, description: str):
+    def register(fn):
+        RULES[name] = Rule(name, description, fn)
+        return fn
+
+    return register
+
+
+@rule("word_count", "Visible word count within [min_words, max_words]")
+def rule_word_count(doc: ArticleDocument, min_words: int = 0, max_words: int = 0):
+    count = doc.word_count
+    return {
+        "pass": count >= min_words and (not max_words or count <= max_words),
+        "word_count": count,
+        "min": min_words,
+        "max": max_words,
+    }
+
+
+@rule("sections", "META-PROMPT sections found by H2/H3 keywords")
+def rule_sections(
+    doc: ArticleDocument,
+    section_keywords: dict,
+    min_sections: int,
+    levels: tuple = (2, 3),
+):
+    heading_texts = [h["text"].lower() for h in doc.headings_at(*levels)]
+    found, missing = [], []
+    for section, keywords in section_keywords.items():
+        if any(any(kw in heading for kw in keywords) for heading in heading_texts):
+            found.append(section)
+        else:
+            missing.append(section)
+    return {
+        "pass": len(found) >= min_sections,
+        "found": found,
+        "missing": missing,
+        "score": len(found),
+    }
+
+
+@rule("phrases", "Banned/generic phrases present in the body")
+def rule_phrases(doc: ArticleDocument, phrases: tuple, field: str = "text"):
+    haystack = doc.text_lower if field == "text" else doc.html_lower
+    found = [phrase for phrase in phrases if phrase in haystack]
+    return {"pass": not found, "found": found}
+
+
+@rule("contamination", "Words from another topic's template")
+def rule_contamination(
+    doc: ArticleDocument, rules: dict, title: str = "", field: str = "text"
+):
+    haystack = doc.text_lower if field == "text" else doc.html_lower
+    title_lower = (title or "").lower()
+    matches = [
+        (topic, word)
+        for topic, bad_words in rules.items()
+        if topic in title_lower
+        for word in bad_words
+        if word in haystack
+    ]
+    issues = [f"'{word}' found in '{topic}' article" for topic, word in matches]
+    return {"pass": not issues, "issues": issues, "matches": matches}
+
+
+@rule("title_spam", "Title / title fragments repeated, keyword stuffing")
+def rule_title_spam(
+    doc: ArticleDocument,
+    title: str = "",
+    field: str = "text",
+    fragment_min_len: int = 3,
+    max_title: int = 3,
+    max_fragment: int = 5,
+):
+    haystack = doc.text_lower if field == "text" else doc.html_lower
+    title_lower = (title or "").lower().strip()
+    result = {
+        "pass": True,
+        "issues": [],
+        "title_count": 0,
+        "fragments": {},
+        "keyword_stuffing": False,
+    }
+    if not title_lower:
+        return result
+
+    result["title_count"] = haystack.count(title_lower)
+    fragment_words = [w for w in title_lower.split() if len(w) >= fragment_min_len]
+    if len(fragment_words) >= 4:
+        fragments = [" ".join(fragment_words[:4])]
+        if len(fragment_words) >= 8:
+            fragments.append(" ".join(fragment_words[-4:]))
+        result["fragments"] = {frag: haystack.count(frag) for frag in fragments}
+    keyword_words = [w for w in title_lower.split() if len(w) > 2]
+    if len(keyword_words) >= 3:
+        result["keyword_stuffing"] = ", ".join(keyword_words[:3]) in haystack
+
+    if result["title_count"] > max_title:
+        result["issues"].append(
+            f"Title repeated {result['title_count']}x (max {max_title})"
+        )
+    for frag, count in result["fragments"].items():
+        if count > max_fragment:
+            result["issues"].append(
+                f"Title fragment '{frag}' repeated {count}x (max {max_fragment})"
+            )
+    if result["keyword_stuffing"]:
+        result["issues"].append(
+            "Keyword stuffing detected (comma-separated title words)"
+        )
+    result["pass"] = not result["issues"]
+    return result
+
+
+@rule("images", "Inline + featured images: unique count, duplicates, hosts")
+def rule_images(
+    doc: ArticleDocument, min_images: int = 0, featured_image_url: str = ""
+):
+    urls = [img["src"] for img in doc.images if img["src"]]
+    if featured_image_url:
+        urls.append(featured_image_url)
+    counts = Counter(urls)
+    duplicates = [url for url, n in counts.items() if n > 1]
+    unique = len(counts)
+    return {
+        "pass": unique >= min_images and not duplicates,
+        "urls": urls,
+        "unique_images": unique,
+        "min_required": min_images,
+        "duplicates": duplicates,
+        "has_pinterest": any("pinimg.com" in url for url in urls),
+        "has_shopify_cdn": any("cdn.shopify.com" in url for url in urls),
+        "has_featured": bool(featured_image_url),
+    }
+
+
+@rule("image_attributes", "Inline images have alt text and https src")
+def rule_image_attributes(doc: ArticleDocument):
+    missing_alt = [img["src"] for img in doc.images if not img["alt"].strip()]
+    missing_src = sum(1 for img in doc.images if not img["src"])
+    non_https = [
+        img["src"] for img in doc.images if not img["src"].startswith("https://")
+    ]
+    return {
+        "pass": not missing_alt and not non_https,
+        "count": len(doc.images),
+        "missing_alt": missing_alt,
+        "missing_src": missing_src,
+        "non_https": non_https,
+    }
+
+
+@rule("raw_urls", "URLs/domains shown as visible text")
+def rule_raw_urls(doc: ArticleDocument):
+    raw = [node for node in doc.text_nodes if RAW_URL_TEXT_RE.match(node)]
+    return {"pass": not raw, "count": len(raw), "samples": raw[:5]}
+
+
+@rule("sources", "Sources section exists with enough links, no visible raw URLs")
+def rule_sources(doc: ArticleDocument, min_sources: int = 5):
+    has_sources = "sources" in doc.html_lower or "further reading" in doc.html_lower
+    section = doc.section_index(
+        lambda h: "source" in h["text"].lower() or "reading" in h["text"].lower()
+    )
+    links = doc.links_in_section(section)
+    raw_urls = rule_raw_urls(doc)["count"]
+    return {
+        "pass": has_sources and raw_urls == 0 and len(links) >= min_sources,
+        "has_sources_section": has_sources,
+        "section_found": section >= 0,
+        "raw_urls_visible": raw_urls,
+        "source_links_count": len(links),
+        "source_links": links,
+        "min_required": min_sources,
+    }
+
+
+@rule("heading_ids", "H2/H3 carry unique kebab-case ids")
+def rule_heading_ids(doc: ArticleDocument):
+    headings = doc.headings_at(2, 3)
+    ids = [h["id"] for h in headings if h["id"]]
+    missing = [h["text"][:60] for h in headings if not h["id"]]
+    not_kebab = [i for i in ids if not KEBAB_RE.match(i)]
+    duplicate = len(ids) != len(set(ids))
+    return {
+        "pass": not missing and not not_kebab and not duplicate,
+        "ids": ids,
+        "missing": missing,
+        "not_kebab": not_kebab,
+        "duplicate": duplicate,
+    }
+
+
+@rule("link_attributes", "Outbound links are absolute https with rel nofollow+noopener")
+def rule_link_attributes(doc: ArticleDocument, internal_markers: tuple = ()):
+    non_https, missing_rel = [], []
+    for link in doc.links:
+        href = link["href"]
+        if href.startswith("#"):
+            continue
+        if not href.startswith("https://"):
+            non_https.append(href)
+        if internal_markers and any(m in href for m in internal_markers):
+            continue
+        rel = set(link["rel"].lower().split())
+        if "nofollow" not in rel or "noopener" not in rel:
+            missing_rel.append(href)
+    return {
+        "pass": not non_https and not missing_rel,
+        "non_https": non_https,
+        "missing_rel": missing_rel,
+    }
+
+
+@rule("counts", "Element counts (paragraphs, lists, quotes, tables, figures, ...)")
+def rule_counts(doc: ArticleDocument):
+    return {
+        "pass": True,
+        "h2": doc.count("h2"),
+        "h3": doc.count("h3"),
+        "p": doc.count("p"),
+        "empty_p": sum(1 for p in doc.paragraphs if p["empty"]),
+        "lists": doc.count("ul", "ol"),
+        "blockquotes": doc.count("blockquote"),
+        "tables": doc.count("table"),
+        "figures": doc.count("figure"),
+        "images": len(doc.images),
+        "links": len(doc.links),
+    }
+
+
+@rule("years", "Year tokens (19xx/20xx) in visible text")
+def rule_years(doc: ArticleDocument):
+    years = [m.group(0) for m in YEAR_RE.finditer(doc.text)]
+    return {"pass": not years, "years": years}
+
+
+# ============================================================================
+# Rule sets (one per validator)
+# ============================================================================
+class RuleSet:
+    """A validator's rules, bound to its thresholds once.
+
+    Each entry is alias=(rule_name, static_params). Static params are frozen
+    at construction (phrase lists become tuples); per-article context such
+    as title or featured_image_url is passed to evaluate() and routed only
+    to the rules that accept it.
+    """
+
+    def __init__(self, **entries: tuple):
+        self.entries: dict[str, tuple] = {}
+        for alias, (rule_name, params) in entries.items():
+            spec = RULES[rule_name]
+            static = {
+                key: tuple(value) if isinstance(value, list) else value
+                for key, value in (params or {}).items()
+            }
+            accepted = set(inspect.signature(spec.check).parameters) - {"doc"}
+            self.entries[alias] = (spec, static, accepted - set(static))
+
+    def evaluate(
+        self, body_html: str, only: tuple | None = None, **context
+    ) -> dict[str, dict]:
+        doc = parse_html(body_html or "")
+        results = {}
+        for alias, (spec, static, dynamic_keys) in self.entries.items():
+            if only and alias not in only:
+                continue
+            dynamic = {k: v for k, v in context.items() if k in dynamic_keys}
+            results[alias] = spec.check(doc, **static, **dynamic)
+        return results
+
+    def check(self, alias: str, body_html: str, **context) -> dict:
+        return self.evaluate(body_html, only=(alias,), **context)[alias]
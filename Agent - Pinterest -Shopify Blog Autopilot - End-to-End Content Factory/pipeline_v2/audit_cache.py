@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""audit_cache.py — Persistent audit-result cache keyed by article content.
+
+QualityGate.full_audit, pre_publish_review.review_article and
+MetaPromptQualityAgent.audit_article re-run every check on every pass, even
+when nothing in the article changed. This cache stores the last result of
+each validator per article under two hashes:
+
+    content_hash  sha256 of title, body_html, summary_html and image
+                  (plus any extra fields the validator reads)
+    rules_hash    sha256 of the anti-drift spec + goldens (the same
+                  spec_hash / goldens_hash written to anti_drift_run_log.csv)
+                  and the validator's own source file
+
+A result is reused only when both hashes match, so editing an article, the
+spec, the goldens or the validator code all force a re-check.
+
+Environment:
+    AUDIT_CACHE_FILE      override cache location (default pipeline_v2/audit_cache.json)
+    AUDIT_CACHE_DISABLED  set to 1/true/yes to bypass the cache entirely
+"""
+
+from __future__ import annotations
+
+import atexit
+import copy
+import hashlib
+import json
+import os
+from datetime import datetime, timedelta
+from pathlib import Path
+
+PIPELINE_DIR = Path(__file__).parent
+AUDIT_CACHE_FILE = Path(
+    os.environ.get("AUDIT_CACHE_FILE", str(PIPELINE_DIR / "audit_cache.json"))
+)
+ANTI_DRIFT_SPEC_FILE = PIPELINE_DIR / "anti_drift_spec_v1.md"
+ANTI_DRIFT_GOLDENS_FILE = PIPELINE_DIR / "anti_drift_goldens_12.json"
+
+CACHE_VERSION = 1
+DEFAULT_CONTENT_FIELDS = ("title", "body_html", "summary_html", "image")
+
+
+def _file_sha256(path: Path) -> str:
+    path = Path(path)
+    if not path.exists():
+        return ""
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(8192), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def content_hash(article: dict, fields: tuple = DEFAULT_CONTENT_FIELDS) -> str:
+    """Stable hash of the article fields a validator reads."""
+    payload = {name: article.get(name) for name in fields}
+    raw = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def rules_hash(*source_files: str | Path | None) -> str:
+    """Hash of the rule set: spec + goldens + the validator's source file(s)."""
+    parts = [
+        _file_sha256(ANTI_DRIFT_SPEC_FILE),
+        _file_sha256(ANTI_DRIFT_GOLDENS_FILE),
+        *(_file_sha256(Path(f)) if f else "" for f in source_files),
+        str(CACHE_VERSION),
+    ]
+    return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()
+
+
+def cache_disabled() -> bool:
+    return os.environ.get("AUDIT_CACHE_DISABLED", "").lower() in {"1", "true", "yes"}
+
+
+class AuditCache:
+    """JSON-backed store: {namespace: {article_id: entry}}.
+
+    Only the latest entry per (namespace, article_id) is kept, so the file
+    grows with the number of articles, not the number of scans.
+    """
+
+    def __init__(self, path: Path = AUDIT_CACHE_FILE):
+        self.path = Path(path)
+        self.entries: dict[str, dict[str, dict]] = self._read_entries()
+        self._dirty: dict[str, set[str]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _read_entries(self) -> dict:
+        if not self.path.exists():
+            return {}
+        try:
+            payload = json.loads(self.path.read_text(encoding="utf-8"))
+        except (json.JSONDecodeError, OSError):
+            return {}
+        if payload.get("version") != CACHE_VERSION:
+            return {}
+        return payload.get("entries", {}) or {}
+
+    def get(
+        self,
+        namespace: str,
+        article: dict,
+        rules: str,
+        fields: tuple = DEFAULT_CONTENT_FIELDS,
+        max_age_hours: float | None = None,
+    ) -> dict | None:
+        """Return a copy of the cached result, or None if stale/missing."""
+        article_id = str(article.get("id", ""))
+        entry = self.entries.get(namespace, {}).get(article_id)
+        if (
+            not article_id
+            or not entry
+            or entry.get("rules_hash") != rules
+            or entry.get("content_hash") != content_hash(article, fields)
+        ):
+            self.misses += 1
+            return None
+        if max_age_hours is not None:
+            try:
+                cached_at = datetime.fromisoformat(entry.get("cached_at", ""))
+            except ValueError:
+                cached_at = None
+            if not cached_at or datetime.now() - cached_at > timedelta(
+                hours=max_age_hours
+            ):
+                self.misses += 1
+                return None
+        self.hits += 1
+        return copy.deepcopy(entry.get("result"))
+
+    def put(
+        self,
+        namespace: str,
+        article: dict,
+        rules: str,
+        result: dict,
+        fields: tuple = DEFAULT_CONTENT_FIELDS,
+    ) -> None:
+        article_id = str(article.get("id", ""))
+        if not article_id:
+            return
+        self.entries.setdefault(namespace, {})[article_id] = {
+            "content_hash": content_hash(article, fields),
+            "rules_hash": rules,
+            "cached_at": datetime.now().isoformat(),
+            "result": copy.deepcopy(result),
+        }
+        self._dirty.setdefault(namespace, set()).add(article_id)
+
+    def invalidate(self, namespace: str, article_id: str) -> None:
+        self.entries.get(namespace, {}).pop(str(article_id), None)
+        self._dirty.setdefault(namespace, set()).add(str(article_id))
+
+    def save(self) -> None:
+        """Merge our changes into the on-disk file and write atomically.
+
+        Re-reading first keeps entries written by other processes (e.g. a
+        pre_publish_review subprocess) instead of clobbering them.
+        """
+        if not self._dirty:
+            return
+        merged = self._read_entries()
+        for namespace, ids in self._dirty.items():
+            bucket = merged.setdefault(namespace, {})
+            for article_id in ids:
+                entry = self.entries.get(namespace, {}).get(article_id)
+                if entry is None:
+                    bucket.pop(article_id, None)
+                else:
+                    bucket[article_id] = entry
+        self.entries = merged
+        payload = {
+            "version": CACHE_VERSION,
+            "updated_at": datetime.now().isoformat(),
+            "entries": merged,
+        }
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        try:
+            tmp_path.write_text(
+                json.dumps(payload, ensure_ascii=False), encoding="utf-8"
+            )
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"⚠️ audit cache save failed: {e}")
+            return
+        self._dirty = {}
+
+    def stats(self) -> str:
+        return f"audit cache: {self.hits} hit(s), {self.misses} miss(es)"
+
+
+_shared_cache: AuditCache | None = None
+
+
+def get_audit_cache() -> AuditCache | None:
+    """Process-wide cache instance (None when AUDIT_CACHE_DISABLED is set).
+
+    Pending writes are flushed at interpreter exit so short-lived CLI runs
+    don't need to call save() themselves.
+    """
+    global _shared_cache
+    if cache_disabled():
+        return None
+    if _shared_cache is None:
+        _shared_cache = AuditCache()
+        atexit.register(_shared_cache.save)
+    return _shared_cache
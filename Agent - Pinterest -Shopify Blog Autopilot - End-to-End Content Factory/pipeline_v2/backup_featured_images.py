@@ -5,6 +5,8 @@ Backup featured images of blogs that have passed meta prompt.
 Reads content/meta_fix_queue.json: "passed" = status=="done" and no CRITICAL in missing.
 For each passed article, fetches current article from Shopify and saves featured image (src, alt).
 Output: pipeline_v2/backups_featured_images/<timestamp>_featured_images.json
+The fetched articles are also snapshotted in full (snapshot_store, label
+"featured_backup"); unchanged articles add nothing to the store.
 
 Usage:
   python backup_featured_images.py                    # from meta_fix_queue (passed only)
@@ -34,6 +36,8 @@ except ImportError:
 
 import requests
 
+from snapshot_store import get_snapshot_store
+
 PIPELINE_DIR = Path(__file__).parent
 CONTENT_DIR = PIPELINE_DIR.parent
 META_FIX_QUEUE = CONTENT_DIR / "content" / "meta_fix_queue.json"
@@ -123,6 +127,7 @@ def backup_featured(article_ids_with_titles: list[tuple[str, str]]) -> list[dict
         article = get_article(article_id)
         if not article:
             continue
+        get_snapshot_store().put(article, label="featured_backup")
         img = article.get("image") or {}
         src = (img.get("src") or "").strip()
         alt = (img.get("alt") or "").strip()
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""bench_import.py — Import-time benchmark for the pipeline modules.
+
+Every short CLI command (scan_quality.py, compare_articles.py, queue-step,
+...) pays for importing ai_orchestrator before it does any work. This
+script measures that cost with `python -X importtime` in fresh
+interpreters and keeps a history in import_benchmark.json (tracked in the
+repo), so a slow import added later shows up as a regression.
+
+Runs start after one untimed warm-up import with bytecode writing on
+(PYTHONDONTWRITEBYTECODE is dropped for the children), so every run loads
+cached .pyc files instead of compiling the sources. For each module it
+reports the median over --runs of
+    import_ms   cumulative import time of the module itself
+    wall_ms     interpreter start + import + exit
+and the heaviest modules it imports directly.
+
+Usage:
+    python bench_import.py                      # ai_orchestrator, 5 runs
+    python bench_import.py settings fixers --runs 9
+    python bench_import.py --record             # append result to history
+    python bench_import.py --check              # exit 1 if >25% slower than last record
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+PIPELINE_DIR = Path(__file__).parent
+BENCHMARK_FILE = Path(
+    os.environ.get("IMPORT_BENCHMARK_FILE", str(PIPELINE_DIR / "import_benchmark.json"))
+)
+DEFAULT_MODULES = ("ai_orchestrator",)
+HISTORY_LIMIT = 50
+
+
+def _parse_importtime(stderr: str) -> list[tuple[str, int, int, int]]:
+    """(name, depth, self_us, cumulative_us) per line of -X importtime output."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:") :].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # header line
+        raw_name = parts[2].rstrip()
+        name = raw_name.lstrip()
+        depth = (len(raw_name) - len(name) - 1) // 2
+        rows.append((name, depth, int(parts[0]), int(parts[1])))
+    return rows
+
+
+def _direct_imports(rows: list, module: str) -> list[tuple[str, int]]:
+    """(name, cumulative_us) of the modules imported directly by module.
+
+    importtime prints children before their parent, so they are the depth-1
+    rows right above the module's own row.
+    """
+    for i, (name, depth, _, _) in enumerate(rows):
+        if name == module and depth == 0:
+            break
+    else:
+        return []
+    children = []
+    for name, depth, _, cumulative_us in reversed(rows[:i]):
+        if depth == 0:
+            break
+        if depth == 1:
+            children.append((name, cumulative_us))
+    return children
+
+
+def measure_once(module: str) -> dict:
+    """Import module in a fresh interpreter; import/wall times in ms."""
+    cmd = [sys.executable, "-X", "importtime", "-c", f"import {module}"]
+    env = {k: v for k, v in os.environ.items() if k != "PYTHONDONTWRITEBYTECODE"}
+    start = time.perf_counter()
+    proc = subprocess.run(
+        cmd, cwd=str(PIPELINE_DIR), env=env, capture_output=True, text=True
+    )
+    wall_ms = (time.perf_counter() - start) * 1000
+    if proc.returncode != 0:
+        tail = (proc.stderr or "").strip().splitlines()[-1:]
+        raise RuntimeError(f"import {module} failed: {' '.join(tail)}")
+    rows = _parse_importtime(proc.stderr)
+    import_us = next((cum for name, _, _, cum in rows if name == module), 0)
+    return {"import_ms": import_us / 1000, "wall_ms": wall_ms, "rows": rows}
+
+
+def measure(module: str, runs: int = 5, top: int = 8) -> dict:
+    """Median import/wall time over runs plus the heaviest direct imports."""
+    measure_once(module)  # warm-up: writes the .pyc files
+    samples = [measure_once(module) for _ in range(max(runs, 1))]
+    median = statistics.median
+    heaviest: dict[str, int] = {}
+    for sample in samples:
+        for name, cumulative_us in _direct_imports(sample["rows"], module):
+            heaviest[name] = max(heaviest.get(name, 0), cumulative_us)
+    ranked = sorted(heaviest.items(), key=lambda item: -item[1])[:top]
+    return {
+        "module": module,
+        "runs": len(samples),
+        "import_ms": round(median(s["import_ms"] for s in samples), 1),
+        "wall_ms": round(median(s["wall_ms"] for s in samples), 1),
+        "heaviest": [[name, round(us / 1000, 1)] for name, us in ranked],
+    }
+
+
+def load_history(path: Path = BENCHMARK_FILE) -> list[dict]:
+    if not path.exists():
+        return []
+    try:
+        return json.loads(path.read_text(encoding="utf-8")).get("history", [])
+    except (json.JSONDecodeError, OSError):
+        return []
+
+
+def save_history(history: list[dict], path: Path = BENCHMARK_FILE) -> None:
+    payload = {"version": 1, "history": history[-HISTORY_LIMIT:]}
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    tmp_path.write_text(json.dumps(payload, indent=1), encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+def last_recorded(history: list[dict], module: str) -> dict | None:
+    for entry in reversed(history):
+        if entry.get("module") == module:
+            return entry
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("modules", nargs="*", default=list(DEFAULT_MODULES))
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=8)
+    parser.add_argument("--record", action="store_true", help="Append to history")
+    parser.add_argument(
+        "--check", action="store_true", help="Fail on regression vs last record"
+    )
+    parser.add_argument("--tolerance", type=float, default=1.25)
+    args = parser.parse_args()
+
+    history = load_history()
+    regressions = []
+    for module in args.modules:
+        try:
+            result = measure(module, runs=args.runs, top=args.top)
+        except RuntimeError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        print(
+            f"{module}: import {result['import_ms']:.1f} ms, "
+            f"wall {result['wall_ms']:.1f} ms (median of {result['runs']})"
+        )
+        for name, ms in result["heaviest"]:
+            print(f"   {ms:8.1f} ms  {name}")
+
+        previous = last_recorded(history, module)
+        if previous:
+            ratio = result["import_ms"] / max(previous["import_ms"], 0.1)
+            print(
+                f"   vs {previous['ts']}: {previous['import_ms']:.1f} ms ({ratio:.2f}x)"
+            )
+            if ratio > args.tolerance:
+                regressions.append(module)
+
+        if args.record:
+            result["ts"] = datetime.now(timezone.utc).isoformat(timespec="seconds")
+            result["python"] = platform.python_version()
+            history.append(result)
+
+    if args.record:
+        save_history(history)
+        print(f"Recorded -> {BENCHMARK_FILE}")
+    if args.check and regressions:
+        print(f"❌ Import time regression: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
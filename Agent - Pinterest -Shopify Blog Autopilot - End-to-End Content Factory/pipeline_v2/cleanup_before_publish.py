@@ -38,6 +38,8 @@ _shop_cfg = _from_config.get("shop", {})
 
 from bs4 import BeautifulSoup
 
+from html_diff import changed_fields, describe_changes
+
 SHOP = (
     os.environ.get("SHOPIFY_SHOP") or os.environ.get("SHOPIFY_STORE_DOMAIN") or ""
 ).strip()
@@ -175,13 +177,28 @@ def get_article(article_id: str):
     return r.json().get("article")
 
 
-def put_article(article_id: str, body_html: str, image_src: str | None = None) -> bool:
+def put_article(
+    article_id: str,
+    body_html: str,
+    image_src: str | None = None,
+    current: dict | None = None,
+) -> bool:
+    """PUT only the fields that differ from `current` (no-op if nothing changed)."""
     import requests
 
     url = f"https://{SHOP}/admin/api/{API_VERSION}/blogs/{BLOG_ID}/articles/{article_id}.json"
-    payload = {"article": {"body_html": body_html}}
+    fields = {"body_html": body_html}
     if image_src:
-        payload["article"]["image"] = {"src": image_src}
+        fields["image"] = {"src": image_src}
+    fields = changed_fields(current, fields)
+    if not fields:
+        print("PUT skipped (body and image unchanged)")
+        return True
+    print("Changes: %s" % describe_changes(current, fields))
+    if os.environ.get("SHOPIFY_DRY_RUN", "").lower() in {"1", "true", "yes"}:
+        print("SHOPIFY_DRY_RUN set - not written")
+        return True
+    payload = {"article": fields}
     r = requests.put(
         url,
         headers={"X-Shopify-Access-Token": TOKEN, "Content-Type": "application/json"},
@@ -190,7 +207,7 @@ def put_article(article_id: str, body_html: str, image_src: str | None = None) -
     if r.status_code != 200:
         print("PUT article failed: %s %s" % (r.status_code, r.text[:400]))
         return False
-    print("PUT article OK (body updated)")
+    print("PUT article OK (%s updated)" % ", ".join(sorted(fields)))
     return True
 
 
@@ -397,7 +414,7 @@ def main():
             print("Setting featured image from first inline image (prefer Shopify CDN)")
         else:
             print("WARN: No inline image found; article may have no featured image")
-    ok = put_article(article_id, body, image_src)
+    ok = put_article(article_id, body, image_src, current=article)
     if ok and image_src:
         print("Featured image sent to Shopify (check Admin if not visible)")
     sys.exit(0 if ok else 1)
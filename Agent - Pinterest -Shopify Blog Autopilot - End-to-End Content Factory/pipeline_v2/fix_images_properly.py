@@ -6,15 +6,14 @@ Requirements:
 2. Add 3 topic-specific AI inline images (Pollinations.ai + Shopify CDN)
 3. Add 1 featured/main image (topic-specific)
 4. NO duplicates
+
+Importable without side effects: ai_orchestrator calls fix_article_images()
+in-process with the article it already fetched (no subprocess per article).
 """
 
 import sys
 import io
 
-# Fix encoding for Windows console
-sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding="utf-8", errors="replace")
-sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding="utf-8", errors="replace")
-
 import requests
 import re
 import json
@@ -24,6 +23,8 @@ import base64
 from pathlib import Path
 from urllib.parse import quote
 
+from http_pool import get_session
+
 # Load .env from project
 try:
     from dotenv import load_dotenv
@@ -41,8 +42,11 @@ BLOG_ID = os.environ.get("SHOPIFY_BLOG_ID", "108441862462")
 TOKEN = os.environ.get("SHOPIFY_ACCESS_TOKEN") or os.environ.get("SHOPIFY_TOKEN")
 API_VERSION = os.environ.get("SHOPIFY_API_VERSION", "2025-01")
 
-if not TOKEN:
-    raise SystemExit("Missing SHOPIFY_ACCESS_TOKEN")
+
+def _require_token() -> None:
+    if not TOKEN:
+        raise RuntimeError("Missing SHOPIFY_ACCESS_TOKEN")
+
 
 # Pinterest matched data
 MATCHED_DATA_FILE = "../scripts/matched_drafts_pinterest.json"
@@ -582,6 +586,8 @@ def generate_valid_pollinations_image(
 
 def upload_to_shopify_cdn(image_bytes: bytes, filename: str) -> str:
     """Upload image to Shopify Files via GraphQL API"""
+    _require_token()
+    http = get_session()
     headers = {
         "X-Shopify-Access-Token": TOKEN,
         "Content-Type": "application/json",
@@ -621,7 +627,7 @@ def upload_to_shopify_cdn(image_bytes: bytes, filename: str) -> str:
         ]
     }
 
-    response = requests.post(
+    response = http.post(
         graphql_url,
         headers=headers,
         json={"query": stage_query, "variables": variables},
@@ -654,7 +660,7 @@ def upload_to_shopify_cdn(image_bytes: bytes, filename: str) -> str:
         "file": (filename, image_bytes, "image/jpeg"),
     }
 
-    upload_response = requests.post(upload_url, files=files)
+    upload_response = http.post(upload_url, files=files)
 
     if upload_response.status_code not in [200, 201, 204]:
         print(f"    ❌ File upload failed: {upload_response.status_code}")
@@ -689,7 +695,7 @@ def upload_to_shopify_cdn(image_bytes: bytes, filename: str) -> str:
         ]
     }
 
-    create_response = requests.post(
+    create_response = http.post(
         graphql_url,
         headers=headers,
         json={"query": create_query, "variables": create_variables},
@@ -723,7 +729,7 @@ def upload_to_shopify_cdn(image_bytes: bytes, filename: str) -> str:
               }
             }
             """
-            resp = requests.post(
+            resp = http.post(
                 graphql_url,
                 headers=headers,
                 json={"query": query, "variables": {"id": file_id}},
@@ -1205,7 +1211,7 @@ def _check_image_accessible(url: str, timeout: int = 10) -> bool:
     if not url or not url.startswith("http"):
         return False
     try:
-        resp = requests.head(
+        resp = get_session().head(
             url,
             timeout=timeout,
             allow_redirects=True,
@@ -1259,10 +1265,11 @@ def extract_pinterest_urls(body_html: str) -> list[str]:
 
 
 def fix_article_images(
-    article_id: int,
+    article,
     pinterest_image_url: str = None,
     dry_run: bool = False,
     images_only: bool = False,
+    session=None,
 ) -> bool:
     """
     Fix article images properly:
@@ -1270,20 +1277,28 @@ def fix_article_images(
     2. Remove any off-topic or duplicate images (unless images_only=True)
     3. Add topic-specific AI images
 
+    article: article ID, or the already-fetched Shopify article dict (skips
+    the GET). session: HTTP session to reuse (default: process-wide pool).
     images_only: If True, only ADD missing images; do NOT remove/modify existing content.
     """
-
+    _require_token()
+    http = session or get_session()
     headers = {"X-Shopify-Access-Token": TOKEN, "Content-Type": "application/json"}
 
-    # Get article
-    url = f"https://{SHOP}/admin/api/{API_VERSION}/blogs/{BLOG_ID}/articles/{article_id}.json"
-    response = requests.get(url, headers=headers)
+    if isinstance(article, dict):
+        article_id = int(article["id"])
+    else:
+        article_id = int(article)
+        # Get article
+        url = f"https://{SHOP}/admin/api/{API_VERSION}/blogs/{BLOG_ID}/articles/{article_id}.json"
+        response = http.get(url, headers=headers, timeout=30)
 
-    if response.status_code != 200:
-        print(f"❌ Error fetching article {article_id}: {response.status_code}")
-        return False
+        if response.status_code != 200:
+            print(f"❌ Error fetching article {article_id}: {response.status_code}")
+            return False
+
+        article = response.json()["article"]
 
-    article = response.json()["article"]
     title = article["title"]
     body_html = article["body_html"]
     # Consider featured only if image has a valid src (Shopify CDN or other URL)
@@ -1428,7 +1443,7 @@ def fix_article_images(
         print(f"\n📌 Uploading Pinterest image to CDN: {pinterest_image_url[:50]}...")
         try:
             # Download Pinterest image
-            pin_resp = requests.get(
+            pin_resp = http.get(
                 pinterest_image_url,
                 timeout=15,
                 headers={
@@ -1520,7 +1535,7 @@ def fix_article_images(
 
     print("\n📤 Publishing updated article...")
     update_url = f"https://{SHOP}/admin/api/{API_VERSION}/blogs/{BLOG_ID}/articles/{article_id}.json"
-    update_resp = requests.put(update_url, headers=headers, json=update_data)
+    update_resp = http.put(update_url, headers=headers, json=update_data, timeout=60)
 
     if update_resp.status_code == 200:
         pinterest_count = 1 if pinterest_cdn_url else 0
@@ -1580,6 +1595,12 @@ def fix_all_matched_articles(dry_run: bool = False, images_only: bool = False):
 if __name__ == "__main__":
     import argparse
 
+    # Fix encoding for Windows console
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding="utf-8", errors="replace")
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding="utf-8", errors="replace")
+    if not TOKEN:
+        raise SystemExit("Missing SHOPIFY_ACCESS_TOKEN")
+
     parser = argparse.ArgumentParser(description="Fix article images properly")
     parser.add_argument("--article-id", type=int, help="Single article ID to fix")
     parser.add_argument(
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""fixers.py — In-process entry points for the per-article fixers.
+
+AIOrchestrator._run_fix_images launched fix_images_properly.py, the
+queue-step review and restore_from_backups._run_review launched
+pre_publish_review.py, and queue-run launched "ai_orchestrator.py
+queue-step" — one new Python process per article. Each re-imported
+requests / bs4 / Pillow, re-read .env and re-fetched the article the
+parent already had.
+
+These wrappers import the fixers once and call them with the article dict
+the caller already holds, sharing the process-wide HTTP pool
+(http_pool.get_session) and audit cache:
+
+    run_review(article)        -> ReviewOutcome(passed, output, result)
+    run_fix_images(article)    -> bool
+
+Subprocesses remain as an isolation option: pass isolate=True, or set
+FIXER_SUBPROCESS=1 to restore the old per-article processes everywhere.
+"""
+
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+from functools import lru_cache
+from pathlib import Path
+from typing import NamedTuple
+
+PIPELINE_DIR = Path(__file__).parent
+CONTENT_DIR = PIPELINE_DIR.parent
+SCRIPTS_DIR = CONTENT_DIR / "scripts"
+REVIEW_SCRIPT = SCRIPTS_DIR / "pre_publish_review.py"
+FIX_IMAGES_SCRIPT = PIPELINE_DIR / "fix_images_properly.py"
+
+FIXER_SUBPROCESS = os.environ.get("FIXER_SUBPROCESS", "").strip().lower() in {
+    "1",
+    "true",
+    "yes",
+}
+
+
+class ReviewOutcome(NamedTuple):
+    passed: bool
+    output: str  # errors + warnings (in-process) or captured stdout/stderr
+    result: dict  # full review result; empty when run in a subprocess
+
+
+def _isolated(isolate: bool | None) -> bool:
+    return FIXER_SUBPROCESS if isolate is None else isolate
+
+
+def _article_id(article) -> str:
+    return str(article["id"] if isinstance(article, dict) else article)
+
+
+@lru_cache(maxsize=None)
+def review_module():
+    """pre_publish_review, imported once (scripts/ is not a package)."""
+    if str(SCRIPTS_DIR) not in sys.path:
+        sys.path.append(str(SCRIPTS_DIR))
+    import pre_publish_review
+
+    return pre_publish_review
+
+
+def run_review(article, isolate: bool | None = None) -> ReviewOutcome:
+    """Pre-publish review of an article dict (or ID)."""
+    if _isolated(isolate):
+        r = subprocess.run(
+            [sys.executable, str(REVIEW_SCRIPT), _article_id(article)],
+            cwd=str(CONTENT_DIR),
+            capture_output=True,
+            text=True,
+            timeout=120,
+        )
+        output = ((r.stdout or "") + "\n" + (r.stderr or "")).replace("\r", "")
+        return ReviewOutcome(r.returncode == 0, output, {})
+
+    review = review_module()
+    result = review.review_article(article)
+    return ReviewOutcome(
+        bool(result.get("passed")), review.review_messages(result), result
+    )
+
+
+def run_fix_images(
+    article, images_only: bool = True, isolate: bool | None = None
+) -> bool:
+    """fix_images_properly for one article dict (or ID)."""
+    if _isolated(isolate):
+        cmd = [sys.executable, str(FIX_IMAGES_SCRIPT)]
+        cmd += ["--article-id", _article_id(article)]
+        if images_only:
+            cmd.append("--images-only")
+        return subprocess.run(cmd, check=False).returncode == 0
+
+    from fix_images_properly import fix_article_images
+
+    return fix_article_images(article, images_only=images_only)
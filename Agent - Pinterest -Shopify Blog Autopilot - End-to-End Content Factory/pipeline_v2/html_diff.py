@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""html_diff.py — Normalized HTML diff in front of Shopify article writes.
+
+The fix chain (_fix_external_links, _remove_years_from_content,
+_add_internal_links, _add_cta, _ensure_table_styling, ...) and
+cleanup_before_publish PUT the whole body_html back even when nothing
+changed, and BeautifulSoup round-trips make "unchanged" bodies differ
+byte-for-byte (quote style, <br/> vs <br>, entity escaping, whitespace).
+
+This module compares bodies on a canonical token stream instead of raw
+bytes, drops unchanged fields from an update payload, and describes what
+changed at block level (headings, paragraphs, tables, ...) for the logs.
+
+Usage:
+    payload = changed_fields(current_article, {"body_html": body, "title": t})
+    if not payload:
+        ...  # no-op, skip the PUT
+    print(describe_changes(current_article, payload))
+"""
+
+from __future__ import annotations
+
+import difflib
+import re
+from collections import Counter
+from html import escape
+from html.parser import HTMLParser
+
+# Elements that form one "block" in the structural diff
+BLOCK_TAGS = {
+    "h1",
+    "h2",
+    "h3",
+    "h4",
+    "h5",
+    "h6",
+    "p",
+    "li",
+    "blockquote",
+    "table",
+    "figure",
+    "style",
+    "pre",
+}
+VOID_TAGS = {"br", "hr", "img", "meta", "link", "input", "source", "wbr"}
+# Whitespace next to these tags does not render; next to inline tags it does
+LAYOUT_TAGS = BLOCK_TAGS | {
+    "html",
+    "head",
+    "body",
+    "div",
+    "section",
+    "article",
+    "header",
+    "footer",
+    "ul",
+    "ol",
+    "dl",
+    "dt",
+    "dd",
+    "thead",
+    "tbody",
+    "tfoot",
+    "tr",
+    "th",
+    "td",
+    "caption",
+    "figcaption",
+    "br",
+    "hr",
+    "img",
+}
+# Whitespace inside these renders as written
+PRESERVE_TAGS = {"pre", "textarea"}
+_WS_RE = re.compile(r"\s+")
+
+
+class _Canonicalizer(HTMLParser):
+    """Turn HTML into a canonical token list plus a list of blocks."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.tokens: list[str] = []
+        self.blocks: list[tuple[str, str]] = []
+        self._open_blocks: list[list] = []
+        # tokens[-1] is text / follows a layout tag (or the start)
+        self._in_text = False
+        self._at_boundary = True
+        # Depth of open <pre>/<textarea>
+        self._preserve = 0
+
+    def _tag(self, tag: str, token: str) -> None:
+        if tag in LAYOUT_TAGS and not self._preserve:
+            self._trim_text()
+        self.tokens.append(token)
+        self._in_text = False
+        self._at_boundary = tag in LAYOUT_TAGS
+
+    def _trim_text(self) -> None:
+        """Drop trailing whitespace of the text before a layout boundary."""
+        if self._in_text:
+            text = self.tokens[-1].rstrip()
+            if text:
+                self.tokens[-1] = text
+            else:
+                self.tokens.pop()
+            self._in_text = False
+
+    def _start(self, tag: str, attrs: list) -> None:
+        attr_text = " ".join(
+            f'{name}="{escape(_WS_RE.sub(" ", value or "").strip())}"'
+            for name, value in sorted(attrs)
+        )
+        self._tag(tag, f"<{tag} {attr_text}>" if attr_text else f"<{tag}>")
+
+    def handle_starttag(self, tag, attrs):
+        self._start(tag, attrs)
+        if tag in PRESERVE_TAGS:
+            self._preserve += 1
+        if tag == "img":
+            src = dict(attrs).get("src") or ""
+            self.blocks.append(("img", src))
+        elif tag in BLOCK_TAGS:
+            self._open_blocks.append([tag, []])
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if tag in VOID_TAGS:
+            return
+        self._tag(tag, f"</{tag}>")
+        if tag in PRESERVE_TAGS and self._preserve:
+            self._preserve -= 1
+        if tag in BLOCK_TAGS:
+            for idx in range(len(self._open_blocks) - 1, -1, -1):
+                if self._open_blocks[idx][0] == tag:
+                    block_tag, parts = self._open_blocks.pop(idx)
+                    text = _WS_RE.sub(" ", " ".join(parts)).strip()
+                    self.blocks.append((block_tag, text))
+                    break
+
+    def handle_data(self, data):
+        # Entities are decoded by the parser; re-escape so "&lt;b&gt;" text
+        # never equals a real <b> tag
+        if self._preserve:
+            text = escape(data, quote=False)
+            if self._in_text:
+                text = self.tokens.pop() + text
+        else:
+            # Collapse whitespace but keep it: "a <b>x</b>" != "a<b>x</b>"
+            text = _WS_RE.sub(" ", escape(data, quote=False))
+            if self._in_text:
+                text = _WS_RE.sub(" ", self.tokens.pop() + text)
+            elif self._at_boundary:
+                text = text.lstrip()
+        if text:
+            self.tokens.append(text)
+            self._in_text = True
+        words = data.strip()
+        if words:
+            for block in self._open_blocks:
+                block[1].append(words)
+
+    def close(self):
+        super().close()
+        self._trim_text()
+        while self._open_blocks:
+            block_tag, parts = self._open_blocks.pop()
+            self.blocks.append((block_tag, _WS_RE.sub(" ", " ".join(parts)).strip()))
+
+
+def _parse(html: str) -> _Canonicalizer:
+    parser = _Canonicalizer()
+    parser.feed(html or "")
+    parser.close()
+    return parser
+
+
+def normalize_html(html: str) -> str:
+    """Canonical form: sorted attributes, collapsed whitespace (dropped only
+    around block/layout tags, kept as-is in <pre>/<textarea>), entities
+    re-escaped uniformly."""
+    return "".join(_parse(html).tokens)
+
+
+def bodies_equal(old: str, new: str) -> bool:
+    """True if two bodies render the same markup (ignores serialization noise)."""
+    if (old or "") == (new or ""):
+        return True
+    return normalize_html(old) == normalize_html(new)
+
+
+def structural_diff(old: str, new: str) -> list[str]:
+    """Block-level diff lines: '+ h2: Sources', '- p: ...', '~ table: ...'."""
+    old_blocks = _parse(old).blocks
+    new_blocks = _parse(new).blocks
+    matcher = difflib.SequenceMatcher(None, old_blocks, new_blocks, autojunk=False)
+    lines: list[str] = []
+    for op, i1, i2, j1, j2 in matcher.get_opcodes():
+        if op == "equal":
+            continue
+        if op == "replace" and (i2 - i1) == (j2 - j1):
+            for (old_tag, _), (new_tag, text) in zip(
+                old_blocks[i1:i2], new_blocks[j1:j2]
+            ):
+                marker = "~" if old_tag == new_tag else "±"
+                lines.append(f"{marker} {new_tag}: {text[:80]}")
+            continue
+        for tag, text in old_blocks[i1:i2]:
+            lines.append(f"- {tag}: {text[:80]}")
+        for tag, text in new_blocks[j1:j2]:
+            lines.append(f"+ {tag}: {text[:80]}")
+    return lines
+
+
+def summarize_diff(lines: list[str]) -> str:
+    """Compact counts, e.g. '+2 h2, ~3 p, -1 img'."""
+    counts = Counter(line.split(":", 1)[0] for line in lines)
+    parts = [
+        f"{key.split(' ', 1)[0]}{n} {key.split(' ', 1)[1]}"
+        for key, n in sorted(counts.items(), key=lambda kv: (-kv[1], kv[0]))
+    ]
+    return ", ".join(parts) if parts else "markup-only changes"
+
+
+def _field_equal(name: str, old, new) -> bool:
+    if name == "body_html":
+        return bodies_equal(old or "", new or "")
+    if name == "image":
+        # Shopify returns extra keys (created_at, width, ...); compare what we send
+        if not old or not new:
+            return not old and not new
+        if isinstance(old, dict) and isinstance(new, dict):
+            return all(old.get(k) == v for k, v in new.items())
+        return old == new
+    if isinstance(old, str) or isinstance(new, str):
+        return (old or "").strip() == (new or "").strip()
+    return old == new
+
+
+def changed_fields(current: dict | None, data: dict) -> dict:
+    """Subset of `data` whose values differ from `current` (all of it if unknown)."""
+    if current is None:
+        return dict(data)
+    changed = {
+        name: value
+        for name, value in data.items()
+        if name != "id" and not _field_equal(name, current.get(name), value)
+    }
+    if changed and "id" in data:
+        changed["id"] = data["id"]
+    return changed
+
+
+def describe_changes(current: dict | None, data: dict) -> str:
+    """One-line description of an update payload for logs."""
+    if current is None:
+        return f"fields: {', '.join(sorted(data))} (no snapshot to diff)"
+    parts = []
+    for name in sorted(data):
+        if name == "id":
+            continue
+        if name == "body_html":
+            lines = structural_diff(current.get("body_html") or "", data[name] or "")
+            parts.append(f"body_html [{summarize_diff(lines)}]")
+        else:
+            parts.append(name)
+    return ", ".join(parts)
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""http_pool.py — One keep-alive HTTP session per process.
+
+ShopifyAPI, fix_images_properly and pre_publish_review called the bare
+requests.get / requests.put helpers, so every request opened (and TLS-
+negotiated) a fresh connection to the same Shopify host, and each
+subprocess-per-article run started from zero again.
+
+get_session() returns a process-wide requests.Session with a pooled
+HTTPAdapter (HTTP_POOL_SIZE connections per host, default 16). Fixers that
+run in-process share it with the orchestrator, so connections stay warm
+across articles. requests.Session is safe to share between the worker
+threads used by the prefetchers.
+
+shopify_budget() is a process-wide token bucket for the Shopify Admin API
+(SHOPIFY_RATE_PER_SEC requests/second after a burst of SHOPIFY_RATE_BURST),
+so worker threads that call Shopify together stay inside its rate limit.
+
+next_page_url() picks the rel="next" URL out of a Link header. From page 2
+on Shopify sends `<...>; rel="previous", <...>; rel="next"`, so taking the
+first URL walks back to page 1 and the loop never ends.
+
+Usage:
+    from http_pool import get_session, next_page_url, shopify_budget
+    shopify_budget().acquire()
+    resp = get_session().get(url, headers=HEADERS, timeout=30)
+    url = next_page_url(resp.headers.get("Link", ""))
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+
+POOL_SIZE = int(os.environ.get("HTTP_POOL_SIZE", "16"))
+# Shopify REST: 2 requests/second leak rate, 40-request bucket (standard plans)
+SHOPIFY_RATE_PER_SEC = float(os.environ.get("SHOPIFY_RATE_PER_SEC", "2"))
+SHOPIFY_RATE_BURST = int(os.environ.get("SHOPIFY_RATE_BURST", "20"))
+
+_shared_session = None
+_shared_budget = None
+_lock = threading.Lock()
+
+
+def new_session(pool_size: int = POOL_SIZE):
+    """A requests.Session with a pool of pool_size connections per host."""
+    # Imported here (~150 ms) so importing http_pool stays cheap
+    try:
+        import requests
+        from requests.adapters import HTTPAdapter
+    except ImportError:
+        raise RuntimeError("requests is not installed") from None
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_session():
+    """Process-wide pooled session (created on first use)."""
+    global _shared_session
+    if _shared_session is None:
+        with _lock:
+            if _shared_session is None:
+                _shared_session = new_session()
+    return _shared_session
+
+
+def next_page_url(link_header: str) -> str | None:
+    """URL of the rel="next" page in a Link header, or None on the last page."""
+    for part in (link_header or "").split(","):
+        if 'rel="next"' in part:
+            return part.split(";")[0].strip().strip("<>")
+    return None
+
+
+class RateBudget:
+    """Thread-safe token bucket: rate requests/second after a burst."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.capacity = max(burst, 1)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until one request may be sent."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(
+                    self.capacity, self.tokens + (now - self.updated) * self.rate
+                )
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def shopify_budget() -> RateBudget:
+    """Process-wide Shopify Admin API budget."""
+    global _shared_budget
+    if _shared_budget is None:
+        with _lock:
+            if _shared_budget is None:
+                _shared_budget = RateBudget(SHOPIFY_RATE_PER_SEC, SHOPIFY_RATE_BURST)
+    return _shared_budget
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""image_probe.py — Header-only image quality probing (no full downloads).
+
+image_review_agent.check_image_quality downloaded every candidate image in
+full and decoded it with PIL, one candidate at a time, just to learn its
+dimensions and format.
+
+This module reads only the first few KB of each image with a ranged GET,
+sniffs format and dimensions from the JPEG / PNG / GIF / WebP headers, and
+probes all candidates of an article concurrently. Verdicts are memoized by
+URL (in memory and on disk, IMAGE_PROBE_TTL_HOURS, default 168h).
+
+Usage:
+    prober = get_image_prober()
+    verdicts = prober.probe_many(urls)      # {url: verdict}
+    verdict = prober.probe(url)             # memoized single probe
+
+Verdict shape (same as the old check_image_quality result):
+    {accessible, width, height, format, file_size_kb,
+     has_watermark_risk, quality_score}
+
+CLI:
+    python image_probe.py <url> [<url> ...]
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import struct
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+try:
+    import requests
+except ImportError:  # resolved at call time; module stays importable
+    requests = None
+
+PIPELINE_DIR = Path(__file__).parent
+IMAGE_PROBE_CACHE_FILE = Path(
+    os.environ.get(
+        "IMAGE_PROBE_CACHE_FILE", str(PIPELINE_DIR / "image_probe_cache.json")
+    )
+)
+CACHE_VERSION = 1
+PROBE_TTL_SECONDS = float(os.environ.get("IMAGE_PROBE_TTL_HOURS", "168")) * 3600
+# First read; progressive JPEGs with big EXIF blocks get one larger retry
+HEAD_BYTES = 16 * 1024
+RETRY_BYTES = 64 * 1024
+REQUEST_TIMEOUT = float(os.environ.get("IMAGE_PROBE_TIMEOUT", "5"))
+MAX_WORKERS = int(os.environ.get("IMAGE_PROBE_WORKERS", "16"))
+
+# JPEG start-of-frame markers that carry the image size
+# (C4 = DHT, C8 = JPG extension, CC = DAC are not frames)
+_JPEG_SOF = set(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
+# ============================================================================
+# Header sniffing
+# ============================================================================
+def _sniff_jpeg(data: bytes) -> tuple[int, int] | None:
+    pos = 2
+    while pos + 9 <= len(data):
+        if data[pos] != 0xFF:
+            pos += 1
+            continue
+        marker = data[pos + 1]
+        if marker == 0xFF:  # fill byte
+            pos += 1
+            continue
+        if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7:
+            pos += 2
+            continue
+        (length,) = struct.unpack(">H", data[pos + 2 : pos + 4])
+        if marker in _JPEG_SOF:
+            height, width = struct.unpack(">HH", data[pos + 5 : pos + 9])
+            return width, height
+        pos += 2 + length
+    return None
+
+
+def sniff_image(data: bytes) -> tuple[str, int, int] | None:
+    """(format, width, height) from the first bytes of an image, or None."""
+    if data.startswith(b"\x89PNG\r\n\x1a\n") and len(data) >= 24:
+        width, height = struct.unpack(">II", data[16:24])
+        return "PNG", width, height
+    if data[:6] in (b"GIF87a", b"GIF89a") and len(data) >= 10:
+        width, height = struct.unpack("<HH", data[6:10])
+        return "GIF", width, height
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP" and len(data) >= 30:
+        chunk = data[12:16]
+        if chunk == b"VP8 ":
+            width, height = struct.unpack("<HH", data[26:30])
+            return "WEBP", width & 0x3FFF, height & 0x3FFF
+        if chunk == b"VP8L":
+            b = data[21:25]
+            width = 1 + (((b[1] & 0x3F) << 8) | b[0])
+            height = 1 + (((b[3] & 0x0F) << 10) | (b[2] << 2) | ((b[1] & 0xC0) >> 6))
+            return "WEBP", width, height
+        if chunk == b"VP8X":
+            width = 1 + int.from_bytes(data[24:27], "little")
+            height = 1 + int.from_bytes(data[27:30], "little")
+            return "WEBP", width, height
+        return None
+    if data[:2] == b"\xff\xd8":
+        size = _sniff_jpeg(data)
+        if size:
+            return "JPEG", size[0], size[1]
+    return None
+
+
+def score_dimensions(width: int, height: int) -> float:
+    """Resolution score with a bonus for blog-friendly aspect ratios."""
+    min_dimension = min(width, height)
+    if min_dimension >= 1200:
+        score = 1.0
+    elif min_dimension >= 800:
+        score = 0.8
+    elif min_dimension >= 600:
+        score = 0.6
+    else:
+        score = 0.4
+    # Blog images should be roughly 16:9 or 4:3
+    if height and 1.2 <= width / height <= 2.0:
+        score += 0.1
+    return min(1.0, score)
+
+
+def _empty_verdict() -> dict:
+    return {
+        "accessible": False,
+        "width": 0,
+        "height": 0,
+        "has_watermark_risk": False,
+        "quality_score": 0.0,
+        "format": "",
+        "file_size_kb": 0,
+    }
+
+
+def _total_size(headers) -> int:
+    content_range = headers.get("content-range", "")
+    if "/" in content_range:
+        total = content_range.rsplit("/", 1)[1]
+        if total.isdigit():
+            return int(total)
+    length = headers.get("content-length", "")
+    return int(length) if str(length).isdigit() else 0
+
+
+def _read_head(url: str, limit: int) -> tuple[bytes, int, int]:
+    """(first bytes, HTTP status, total size) without reading past limit."""
+    resp = requests.get(
+        url,
+        headers={"Range": f"bytes=0-{limit - 1}"},
+        timeout=REQUEST_TIMEOUT,
+        stream=True,
+    )
+    try:
+        data = b""
+        if resp.status_code in (200, 206):
+            # Servers that ignore Range send the whole file; stop early anyway
+            for chunk in resp.iter_content(chunk_size=8192):
+                data += chunk
+                if len(data) >= limit:
+                    break
+        total = _total_size(resp.headers) if resp.status_code == 206 else 0
+        if not total and resp.status_code == 200:
+            total = _total_size(resp.headers)
+        return data[:limit], resp.status_code, total
+    finally:
+        resp.close()
+
+
+class ImageProber:
+    """Concurrent header-only prober with a per-URL verdict cache."""
+
+    def __init__(self, path: Path = IMAGE_PROBE_CACHE_FILE):
+        self.path = Path(path)
+        self.verdicts: dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._load()
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        try:
+            payload = json.loads(self.path.read_text(encoding="utf-8"))
+        except (json.JSONDecodeError, OSError):
+            return
+        if payload.get("version") != CACHE_VERSION:
+            return
+        now = time.time()
+        self.verdicts = {
+            url: verdict
+            for url, verdict in (payload.get("verdicts", {}) or {}).items()
+            if now - verdict.get("probed_at", 0) < PROBE_TTL_SECONDS
+        }
+
+    def save(self) -> None:
+        with self._lock:
+            if not self._dirty:
+                return
+            payload = {"version": CACHE_VERSION, "verdicts": dict(self.verdicts)}
+            self._dirty = False
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        try:
+            tmp_path.write_text(json.dumps(payload), encoding="utf-8")
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"⚠️ image probe cache save failed: {e}")
+
+    def _probe_uncached(self, url: str) -> dict:
+        verdict = _empty_verdict()
+        if requests is None:
+            print("⚠️ image probe: requests is not installed")
+            return verdict
+        try:
+            data, status, total = _read_head(url, HEAD_BYTES)
+            sniffed = sniff_image(data)
+            if sniffed is None and status in (200, 206) and data[:2] == b"\xff\xd8":
+                data, status, total = _read_head(url, RETRY_BYTES)
+                sniffed = sniff_image(data)
+        except Exception as e:
+            print(f"Image check error: {e}")
+            return verdict
+        if status not in (200, 206) or sniffed is None:
+            return verdict
+
+        fmt, width, height = sniffed
+        verdict.update(
+            accessible=True,
+            width=width,
+            height=height,
+            format=fmt,
+            file_size_kb=total / 1024 if total else 0,
+            quality_score=score_dimensions(width, height),
+        )
+        return verdict
+
+    def probe(self, url: str) -> dict:
+        with self._lock:
+            cached = self.verdicts.get(url)
+        if cached is not None:
+            return {k: v for k, v in cached.items() if k != "probed_at"}
+        verdict = self._probe_uncached(url)
+        # Only successful probes are remembered; failures may be transient
+        if verdict["accessible"]:
+            with self._lock:
+                self.verdicts[url] = dict(verdict, probed_at=time.time())
+                self._dirty = True
+        return verdict
+
+    def probe_many(self, urls: list[str]) -> dict[str, dict]:
+        """Probe all URLs concurrently; returns {url: verdict}."""
+        unique = list(dict.fromkeys(u for u in urls if u))
+        if not unique:
+            return {}
+        with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(unique))) as pool:
+            results = dict(zip(unique, pool.map(self.probe, unique)))
+        self.save()
+        return results
+
+
+_shared_prober: ImageProber | None = None
+
+
+def get_image_prober() -> ImageProber:
+    """Process-wide prober (verdict cache loaded from disk once)."""
+    global _shared_prober
+    if _shared_prober is None:
+        _shared_prober = ImageProber()
+    return _shared_prober
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python image_probe.py <url> [<url> ...]")
+        return
+    started = time.time()
+    for url, verdict in get_image_prober().probe_many(sys.argv[1:]).items():
+        print(
+            f"{verdict['format'] or '?':<5} {verdict['width']}x{verdict['height']}"
+            f"  q={verdict['quality_score']:.1f}  {url}"
+        )
+    print(f"{time.time() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
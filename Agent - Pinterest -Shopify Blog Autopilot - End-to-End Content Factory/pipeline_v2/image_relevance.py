@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""image_relevance.py — Embedding-based topic relevance for image candidates.
+
+image_review_agent.calculate_relevance_score counted exact topic keywords
+in each candidate's alt text, so "lemons" did not match "lemon" and
+"vinegar-based spray" scored like an unrelated photo.
+
+This module embeds the article's topic concepts and every candidate text
+(alt / caption / tags) and scores all candidates against the topic in one
+matrix-vector product:
+
+    backend "model"   a small local CPU sentence-embedding model
+                      (IMAGE_RELEVANCE_MODEL, e.g. all-MiniLM-L6-v2; needs
+                      sentence-transformers)
+    backend "hashed"  default fallback, no dependencies: word unigrams,
+                      bigrams and character trigrams hashed into a signed
+                      DIM-sized vector
+
+Cosines are not comparable across backends (hashed vectors of related
+texts rarely pass 0.3, sentence embeddings of unrelated ones often reach
+0.2), so relevance() maps a cosine onto image_review_agent's relevance
+scale through per-backend SIMILARITY_THRESHOLDS: below "match" it adds
+nothing, "match" is the 0.4 approval bar and "strong" scores like two
+exact keyword hits (0.8).
+
+Vectors are cached on disk keyed by backend + text hash, so candidates that
+show up again (same stock photo, same alt) are never re-embedded. numpy is
+used for the product when installed; otherwise the same product runs over
+sparse vectors in pure Python.
+
+Usage:
+    scorer = get_relevance_scorer()
+    scores = scorer.score("citrus vinegar cleaner", ["lemon peels in a jar", ...])
+    relevance = [scorer.relevance(s) for s in scores]
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+import os
+import re
+import sys
+import threading
+from pathlib import Path
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+PIPELINE_DIR = Path(__file__).parent
+VECTOR_CACHE_FILE = Path(
+    os.environ.get(
+        "IMAGE_RELEVANCE_CACHE_FILE", str(PIPELINE_DIR / "image_vector_cache.json")
+    )
+)
+CACHE_VERSION = 1
+MODEL_NAME = os.environ.get("IMAGE_RELEVANCE_MODEL", "")
+DIM = 1024
+# Feature weights for the hashed backend
+WORD_WEIGHT = 1.0
+BIGRAM_WEIGHT = 0.7
+TRIGRAM_WEIGHT = 0.35
+# backend -> (match, strong) cosine. Hashed: unrelated alt texts stay under
+# ~0.05 (bucket collisions), one shared topic word gives ~0.2. Model
+# (MiniLM-class): unrelated short texts reach ~0.2, paraphrases 0.5+.
+SIMILARITY_THRESHOLDS = {"hashed": (0.15, 0.4), "model": (0.35, 0.6)}
+RELEVANCE_AT_MATCH = 0.4
+RELEVANCE_AT_STRONG = 0.8
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_STOPWORDS = {
+    "a",
+    "an",
+    "and",
+    "the",
+    "of",
+    "on",
+    "in",
+    "with",
+    "for",
+    "to",
+    "at",
+    "from",
+    "or",
+    "by",
+    "is",
+    "are",
+    "how",
+    "make",
+    "your",
+    "this",
+    "that",
+}
+
+
+def _text_key(backend: str, text: str) -> str:
+    return backend + ":" + hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def _bucket(feature: str) -> tuple[int, float]:
+    digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+    value = int.from_bytes(digest, "little")
+    return value % DIM, (1.0 if value >> 63 else -1.0)
+
+
+def hashed_vector(text: str) -> dict[int, float]:
+    """Sparse L2-normalized hashed n-gram vector {index: weight}."""
+    words = [w for w in _WORD_RE.findall((text or "").lower()) if w not in _STOPWORDS]
+    features: list[tuple[str, float]] = [(f"w:{w}", WORD_WEIGHT) for w in words]
+    features += [(f"b:{a}_{b}", BIGRAM_WEIGHT) for a, b in zip(words, words[1:])]
+    for word in words:
+        padded = f"#{word}#"
+        features += [
+            (f"c:{padded[i:i + 3]}", TRIGRAM_WEIGHT) for i in range(len(padded) - 2)
+        ]
+    vec: dict[int, float] = {}
+    for feature, weight in features:
+        index, sign = _bucket(feature)
+        vec[index] = vec.get(index, 0.0) + sign * weight
+    norm = math.sqrt(sum(v * v for v in vec.values())) or 1.0
+    return {i: v / norm for i, v in vec.items() if v}
+
+
+class RelevanceScorer:
+    """Topic-vs-candidate cosine scorer with an on-disk vector cache."""
+
+    def __init__(self, path: Path = VECTOR_CACHE_FILE, model_name: str = MODEL_NAME):
+        self.path = Path(path)
+        self.model = None
+        self.backend = "hashed"
+        if model_name:
+            try:
+                from sentence_transformers import SentenceTransformer
+
+                self.model = SentenceTransformer(model_name, device="cpu")
+                self.backend = f"model:{model_name}"
+            except Exception as e:  # missing package or model download failure
+                print(f"⚠️ relevance model unavailable ({e}); using hashed vectors")
+        self.vectors: dict[str, list] = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._load()
+
+    # ------------------------------------------------------------------
+    # Vector cache
+    # ------------------------------------------------------------------
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        try:
+            payload = json.loads(self.path.read_text(encoding="utf-8"))
+        except (json.JSONDecodeError, OSError):
+            return
+        if payload.get("version") != CACHE_VERSION or payload.get("dim") != DIM:
+            return
+        self.vectors = payload.get("vectors", {}) or {}
+
+    def save(self) -> None:
+        with self._lock:
+            if not self._dirty:
+                return
+            # Serialized under the lock: embed() adds vectors meanwhile
+            text = json.dumps(
+                {"version": CACHE_VERSION, "dim": DIM, "vectors": self.vectors}
+            )
+            self._dirty = False
+        tmp_path = self.path.with_name(
+            f"{self.path.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+        )
+        try:
+            tmp_path.write_text(text, encoding="utf-8")
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"⚠️ vector cache save failed: {e}")
+
+    def embed(self, texts: list[str]) -> list[dict[int, float]]:
+        """Sparse vectors for texts (cached; missing ones embedded in one batch)."""
+        keys = [_text_key(self.backend, t) for t in texts]
+        missing = [t for t, k in zip(texts, keys) if k not in self.vectors]
+        if missing:
+            missing = list(dict.fromkeys(missing))
+            if self.model is not None:
+                dense = self.model.encode(missing, normalize_embeddings=True)
+                fresh = [
+                    [[i, round(float(v), 5)] for i, v in enumerate(row)]
+                    for row in dense
+                ]
+            else:
+                fresh = [
+                    [[i, round(v, 5)] for i, v in hashed_vector(t).items()]
+                    for t in missing
+                ]
+            with self._lock:
+                for text, vec in zip(missing, fresh):
+                    self.vectors[_text_key(self.backend, text)] = vec
+                self._dirty = True
+        return [{i: v for i, v in self.vectors[k]} for k in keys]
+
+    # ------------------------------------------------------------------
+    # Scoring
+    # ------------------------------------------------------------------
+    @property
+    def thresholds(self) -> tuple[float, float]:
+        """(match, strong) cosine thresholds of the active backend."""
+        return SIMILARITY_THRESHOLDS["model" if self.model is not None else "hashed"]
+
+    def relevance(self, similarity: float) -> float:
+        """Cosine on the review relevance scale (0.0 below the match threshold)."""
+        match, strong = self.thresholds
+        if similarity < match:
+            return 0.0
+        fraction = (similarity - match) / (strong - match)
+        span = RELEVANCE_AT_STRONG - RELEVANCE_AT_MATCH
+        return min(1.0, RELEVANCE_AT_MATCH + span * fraction)
+
+    def score(self, topic_text: str, candidate_texts: list[str]) -> list[float]:
+        """Cosine similarity of every candidate to the topic, in one product."""
+        if not candidate_texts:
+            return []
+        vectors = self.embed([topic_text] + list(candidate_texts))
+        topic, candidates = vectors[0], vectors[1:]
+        if np is not None:
+            width = self.model.get_sentence_embedding_dimension() if self.model else DIM
+            matrix = np.zeros((len(candidates), width), dtype=np.float32)
+            for row, vec in enumerate(candidates):
+                if vec:
+                    matrix[row, list(vec)] = list(vec.values())
+            query = np.zeros(width, dtype=np.float32)
+            if topic:
+                query[list(topic)] = list(topic.values())
+            scores = (matrix @ query).tolist()
+        else:
+            scores = [
+                sum(v * topic.get(i, 0.0) for i, v in vec.items()) for vec in candidates
+            ]
+        self.save()
+        return [max(0.0, min(1.0, s)) for s in scores]
+
+
+_shared_scorer: RelevanceScorer | None = None
+
+
+def get_relevance_scorer() -> RelevanceScorer:
+    """Process-wide scorer (vector cache loaded from disk once)."""
+    global _shared_scorer
+    if _shared_scorer is None:
+        _shared_scorer = RelevanceScorer()
+    return _shared_scorer
+
+
+def main():
+    if len(sys.argv) < 3:
+        print('Usage: python image_relevance.py "<topic>" "<candidate>" [...]')
+        return
+    scorer = get_relevance_scorer()
+    for text, score in zip(sys.argv[2:], scorer.score(sys.argv[1], sys.argv[2:])):
+        print(f"{score:.3f}  {text}")
+
+
+if __name__ == "__main__":
+    main()
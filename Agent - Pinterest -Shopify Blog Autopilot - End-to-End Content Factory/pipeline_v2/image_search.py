@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+"""image_search.py — Federated stock image search (Pexels / Pixabay / Unsplash).
+
+image_review_agent.create_image_plan searched one provider and one query at
+a time (10s timeout each) and batch_autopublish.search_pexels_images looped
+its queries serially, re-searching the same queries on every run.
+
+This module fans every (provider, query) pair out on a thread pool, merges
+the results per query (round-robin across providers, de-duplicated by URL,
+ranked by keyword overlap with the query) and caches each provider response
+on disk by (provider, query, page, per_page) with a per-provider TTL:
+
+    pixabay   24h  (Pixabay API terms ask clients to cache results for 24h)
+    pexels    24h
+    unsplash   1h  (Unsplash wants fresh API data; keep the cache short)
+
+Override with IMAGE_SEARCH_TTL_<PROVIDER>=<seconds>; IMAGE_SEARCH_CACHE_DISABLED=1
+turns the cache off.
+
+Usage:
+    search = get_image_search()
+    by_query = search.search(["natural cleaning products homemade"], per_page=3)
+
+CLI:
+    python image_search.py "<query>" [provider,...]
+    python image_search.py stats
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable
+
+try:
+    import requests
+except ImportError:  # resolved at call time; module stays importable
+    requests = None
+
+PIPELINE_DIR = Path(__file__).parent
+IMAGE_SEARCH_CACHE_FILE = Path(
+    os.environ.get(
+        "IMAGE_SEARCH_CACHE_FILE", str(PIPELINE_DIR / "image_search_cache.json")
+    )
+)
+CACHE_VERSION = 1
+REQUEST_TIMEOUT = float(os.environ.get("IMAGE_SEARCH_TIMEOUT", "10"))
+MAX_WORKERS = int(os.environ.get("IMAGE_SEARCH_WORKERS", "8"))
+
+_WORD_RE = re.compile(r"[a-z]{3,}")
+
+
+# ============================================================================
+# Providers (responses normalized to one result shape)
+# ============================================================================
+def _pexels(query: str, per_page: int, page: int, api_key: str) -> list[dict]:
+    resp = requests.get(
+        "https://api.pexels.com/v1/search",
+        headers={"Authorization": api_key},
+        params={
+            "query": query,
+            "per_page": per_page,
+            "page": page,
+            "orientation": "landscape",
+        },
+        timeout=REQUEST_TIMEOUT,
+    )
+    resp.raise_for_status()
+    return [
+        {
+            "id": photo["id"],
+            "url": photo["src"]["large"],
+            "thumb": photo["src"]["medium"],
+            "source": "pexels",
+            "photographer": photo.get("photographer", "Unknown"),
+            "alt": photo.get("alt") or query,
+            "width": photo["width"],
+            "height": photo["height"],
+            "page_url": photo["url"],
+        }
+        for photo in resp.json().get("photos", [])
+    ]
+
+
+def _pixabay(query: str, per_page: int, page: int, api_key: str) -> list[dict]:
+    resp = requests.get(
+        "https://pixabay.com/api/",
+        params={
+            "key": api_key,
+            "q": query,
+            # Pixabay rejects per_page < 3
+            "per_page": max(3, per_page),
+            "page": page,
+            "image_type": "photo",
+            "orientation": "horizontal",
+            "safesearch": "true",
+        },
+        timeout=REQUEST_TIMEOUT,
+    )
+    resp.raise_for_status()
+    return [
+        {
+            "id": hit["id"],
+            "url": hit["largeImageURL"],
+            "thumb": hit["webformatURL"],
+            "source": "pixabay",
+            "photographer": hit.get("user", "Unknown"),
+            "alt": hit.get("tags") or query,
+            "width": hit["imageWidth"],
+            "height": hit["imageHeight"],
+            "page_url": hit["pageURL"],
+        }
+        for hit in resp.json().get("hits", [])[:per_page]
+    ]
+
+
+def _unsplash(query: str, per_page: int, page: int, api_key: str) -> list[dict]:
+    resp = requests.get(
+        "https://api.unsplash.com/search/photos",
+        headers={"Authorization": f"Client-ID {api_key}"},
+        params={
+            "query": query,
+            "per_page": per_page,
+            "page": page,
+            "orientation": "landscape",
+        },
+        timeout=REQUEST_TIMEOUT,
+    )
+    resp.raise_for_status()
+    return [
+        {
+            "id": photo["id"],
+            "url": photo["urls"]["regular"],
+            "thumb": photo["urls"]["small"],
+            "source": "unsplash",
+            "photographer": photo["user"]["name"],
+            "alt": photo.get("alt_description") or query,
+            "width": photo["width"],
+            "height": photo["height"],
+            "page_url": photo["links"]["html"],
+        }
+        for photo in resp.json().get("results", [])
+    ]
+
+
+# name -> (fetch, api key env var, default TTL seconds)
+PROVIDERS: dict[str, tuple[Callable, str, int]] = {
+    "pexels": (_pexels, "PEXELS_API_KEY", 24 * 3600),
+    "pixabay": (_pixabay, "PIXABAY_API_KEY", 24 * 3600),
+    "unsplash": (_unsplash, "UNSPLASH_ACCESS_KEY", 3600),
+}
+
+
+def provider_ttl(name: str) -> int:
+    default = PROVIDERS[name][2]
+    try:
+        return int(os.environ.get(f"IMAGE_SEARCH_TTL_{name.upper()}", default))
+    except ValueError:
+        return default
+
+
+def rank_score(result: dict, query: str) -> float:
+    """Keyword overlap of alt text with the query, small bonus for large images."""
+    query_words = set(_WORD_RE.findall(query.lower()))
+    alt_words = set(_WORD_RE.findall(str(result.get("alt", "")).lower()))
+    overlap = len(query_words & alt_words) / max(1, len(query_words))
+    size_bonus = 0.1 if (result.get("width") or 0) >= 1200 else 0.0
+    return round(overlap + size_bonus, 4)
+
+
+class FederatedImageSearch:
+    """Concurrent multi-provider search with a TTL'd on-disk response cache."""
+
+    def __init__(self, path: Path = IMAGE_SEARCH_CACHE_FILE):
+        self.path = Path(path)
+        self.disabled = os.environ.get("IMAGE_SEARCH_CACHE_DISABLED", "").lower() in {
+            "1",
+            "true",
+            "yes",
+        }
+        self.entries: dict[str, dict] = {}
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._load()
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+    def _load(self) -> None:
+        if self.disabled or not self.path.exists():
+            return
+        try:
+            payload = json.loads(self.path.read_text(encoding="utf-8"))
+        except (json.JSONDecodeError, OSError):
+            return
+        if payload.get("version") != CACHE_VERSION:
+            return
+        self.entries = payload.get("entries", {}) or {}
+
+    def save(self) -> None:
+        if self.disabled or not self._dirty:
+            return
+        now = time.time()
+        with self._lock:
+            # Drop expired responses so the file does not grow forever
+            self.entries = {
+                key: entry
+                for key, entry in self.entries.items()
+                if entry.get("provider") in PROVIDERS
+                and now - entry.get("ts", 0) < provider_ttl(entry["provider"])
+            }
+            # Serialized under the lock: search threads add entries meanwhile
+            text = json.dumps(
+                {"version": CACHE_VERSION, "entries": self.entries},
+                ensure_ascii=False,
+            )
+            self._dirty = False
+        tmp_path = self.path.with_name(
+            f"{self.path.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+        )
+        try:
+            tmp_path.write_text(text, encoding="utf-8")
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"⚠️ image search cache save failed: {e}")
+
+    @staticmethod
+    def _key(provider: str, query: str, page: int, per_page: int) -> str:
+        normalized = " ".join(query.lower().split())
+        return f"{provider}|{normalized}|{page}|{per_page}"
+
+    # ------------------------------------------------------------------
+    # Search
+    # ------------------------------------------------------------------
+    def configured_providers(self, api_keys: dict | None = None) -> list[str]:
+        api_keys = api_keys or {}
+        return [
+            name
+            for name, (_, env_var, _) in PROVIDERS.items()
+            if api_keys.get(name) or os.environ.get(env_var)
+        ]
+
+    def provider_search(
+        self,
+        provider: str,
+        query: str,
+        per_page: int = 5,
+        page: int = 1,
+        api_key: str = "",
+    ) -> list[dict]:
+        """One provider, one query; served from cache while within TTL."""
+        fetch, env_var, _ = PROVIDERS[provider]
+        api_key = api_key or os.environ.get(env_var, "")
+        if not api_key:
+            return []
+
+        key = self._key(provider, query, page, per_page)
+        if not self.disabled:
+            with self._lock:
+                entry = self.entries.get(key)
+            if entry and time.time() - entry.get("ts", 0) < provider_ttl(provider):
+                self.hits += 1
+                return list(entry["results"])
+
+        if requests is None:
+            print("⚠️ image search: requests is not installed")
+            return []
+        self.misses += 1
+        try:
+            results = fetch(query, per_page, page, api_key)
+        except Exception as e:
+            print(f"{provider.capitalize()} error for '{query}': {e}")
+            return []
+
+        if not self.disabled:
+            with self._lock:
+                self.entries[key] = {
+                    "provider": provider,
+                    "ts": time.time(),
+                    "results": results,
+                }
+                self._dirty = True
+        return results
+
+    def search(
+        self,
+        queries: list[str],
+        per_page: int = 3,
+        page: int = 1,
+        providers: tuple | list | None = None,
+        api_keys: dict | None = None,
+    ) -> dict[str, list[dict]]:
+        """All queries x providers in one concurrent burst.
+
+        Returns {query: merged results}; each result gets a "rank" score.
+        Results are round-robin merged across providers (so one provider
+        cannot crowd out the others), de-duplicated by URL, then stably
+        sorted by rank.
+        """
+        api_keys = api_keys or {}
+        names = [
+            name
+            for name in (providers or PROVIDERS)
+            if name in self.configured_providers(api_keys)
+        ]
+        jobs = [(query, name) for query in queries for name in names]
+        if not jobs:
+            return {query: [] for query in queries}
+
+        with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(jobs))) as pool:
+            futures = {
+                job: pool.submit(
+                    self.provider_search,
+                    job[1],
+                    job[0],
+                    per_page,
+                    page,
+                    api_keys.get(job[1], ""),
+                )
+                for job in jobs
+            }
+            responses = {job: future.result() for job, future in futures.items()}
+        self.save()
+
+        merged: dict[str, list[dict]] = {}
+        for query in queries:
+            per_provider = [responses[(query, name)] for name in names]
+            seen: set[str] = set()
+            results: list[dict] = []
+            for idx in range(max((len(r) for r in per_provider), default=0)):
+                for provider_results in per_provider:
+                    if idx >= len(provider_results):
+                        continue
+                    result = provider_results[idx]
+                    if result["url"] in seen:
+                        continue
+                    seen.add(result["url"])
+                    results.append(dict(result, rank=rank_score(result, query)))
+            results.sort(key=lambda r: -r["rank"])
+            merged[query] = results
+        return merged
+
+
+_shared_search: FederatedImageSearch | None = None
+
+
+def get_image_search() -> FederatedImageSearch:
+    """Process-wide search instance (cache loaded from disk once)."""
+    global _shared_search
+    if _shared_search is None:
+        _shared_search = FederatedImageSearch()
+    return _shared_search
+
+
+def main():
+    search = get_image_search()
+    if len(sys.argv) < 2 or sys.argv[1] == "stats":
+        print(f"Cached responses: {len(search.entries)}")
+        print(
+            f"Configured providers: {', '.join(search.configured_providers()) or 'none'}"
+        )
+        for name in PROVIDERS:
+            print(f"  {name}: TTL {provider_ttl(name)}s")
+        return
+    providers = sys.argv[2].split(",") if len(sys.argv) > 2 else None
+    started = time.time()
+    results = search.search([sys.argv[1]], per_page=5, providers=providers)
+    for result in results[sys.argv[1]]:
+        print(f"{result['rank']:.2f}  {result['source']:<8}  {result['url']}")
+    print(
+        f"{time.time() - started:.2f}s (cache hits {search.hits}, misses {search.misses})"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""llm_stream.py — Streamed LLM completions with early abort.
+
+call_openai_api, call_gemini_api and call_github_models_api waited for the
+whole ~7000-token completion before _clean_llm_output / _remove_title_spam /
+_remove_generic_phrases looked at it, so an answer that opened in markdown,
+was stuffed with banned phrases or put the H2 sections out of order cost
+a full generation before the next provider was tried.
+
+With a StreamGuard the calls stream instead (SSE: "stream": true for the
+OpenAI-compatible APIs, :streamGenerateContent?alt=sse for Gemini) and the
+guard checks the text as it arrives (every CHECK_INTERVAL chars):
+
+    markdown     "#"-headings instead of HTML
+    order        an <h2> that belongs before a section already written
+    banned       more distinct banned phrases than the larger of
+                 LLM_STREAM_MAX_BANNED and LLM_STREAM_BANNED_DENSITY per
+                 1000 words received (phrases in the title do not count)
+
+A violation closes the response and raises StreamAbort; the caller returns
+"" and generate_article_with_llm moves on to the next provider at once.
+Leading ```html fences and <html>/<body> wrappers are not violations —
+_clean_llm_output strips those. The banned-phrase limit is deliberately
+loose: a few stock phrases in a long article are _remove_generic_phrases'
+job, only an answer made of them is worth abandoning.
+
+Environment:
+    LLM_STREAM=0              disable streaming (full completions, no guard)
+    LLM_STREAM_MAX_BANNED     distinct banned phrases always tolerated (default 8)
+    LLM_STREAM_BANNED_DENSITY distinct banned phrases tolerated per 1000 words
+                              (default 4)
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+from typing import Callable, Iterable, Iterator, Sequence
+
+MAX_BANNED_PHRASES = int(os.environ.get("LLM_STREAM_MAX_BANNED", "8"))
+BANNED_PER_1000_WORDS = float(os.environ.get("LLM_STREAM_BANNED_DENSITY", "4"))
+# Checks run once this many new chars have arrived (deltas are a few chars)
+CHECK_INTERVAL = 64
+# An <h2> still open after this many chars is not a heading worth checking
+MAX_HEADING_CHARS = 300
+
+_H2_OPEN_RE = re.compile(r"<h2\b", re.IGNORECASE)
+_H2_RE = re.compile(r"<h2\b[^>]*>(.*?)</h2\s*>", re.IGNORECASE | re.DOTALL)
+_TAG_RE = re.compile(r"<[^>]+>")
+_MARKDOWN_HEADING_RE = re.compile(r"^\s{0,3}#{1,6}\s+\S", re.MULTILINE)
+
+
+class StreamAbort(Exception):
+    """A streamed completion hit a fatal violation."""
+
+    def __init__(self, reason: str, chars: int):
+        super().__init__(f"{reason} (after {chars} chars)")
+        self.reason = reason
+        self.chars = chars
+
+
+class StreamGuard:
+    """Incremental validator fed with the deltas of one completion.
+
+    section_order lists, per required H2 in prompt order, the keywords that
+    identify it (first entry = first section). Checks run every
+    CHECK_INTERVAL chars and only look at the text added since they last ran.
+    """
+
+    def __init__(
+        self,
+        title: str = "",
+        section_order: Sequence[Sequence[str]] = (),
+        banned_phrases: Iterable[str] = (),
+        max_banned: int = MAX_BANNED_PHRASES,
+        banned_density: float = BANNED_PER_1000_WORDS,
+    ):
+        title_lower = (title or "").lower()
+        self.section_order = [tuple(k.lower() for k in kws) for kws in section_order]
+        # Longest first, so "in this article we'll" is counted once, not
+        # again as "in this article" and "this article"
+        self.banned = sorted(
+            {p.lower() for p in banned_phrases if p and p.lower() not in title_lower},
+            key=len,
+            reverse=True,
+        )
+        self.max_banned = max_banned
+        self.banned_density = banned_density
+        self.words = 0
+        self._overlap = max((len(p) for p in self.banned), default=0)
+        self._parts: list[str] = []
+        self._size = 0
+        self._text = ""
+        self.found_banned: set[str] = set()
+        self.section_index = -1
+        self._checked = 0
+        self._h2_pos = 0
+        self._banned_pos = 0
+        self._line_pos = 0
+
+    @property
+    def text(self) -> str:
+        if self._parts:
+            self._text += "".join(self._parts)
+            self._parts = []
+        return self._text
+
+    def feed(self, delta: str) -> None:
+        """Add a delta; raises StreamAbort on a fatal violation."""
+        if not delta:
+            return
+        self._parts.append(delta)
+        self._size += len(delta)
+        if self._size - self._checked >= CHECK_INTERVAL:
+            self.check()
+
+    def check(self) -> None:
+        """Run the checks over everything received so far."""
+        self._checked = self._size
+        self._check_markdown()
+        self._check_sections()
+        self._check_banned()
+
+    def _abort(self, reason: str) -> None:
+        raise StreamAbort(reason, len(self.text))
+
+    def _check_markdown(self) -> None:
+        end = self.text.rfind("\n", self._line_pos)
+        if end <= self._line_pos:
+            return
+        lines = self.text[self._line_pos : end]
+        self._line_pos = end
+        if _MARKDOWN_HEADING_RE.search(lines):
+            self._abort("markdown headings instead of HTML")
+
+    def _section_candidates(self, heading: str) -> list[int]:
+        heading = heading.lower()
+        return [
+            i
+            for i, keywords in enumerate(self.section_order)
+            if any(k in heading for k in keywords)
+        ]
+
+    def _check_sections(self) -> None:
+        if not self.section_order:
+            return
+        text = self.text
+        while True:
+            opening = _H2_OPEN_RE.search(text, self._h2_pos)
+            if opening is None:
+                self._h2_pos = max(self._h2_pos, len(text) - 3)
+                return
+            match = _H2_RE.match(text, opening.start())
+            if match is None:
+                if len(text) - opening.start() > MAX_HEADING_CHARS:
+                    self._h2_pos = opening.end()
+                    continue
+                self._h2_pos = opening.start()  # heading still arriving
+                return
+            self._h2_pos = match.end()
+            heading = " ".join(_TAG_RE.sub(" ", match.group(1)).split())
+            candidates = self._section_candidates(heading)
+            if not candidates:
+                continue  # extra section: allowed
+            later = [i for i in candidates if i >= self.section_index]
+            if not later:
+                self._abort(f"H2 out of order: {heading!r}")
+            self.section_index = later[0]
+
+    def _check_banned(self) -> None:
+        if not self.banned:
+            return
+        text = self.text
+        window = text[max(self._banned_pos - self._overlap, 0) :].lower()
+        self.words += len(text[self._banned_pos :].split())
+        self._banned_pos = len(text)
+        found = self.found_banned
+        for phrase in self.banned:
+            if phrase in window and not any(phrase in f for f in found):
+                found.add(phrase)
+        limit = max(self.max_banned, self.banned_density * self.words / 1000)
+        if len(self.found_banned) > limit:
+            shown = ", ".join(sorted(self.found_banned)[:4])
+            self._abort(f"{len(self.found_banned)} banned phrases ({shown})")
+
+
+# ----------------------------------------------------------------------
+# Server-sent events
+# ----------------------------------------------------------------------
+def iter_sse_data(resp) -> Iterator[dict]:
+    """JSON payloads of the "data:" lines of a streamed response.
+
+    Lines are decoded as UTF-8 (the only SSE encoding): text/event-stream
+    carries no charset, so requests' decode_unicode would use ISO-8859-1.
+    """
+    for raw in resp.iter_lines():
+        line = raw.decode("utf-8", errors="replace")
+        if not line or not line.startswith("data:"):
+            continue
+        data = line[5:].strip()
+        if data == "[DONE]":
+            return
+        try:
+            yield json.loads(data)
+        except json.JSONDecodeError:
+            continue
+
+
+def openai_deltas(resp) -> Iterator[str]:
+    """Content deltas of an OpenAI-compatible chat completion stream."""
+    for event in iter_sse_data(resp):
+        for choice in event.get("choices") or []:
+            delta = (choice.get("delta") or {}).get("content")
+            if delta:
+                yield delta
+
+
+def gemini_deltas(resp) -> Iterator[str]:
+    """Text deltas of a Gemini streamGenerateContent (alt=sse) stream."""
+    for event in iter_sse_data(resp):
+        for candidate in (event.get("candidates") or [])[:1]:
+            for part in (candidate.get("content") or {}).get("parts") or []:
+                if part.get("text"):
+                    yield part["text"]
+
+
+def read_stream(
+    resp, deltas: Callable[[object], Iterator[str]], guard: StreamGuard
+) -> str:
+    """Feed a streamed response through the guard; full text if it passes.
+
+    On a violation the connection is closed (ending the generation) and
+    StreamAbort propagates to the caller.
+    """
+    try:
+        # No final check: once the completion is paid for, the usual
+        # _clean_llm_output / _remove_* passes deal with what is left
+        for delta in deltas(resp):
+            guard.feed(delta)
+    finally:
+        resp.close()
+    return guard.text
@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""related_index.py — Local TF-IDF index of published articles for internal linking.
+
+AIOrchestrator._add_internal_links used to download a page of 50 articles for
+every fix and pick 3 links with random.sample. This index keeps a small
+on-disk table of published articles (title, tags, H2/H3 headings) and answers
+"top-k most similar articles" from memory with an inverted index, so
+internal links cost no HTTP at fix time and point at related topics.
+
+Refresh:
+    - rebuild(articles)  replace everything (scan already fetches all articles)
+    - upsert(articles)   incremental, e.g. Shopify updated_at_min results
+    - remove(ids)        drop deleted / unpublished articles
+    - prune(live_ids)    drop everything Shopify no longer lists (deletions
+                         never show up in an updated_at_min sync)
+
+Only articles scoring at least RELATED_MIN_SCORE are returned; an article
+with no related posts gets no "related" links rather than random ones.
+
+CLI:
+    python related_index.py query "<title>" [k]
+    python related_index.py stats
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+import re
+import sys
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+
+PIPELINE_DIR = Path(__file__).parent
+RELATED_INDEX_FILE = Path(
+    os.environ.get(
+        "RELATED_INDEX_FILE", str(PIPELINE_DIR / "related_articles_index.json")
+    )
+)
+INDEX_VERSION = 1
+MIN_SCORE = float(os.environ.get("RELATED_MIN_SCORE", "0.1"))
+
+# Field weights: titles describe the topic best, headings add context
+TITLE_WEIGHT = 3.0
+TAG_WEIGHT = 2.0
+HEADING_WEIGHT = 1.0
+
+STOPWORDS = {
+    "the",
+    "and",
+    "for",
+    "with",
+    "your",
+    "you",
+    "from",
+    "that",
+    "this",
+    "how",
+    "what",
+    "why",
+    "when",
+    "are",
+    "can",
+    "into",
+    "our",
+    "its",
+    "their",
+    "them",
+    "they",
+    "was",
+    "were",
+    "will",
+    "about",
+    "than",
+    "then",
+    "more",
+    "most",
+    "best",
+    "easy",
+    "guide",
+    "tips",
+    "step",
+    "steps",
+    "faq",
+    "faqs",
+    "sources",
+    "further",
+    "reading",
+    "key",
+    "terms",
+    "common",
+    "questions",
+    "frequently",
+    "asked",
+    "answer",
+    "direct",
+    "pro",
+    "expert",
+    "experts",
+    "types",
+    "varieties",
+    "troubleshooting",
+    "issues",
+    "comparison",
+    "table",
+    "advanced",
+    "techniques",
+    "understanding",
+    "complete",
+    "conditions",
+    "glance",
+}
+
+_TOKEN_RE = re.compile(r"[a-z]{3,}")
+_HEADING_RE = re.compile(r"<h[23][^>]*>(.*?)</h[23]>", re.IGNORECASE | re.DOTALL)
+_TAG_RE = re.compile(r"<[^>]+>")
+
+
+def tokenize(text: str) -> list[str]:
+    tokens = []
+    for tok in _TOKEN_RE.findall((text or "").lower()):
+        if tok in STOPWORDS:
+            continue
+        # Light plural folding so "jars"/"jar" and "herbs"/"herb" match
+        if len(tok) > 4 and tok.endswith("s") and not tok.endswith("ss"):
+            tok = tok[:-1]
+        tokens.append(tok)
+    return tokens
+
+
+def extract_headings(body_html: str) -> list[str]:
+    return [_TAG_RE.sub(" ", h).strip() for h in _HEADING_RE.findall(body_html or "")]
+
+
+def term_weights(title: str, tags: str = "", headings: list[str] | None = None) -> dict:
+    """Weighted term frequencies for one document (or query)."""
+    weights: Counter = Counter()
+    for tok in tokenize(title):
+        weights[tok] += TITLE_WEIGHT
+    for tok in tokenize((tags or "").replace(",", " ")):
+        weights[tok] += TAG_WEIGHT
+    for heading in headings or []:
+        for tok in tokenize(heading):
+            weights[tok] += HEADING_WEIGHT
+    return dict(weights)
+
+
+class RelatedArticleIndex:
+    """In-memory TF-IDF over {article_id: doc}, persisted as JSON."""
+
+    def __init__(self, path: Path = RELATED_INDEX_FILE):
+        self.path = Path(path)
+        self.docs: dict[str, dict] = {}
+        self.last_sync: str = ""
+        self._postings: dict[str, list[tuple[str, float]]] | None = None
+        self._idf: dict[str, float] = {}
+        self._load()
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        try:
+            payload = json.loads(self.path.read_text(encoding="utf-8"))
+        except (json.JSONDecodeError, OSError):
+            return
+        if payload.get("version") != INDEX_VERSION:
+            return
+        self.docs = payload.get("docs", {}) or {}
+        self.last_sync = payload.get("last_sync", "")
+
+    def save(self) -> None:
+        payload = {
+            "version": INDEX_VERSION,
+            "last_sync": self.last_sync,
+            "docs": self.docs,
+        }
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        try:
+            tmp_path.write_text(
+                json.dumps(payload, ensure_ascii=False), encoding="utf-8"
+            )
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"⚠️ related index save failed: {e}")
+
+    # ------------------------------------------------------------------
+    # Refresh
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _doc_from_article(article: dict) -> dict:
+        return {
+            "handle": article.get("handle", ""),
+            "title": article.get("title", ""),
+            "published_at": article.get("published_at") or "",
+            "terms": term_weights(
+                article.get("title", ""),
+                article.get("tags", ""),
+                extract_headings(article.get("body_html", "")),
+            ),
+        }
+
+    def upsert(self, articles: list[dict]) -> int:
+        """Add/replace articles; unpublished ones are dropped. Returns count indexed."""
+        count = 0
+        for article in articles:
+            article_id = str(article.get("id", ""))
+            if not article_id:
+                continue
+            if not article.get("published_at") or not article.get("handle"):
+                self.docs.pop(article_id, None)
+                continue
+            self.docs[article_id] = self._doc_from_article(article)
+            count += 1
+        # UTC so it can be passed straight to Shopify's updated_at_min
+        self.last_sync = datetime.now(timezone.utc).isoformat()
+        self._postings = None
+        return count
+
+    def rebuild(self, articles: list[dict]) -> int:
+        """Replace the whole index with `articles` (drops deleted articles)."""
+        self.docs = {}
+        return self.upsert(articles)
+
+    def remove(self, article_ids: list[str]) -> None:
+        for article_id in article_ids:
+            self.docs.pop(str(article_id), None)
+        self._postings = None
+
+    def prune(self, live_ids) -> int:
+        """Drop indexed articles not in `live_ids` (all published ids). Returns count."""
+        live = {str(x) for x in live_ids}
+        gone = [article_id for article_id in self.docs if article_id not in live]
+        self.remove(gone)
+        return len(gone)
+
+    def sync_age_hours(self) -> float | None:
+        if not self.last_sync:
+            return None
+        try:
+            synced = datetime.fromisoformat(self.last_sync)
+        except ValueError:
+            return None
+        if synced.tzinfo is None:
+            synced = synced.replace(tzinfo=timezone.utc)
+        return (datetime.now(timezone.utc) - synced).total_seconds() / 3600
+
+    # ------------------------------------------------------------------
+    # Query
+    # ------------------------------------------------------------------
+    def _build_postings(self) -> None:
+        n_docs = len(self.docs)
+        df: Counter = Counter()
+        for doc in self.docs.values():
+            df.update(doc["terms"].keys())
+        self._idf = {
+            term: math.log((n_docs + 1) / (count + 1)) + 1.0
+            for term, count in df.items()
+        }
+        postings: dict[str, list[tuple[str, float]]] = defaultdict(list)
+        for article_id, doc in self.docs.items():
+            vec = {t: w * self._idf[t] for t, w in doc["terms"].items()}
+            norm = math.sqrt(sum(v * v for v in vec.values())) or 1.0
+            for term, value in vec.items():
+                postings[term].append((article_id, value / norm))
+        self._postings = dict(postings)
+
+    def top_k(
+        self,
+        title: str,
+        k: int = 3,
+        tags: str = "",
+        headings: list[str] | None = None,
+        exclude_ids: set[str] | None = None,
+        min_score: float = MIN_SCORE,
+    ) -> list[dict]:
+        """Most similar published articles: [{id, handle, title, score}, ...].
+
+        Up to k articles scoring at least min_score; fewer (or none) when
+        fewer are related. Ties break on article id, so results are stable.
+        """
+        if self._postings is None:
+            self._build_postings()
+        exclude = {str(x) for x in (exclude_ids or set())}
+
+        query = term_weights(title, tags, headings)
+        qvec = {t: w * self._idf[t] for t, w in query.items() if t in self._idf}
+        qnorm = math.sqrt(sum(v * v for v in qvec.values())) or 1.0
+
+        scores: dict[str, float] = defaultdict(float)
+        for term, qval in qvec.items():
+            for article_id, dval in self._postings.get(term, []):
+                scores[article_id] += (qval / qnorm) * dval
+
+        ranked = sorted(
+            (
+                (score, article_id)
+                for article_id, score in scores.items()
+                if article_id not in exclude and score >= min_score
+            ),
+            key=lambda x: (-x[0], x[1]),
+        )
+        picked = [article_id for _, article_id in ranked[:k]]
+
+        return [
+            {
+                "id": article_id,
+                "handle": self.docs[article_id]["handle"],
+                "title": self.docs[article_id]["title"],
+                "score": round(scores.get(article_id, 0.0), 4),
+            }
+            for article_id in picked
+        ]
+
+
+_shared_index: RelatedArticleIndex | None = None
+
+
+def get_related_index() -> RelatedArticleIndex:
+    """Process-wide index instance (loaded from disk once)."""
+    global _shared_index
+    if _shared_index is None:
+        _shared_index = RelatedArticleIndex()
+    return _shared_index
+
+
+def main():
+    index = get_related_index()
+    if len(sys.argv) < 2 or sys.argv[1] == "stats":
+        age = index.sync_age_hours()
+        print(f"Indexed articles: {len(index.docs)}")
+        print(
+            f"Last sync: {index.last_sync or 'never'}"
+            + (f" ({age:.1f}h ago)" if age is not None else "")
+        )
+        return
+    if sys.argv[1] == "query" and len(sys.argv) > 2:
+        k = int(sys.argv[3]) if len(sys.argv) > 3 and sys.argv[3].isdigit() else 5
+        for hit in index.top_k(sys.argv[2], k=k):
+            print(f"{hit['score']:.3f}  {hit['id']}  {hit['title']}")
+        return
+    print('Usage: python related_index.py [stats | query "<title>" [k]]')
+
+
+if __name__ == "__main__":
+    main()
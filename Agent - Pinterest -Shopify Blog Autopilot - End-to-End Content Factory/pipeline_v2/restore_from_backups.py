@@ -4,28 +4,50 @@ Restore Shopify articles from local backups.
 
 Default behavior:
 - Scan backups_auto_fix/*.json
-- For each article: run pre_publish_review on current article
-- If current FAILS, restore from backup, then re-run review
-- Save current version to backups_restore/ before overwriting
+- Plan: fetch + pre_publish_review every current article in parallel
+  (RESTORE_WORKERS threads), keep the ones that FAIL (up to --limit)
+- Apply: restore those concurrently, then re-run review on the result
+- Snapshot the current version (snapshot_store) before overwriting
+
+All Shopify calls share one pooled session and one rate budget
+(http_pool.shopify_budget), so more workers never exceed the API limit; a
+429 waits for Retry-After. Every finished article is appended to
+restore_journal.jsonl; --resume skips the ones a previous run restored,
+reverted or found passing. An article whose fetch, review, restore or
+revert fails is journaled as "failed" (retried on --resume) and the run
+goes on. --dry-run leaves the journal untouched.
+
+--snapshot VERSION restores a snapshot_store version (index, timestamp
+prefix or label) instead of backups_auto_fix/.
+
+Reviews run in-process on the article already fetched / returned by the
+restore PUT (fixers.run_review); --subprocess-review spawns
+pre_publish_review.py per article instead.
 """
 import argparse
 import json
 import os
 import re
-import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime, timezone
 
-import requests
-import subprocess
 from dotenv import load_dotenv
 
+from fixers import run_review
+from http_pool import get_session, shopify_budget
+from snapshot_store import get_snapshot_store
+
 PIPELINE_DIR = Path(__file__).parent
 CONTENT_DIR = PIPELINE_DIR.parent
 BACKUP_DIR = PIPELINE_DIR / "backups_auto_fix"
-RESTORE_DIR = PIPELINE_DIR / "backups_restore"
-REVIEW_SCRIPT = CONTENT_DIR / "scripts" / "pre_publish_review.py"
+JOURNAL_PATH = Path(os.environ.get("RESTORE_JOURNAL_FILE", str(PIPELINE_DIR / "restore_journal.jsonl")))
+MAX_WORKERS = int(os.environ.get("RESTORE_WORKERS", "8"))
+MAX_RATE_LIMIT_RETRIES = 3
+# Journal actions that finish an article for --resume
+DONE_ACTIONS = {"restored", "revert", "skip"}
 
 # Load env from common locations
 for env_path in [
@@ -52,24 +74,43 @@ def _extract_id_from_name(name: str) -> str | None:
     return match.group(1) if match else None
 
 
+def _shopify(method: str, url: str, **kwargs):
+    """Shopify request inside the shared rate budget; waits out HTTP 429."""
+    for _ in range(MAX_RATE_LIMIT_RETRIES):
+        shopify_budget().acquire()
+        resp = get_session().request(method, url, headers=HEADERS, **kwargs)
+        if resp.status_code != 429:
+            return resp
+        time.sleep(float(resp.headers.get("Retry-After") or 2))
+    return resp
+
+
 def _get_article(article_id: str) -> dict | None:
     url = f"https://{SHOP}/admin/api/{API_VERSION}/blogs/{BLOG_ID}/articles/{article_id}.json"
-    resp = requests.get(url, headers=HEADERS, timeout=30)
+    resp = _shopify("GET", url, timeout=30)
     if resp.status_code != 200:
         print(f"[WARN] Fetch article {article_id} failed: HTTP {resp.status_code}")
         return None
     return resp.json().get("article")
 
 
-def _save_current_backup(article: dict, article_id: str) -> Path:
-    RESTORE_DIR.mkdir(parents=True, exist_ok=True)
-    ts = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
-    path = RESTORE_DIR / f"{article_id}_current_{ts}.json"
-    path.write_text(json.dumps(article, ensure_ascii=False, indent=2), encoding="utf-8")
-    return path
+def _save_current_backup(article: dict, article_id: str) -> dict:
+    """Snapshot the current article; returns its snapshot_store version entry."""
+    return get_snapshot_store().put({**article, "id": article_id}, label="pre_restore")
+
 
+def _load_backup(article_id: str, snapshot: str | None = None) -> dict | None:
+    """Backup to restore: a snapshot_store version, or backups_auto_fix/<id>_backup.json."""
+    if snapshot is not None:
+        return get_snapshot_store().get(article_id, snapshot)
+    backup_path = BACKUP_DIR / f"{article_id}_backup.json"
+    if not backup_path.exists():
+        return None
+    return json.loads(backup_path.read_text(encoding="utf-8"))
 
-def _restore_from_backup(backup: dict, article_id: str) -> bool:
+
+def _restore_from_backup(backup: dict, article_id: str) -> dict | None:
+    """PUT the backup over the article; returns the updated article (or None)."""
     url = f"https://{SHOP}/admin/api/{API_VERSION}/blogs/{BLOG_ID}/articles/{article_id}.json"
     payload = {
         "article": {
@@ -84,34 +125,136 @@ def _restore_from_backup(backup: dict, article_id: str) -> bool:
             "published_at": backup.get("published_at", None),
         }
     }
-    resp = requests.put(url, headers=HEADERS, data=json.dumps(payload), timeout=60)
+    resp = _shopify("PUT", url, data=json.dumps(payload), timeout=60)
     if resp.status_code not in {200, 201}:
         print(f"[FAIL] Restore {article_id} failed: HTTP {resp.status_code} {resp.text[:200]}")
-        return False
+        return None
     print(f"[OK] Restored article {article_id} from backup.")
-    return True
+    return resp.json().get("article") or {"id": int(article_id), **payload["article"]}
 
 
-def _run_review(article_id: str) -> bool:
-    if not REVIEW_SCRIPT.exists():
-        print("[WARN] pre_publish_review.py not found; skipping review.")
-        return True
+def _run_review(article_id: str, article: dict | None = None, isolate: bool = False) -> bool:
+    """pre_publish_review on the given article dict (fetched by ID if None)."""
     try:
-        result = subprocess.run(
-            [sys.executable, str(REVIEW_SCRIPT), str(article_id)],
-            cwd=str(CONTENT_DIR),
-            capture_output=True,
-            text=True,
-            timeout=120,
-        )
-        if result.returncode != 0 and result.stderr:
-            print(f"[WARN] pre_publish_review: {result.stderr[:200]}")
-        return result.returncode == 0
+        result = run_review(article or article_id, isolate=isolate)
+        if not result.passed and result.output.strip():
+            print(f"[WARN] pre_publish_review: {result.output.strip()[:200]}")
+        return result.passed
     except Exception as exc:
         print(f"[WARN] pre_publish_review failed to run: {exc}")
         return False
 
 
+class Journal:
+    """Append-only restore progress (one JSON line per finished article).
+
+    A dry-run journal is read-only: it neither truncates nor appends, so a
+    dry run never hides articles from a later real --resume.
+    """
+
+    def __init__(self, path: Path = JOURNAL_PATH, resume: bool = False, dry_run: bool = False):
+        self.path = path
+        self.dry_run = dry_run
+        self._lock = threading.Lock()
+        self.done: set[str] = set()
+        if resume and path.exists():
+            for line in path.read_text(encoding="utf-8").splitlines():
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # torn last line
+                if entry.get("action") in DONE_ACTIONS:
+                    self.done.add(str(entry.get("id")))
+        elif path.exists() and not dry_run:
+            path.unlink()
+
+    def record(self, entry: dict) -> dict:
+        if self.dry_run:
+            return entry
+        line = json.dumps({**entry, "ts": datetime.now(timezone.utc).isoformat()}, ensure_ascii=False)
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+        return entry
+
+
+def _evaluate(article_id: str, args) -> dict | None:
+    """Current article, its backup and whether the current one passes review."""
+    backup = _load_backup(article_id, args.snapshot)
+    if not backup:
+        return None
+    current = _get_article(article_id)
+    if not current:
+        return None
+    passed = False if args.force else _run_review(article_id, current, isolate=args.subprocess_review)
+    return {"id": article_id, "current": current, "backup": backup, "passed": passed}
+
+
+def plan_restores(ids: list[str], args, journal: Journal, workers: int):
+    """Evaluate articles in parallel batches; (restore set, skip entries, reviewed)."""
+    to_restore: list[dict] = []
+    skipped: list[dict] = []
+    reviewed = 0
+    pending = [aid for aid in ids if aid not in journal.done]
+    batch_size = max(workers * 4, 1)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for start in range(0, len(pending), batch_size):
+            if len(to_restore) >= args.limit:
+                break
+            batch = pending[start : start + batch_size]
+            futures = {aid: pool.submit(_evaluate, aid, args) for aid in batch}
+            for aid in batch:  # keep the requested order
+                try:
+                    evaluation = futures[aid].result()
+                except Exception as exc:
+                    print(f"[FAIL] Evaluate {aid} failed: {exc}")
+                    skipped.append(journal.record({"id": aid, "action": "failed", "reason": f"evaluate_error: {exc}"}))
+                    continue
+                if evaluation is None:
+                    continue
+                if not args.force:
+                    reviewed += 1
+                if evaluation["passed"]:
+                    print(f"[SKIP] {aid}: current article passes review.")
+                    skipped.append(journal.record({"id": aid, "action": "skip", "reason": "current_pass"}))
+                elif len(to_restore) < args.limit:
+                    to_restore.append(evaluation)
+    return to_restore, skipped, reviewed
+
+
+def _apply_restore(evaluation: dict, args, journal: Journal) -> dict:
+    """Restore one planned article; an error is journaled as "failed", not raised."""
+    try:
+        return _restore_one(evaluation, args, journal)
+    except Exception as exc:
+        print(f"[FAIL] Restore {evaluation['id']} failed: {exc}")
+        return journal.record({"id": evaluation["id"], "action": "failed", "reason": f"error: {exc}"})
+
+
+def _restore_one(evaluation: dict, args, journal: Journal) -> dict:
+    """Restore one planned article, re-review it, revert if it still fails."""
+    article_id = evaluation["id"]
+    if args.dry_run:
+        print(f"[DRY] Would restore {article_id} from backup.")
+        return journal.record({"id": article_id, "action": "dry_run_restore"})
+
+    current_version = _save_current_backup(evaluation["current"], article_id)
+    restored_article = _restore_from_backup(evaluation["backup"], article_id)
+    if not restored_article:
+        return journal.record({"id": article_id, "action": "failed", "reason": "restore_put_failed"})
+    backup_pass = _run_review(article_id, restored_article, isolate=args.subprocess_review)
+    if backup_pass or args.keep_failed:
+        return journal.record({"id": article_id, "action": "restored"})
+    # Revert to current if backup still fails review
+    revert_payload = get_snapshot_store().get(article_id, current_version["n"])
+    if not revert_payload or not _restore_from_backup(revert_payload, article_id):
+        # Still on the failing backup: leave it for --resume
+        print(f"[FAIL] Backup failed review and revert failed for {article_id}")
+        return journal.record({"id": article_id, "action": "failed", "reason": "revert_put_failed"})
+    print(f"[REVERT] Backup failed review; restored current version for {article_id}")
+    return journal.record({"id": article_id, "action": "revert", "reason": "backup_failed_review"})
+
+
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--ids", help="Comma-separated article IDs")
@@ -124,6 +267,17 @@ def main():
         help="Keep backup even if it fails review (default reverts to current)",
     )
     parser.add_argument("--dry-run", action="store_true", help="Do not write to Shopify")
+    parser.add_argument(
+        "--subprocess-review",
+        action="store_true",
+        help="Run pre_publish_review.py in a separate process per article",
+    )
+    parser.add_argument(
+        "--snapshot",
+        help="Restore this snapshot_store version (index, timestamp prefix or label)",
+    )
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS, help="Concurrent articles (RESTORE_WORKERS)")
+    parser.add_argument("--resume", action="store_true", help="Skip articles finished in restore_journal.jsonl")
     args = parser.parse_args()
 
     ids: list[str] = []
@@ -134,6 +288,8 @@ def main():
         if path.exists():
             ids.extend([x.strip() for x in path.read_text(encoding="utf-8").splitlines() if x.strip()])
 
+    if not ids and args.snapshot is not None:
+        ids = get_snapshot_store().article_ids()
     if not ids:
         backup_files = sorted(BACKUP_DIR.glob("*_backup.json"))
         for backup in backup_files:
@@ -141,51 +297,17 @@ def main():
             if aid:
                 ids.append(aid)
 
-    restored = 0
-    skipped = 0
-    reviewed = 0
-    log_entries = []
-    for article_id in ids:
-        if restored >= args.limit:
-            break
-        backup_path = BACKUP_DIR / f"{article_id}_backup.json"
-        if not backup_path.exists():
-            continue
-
-        print(f"\n[CHECK] Article {article_id}")
-        current = _get_article(article_id)
-        if not current:
-            continue
-
-        if not args.force:
-            reviewed += 1
-            current_pass = _run_review(article_id)
-            if current_pass:
-                print("[SKIP] Current article passes review.")
-                skipped += 1
-                log_entries.append({"id": article_id, "action": "skip", "reason": "current_pass"})
-                continue
-
-        if args.dry_run:
-            print("[DRY] Would restore from backup.")
-            restored += 1
-            log_entries.append({"id": article_id, "action": "dry_run_restore"})
-            continue
-
-        current_backup = _save_current_backup(current, article_id)
-        backup = json.loads(backup_path.read_text(encoding="utf-8"))
-        if _restore_from_backup(backup, article_id):
-            backup_pass = _run_review(article_id)
-            if backup_pass or args.keep_failed:
-                restored += 1
-                log_entries.append({"id": article_id, "action": "restored"})
-            else:
-                # Revert to current if backup still fails review
-                revert_payload = json.loads(current_backup.read_text(encoding="utf-8"))
-                _restore_from_backup(revert_payload, article_id)
-                print(f"[REVERT] Backup failed review; restored current version for {article_id}")
-                log_entries.append({"id": article_id, "action": "revert", "reason": "backup_failed_review"})
-        time.sleep(2)
+    journal = Journal(resume=args.resume, dry_run=args.dry_run)
+    workers = max(1, args.workers)
+    started = time.perf_counter()
+    to_restore, log_entries, reviewed = plan_restores(ids, args, journal, workers)
+    print(f"\n[PLAN] {len(to_restore)} article(s) to restore, {len(log_entries)} passing, {len(journal.done)} done earlier")
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(lambda ev: _apply_restore(ev, args, journal), to_restore))
+    log_entries.extend(results)
+    restored = sum(1 for e in results if e["action"] in {"restored", "dry_run_restore"})
+    skipped = sum(1 for e in log_entries if e["action"] == "skip")
 
     summary = {
         "restored": restored,
@@ -200,7 +322,7 @@ def main():
         json.dumps(summary, ensure_ascii=False, indent=2),
         encoding="utf-8",
     )
-    print(f"\nDone. Restored: {restored}, Skipped: {skipped}, Reviewed: {reviewed}")
+    print(f"\nDone in {time.perf_counter() - started:.0f}s. Restored: {restored}, Skipped: {skipped}, Reviewed: {reviewed}")
     print(f"[LOG] {log_path}")
 
 
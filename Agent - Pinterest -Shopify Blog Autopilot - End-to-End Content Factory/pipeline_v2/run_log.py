@@ -0,0 +1,421 @@
+#!/usr/bin/env python3
+"""run_log.py — Append-only anti-drift run log with a latest-status index.
+
+AIOrchestrator._append_run_log appends one CSV row per queue/fix attempt
+(anti_drift_run_log.csv, thousands of rows). fix-failed and the status
+commands used to re-read and re-parse the whole history to find the latest
+status of each article. This module keeps the log append-only and maintains
+a small sidecar index:
+
+    anti_drift_run_log.index.json
+        files   {log file: {offset, rows, max_ts}}  bytes already indexed
+        latest  {article_id: last row}              latest status per article
+
+Every query first reads only the bytes appended since the stored offset
+(including rows written by other processes), so cost follows what changed,
+not the size of the history.
+
+Storage backends (RUN_LOG_BACKEND):
+    csv       (default) the single anti_drift_run_log.csv the workflows upload
+    segments  run_log/segment-000001.csv, ... rolled every RUN_LOG_SEGMENT_ROWS
+              rows; the legacy CSV is still read as the oldest segment
+
+Queries:
+    failed_since(hours)     articles whose latest status is failed
+    failed_ids()            every article currently failed, oldest first
+    top_failing_checks(n)   issue codes across currently failed articles
+    status_counts()         latest status -> article count
+    iter_rows(since)        full history (skips segments older than `since`)
+    export_parquet(path)    needs pyarrow (optional)
+
+CLI:
+    python run_log.py stats
+    python run_log.py failed [hours]
+    python run_log.py top-checks [n] [hours]
+    python run_log.py export-parquet <path>
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+import os
+import re
+import sys
+from collections import Counter
+from datetime import datetime, timedelta
+from pathlib import Path
+
+PIPELINE_DIR = Path(__file__).parent
+RUN_LOG_FILE = PIPELINE_DIR / "anti_drift_run_log.csv"
+RUN_LOG_SEGMENT_DIR = PIPELINE_DIR / "run_log"
+RUN_LOG_INDEX_FILE = PIPELINE_DIR / "anti_drift_run_log.index.json"
+RUN_LOG_BACKEND = os.environ.get("RUN_LOG_BACKEND", "csv").lower()
+RUN_LOG_SEGMENT_ROWS = int(os.environ.get("RUN_LOG_SEGMENT_ROWS", "5000"))
+INDEX_VERSION = 1
+
+RUN_LOG_FIELDS = [
+    "timestamp",
+    "article_id",
+    "title",
+    "status",
+    "gate_score",
+    "gate_pass",
+    "issues",
+    "spec_hash",
+    "goldens_hash",
+]
+_ISSUE_CODE_RE = re.compile(r"^[A-Z][A-Z0-9_]{2,}")
+
+
+def _parse_ts(value: str) -> datetime | None:
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def issue_codes(issues: str) -> list[str]:
+    """'HARD_BLOCK: Word count 1501 < 1800; GATE_FAIL' -> ['HARD_BLOCK', 'GATE_FAIL']."""
+    codes = []
+    for part in (issues or "").split(";"):
+        part = part.strip()
+        if not part:
+            continue
+        match = _ISSUE_CODE_RE.match(part)
+        codes.append(match.group(0) if match else part.split(":", 1)[0][:60])
+    return codes
+
+
+# ============================================================================
+# Storage backends
+# ============================================================================
+class CsvRunLogStore:
+    """Single append-only CSV (the file GitHub Actions uploads as artifact)."""
+
+    name = "csv"
+
+    def __init__(self, path: Path = RUN_LOG_FILE):
+        self.path = Path(path)
+
+    def files(self) -> list[Path]:
+        return [self.path] if self.path.exists() else []
+
+    def append(self, row: list, indexed_rows: dict) -> None:
+        _append_csv_row(self.path, row)
+
+
+class SegmentRunLogStore:
+    """Append-only segments; a full segment is never written again."""
+
+    name = "segments"
+
+    def __init__(
+        self,
+        directory: Path = RUN_LOG_SEGMENT_DIR,
+        legacy_file: Path = RUN_LOG_FILE,
+        segment_rows: int = RUN_LOG_SEGMENT_ROWS,
+    ):
+        self.directory = Path(directory)
+        self.legacy_file = Path(legacy_file)
+        self.segment_rows = segment_rows
+
+    def files(self) -> list[Path]:
+        files = [self.legacy_file] if self.legacy_file.exists() else []
+        if self.directory.exists():
+            files.extend(sorted(self.directory.glob("segment-*.csv")))
+        return files
+
+    def append(self, row: list, indexed_rows: dict) -> None:
+        segments = (
+            sorted(self.directory.glob("segment-*.csv"))
+            if self.directory.exists()
+            else []
+        )
+        target = segments[-1] if segments else None
+        if target is None or indexed_rows.get(target.name, 0) >= self.segment_rows:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            target = self.directory / f"segment-{len(segments) + 1:06d}.csv"
+        _append_csv_row(target, row)
+
+
+def _append_csv_row(path: Path, row: list) -> None:
+    new_file = not path.exists()
+    with open(path, "a", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        if new_file:
+            writer.writerow(RUN_LOG_FIELDS)
+        writer.writerow(row)
+
+
+def get_store(backend: str = RUN_LOG_BACKEND):
+    if backend == "segments":
+        return SegmentRunLogStore()
+    return CsvRunLogStore()
+
+
+# ============================================================================
+# Run log + index
+# ============================================================================
+class RunLog:
+    def __init__(self, store=None, index_path: Path = RUN_LOG_INDEX_FILE):
+        self.store = store or get_store()
+        self.index_path = Path(index_path)
+        self.files: dict[str, dict] = {}
+        self.latest: dict[str, dict] = {}
+        self._load_index()
+
+    # ------------------------------------------------------------------
+    # Index persistence
+    # ------------------------------------------------------------------
+    def _load_index(self) -> None:
+        if not self.index_path.exists():
+            return
+        try:
+            payload = json.loads(self.index_path.read_text(encoding="utf-8"))
+        except (json.JSONDecodeError, OSError):
+            return
+        if (
+            payload.get("version") != INDEX_VERSION
+            or payload.get("backend") != self.store.name
+        ):
+            return
+        self.files = payload.get("files", {}) or {}
+        self.latest = payload.get("latest", {}) or {}
+
+    def _save_index(self) -> None:
+        payload = {
+            "version": INDEX_VERSION,
+            "backend": self.store.name,
+            "files": self.files,
+            "latest": self.latest,
+        }
+        tmp_path = self.index_path.with_suffix(self.index_path.suffix + ".tmp")
+        try:
+            tmp_path.write_text(
+                json.dumps(payload, ensure_ascii=False), encoding="utf-8"
+            )
+            os.replace(tmp_path, self.index_path)
+        except OSError as e:
+            print(f"⚠️ run log index save failed: {e}")
+
+    # ------------------------------------------------------------------
+    # Incremental indexing
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _rows_from(text: str, skip_header: bool):
+        reader = csv.reader(io.StringIO(text))
+        for values in reader:
+            if skip_header and values == RUN_LOG_FIELDS:
+                continue
+            # Skip malformed lines (e.g. merge-conflict markers in a committed log)
+            if len(values) != len(RUN_LOG_FIELDS) or not _parse_ts(values[0]):
+                continue
+            yield dict(zip(RUN_LOG_FIELDS, values))
+
+    @staticmethod
+    def _offset_valid(path: Path, offset: int) -> bool:
+        if offset == 0:
+            return True
+        if path.stat().st_size < offset:
+            return False
+        with open(path, "rb") as f:
+            f.seek(offset - 1)
+            return f.read(1) == b"\n"
+
+    def refresh(self) -> int:
+        """Index rows appended since the last call. Returns rows read."""
+        files = self.store.files()
+        names = {path.name for path in files}
+        # A log that shrank, disappeared or no longer has a row boundary at
+        # the stored offset was rewritten (e.g. git merge): start over
+        rewritten = any(name not in names for name in self.files) or any(
+            not self._offset_valid(path, self.files.get(path.name, {}).get("offset", 0))
+            for path in files
+        )
+        if rewritten:
+            self.files = {}
+            self.latest = {}
+
+        new_rows = 0
+        for path in files:
+            state = self.files.setdefault(
+                path.name, {"offset": 0, "rows": 0, "max_ts": ""}
+            )
+            size = path.stat().st_size
+            if size <= state["offset"]:
+                continue
+            with open(path, "rb") as f:
+                f.seek(state["offset"])
+                chunk = f.read(size - state["offset"])
+            # Only consume whole lines; a row being written stays for next time
+            end = chunk.rfind(b"\n")
+            if end < 0:
+                continue
+            text = chunk[: end + 1].decode("utf-8", errors="replace")
+            for row in self._rows_from(text, skip_header=state["offset"] == 0):
+                self.latest[row["article_id"]] = {
+                    key: row[key]
+                    for key in ("timestamp", "title", "status", "gate_score", "issues")
+                }
+                state["rows"] += 1
+                state["max_ts"] = max(state["max_ts"], row["timestamp"])
+                new_rows += 1
+            state["offset"] += end + 1
+
+        if new_rows or rewritten:
+            self._save_index()
+        return new_rows
+
+    # ------------------------------------------------------------------
+    # Write
+    # ------------------------------------------------------------------
+    def append(
+        self,
+        article_id: str,
+        title: str,
+        status: str,
+        gate_score,
+        gate_pass: bool,
+        issues: str,
+        spec_hash: str = "",
+        goldens_hash: str = "",
+    ) -> None:
+        self.refresh()
+        indexed_rows = {name: state["rows"] for name, state in self.files.items()}
+        self.store.append(
+            [
+                datetime.now().isoformat(),
+                article_id,
+                title,
+                status,
+                gate_score,
+                gate_pass,
+                issues,
+                spec_hash,
+                goldens_hash,
+            ],
+            indexed_rows,
+        )
+        self.refresh()
+
+    # ------------------------------------------------------------------
+    # Queries (latest status per article)
+    # ------------------------------------------------------------------
+    def status_counts(self) -> dict:
+        self.refresh()
+        return dict(Counter(row["status"] for row in self.latest.values()))
+
+    def failed_since(self, hours: float | None = None) -> list[dict]:
+        """Articles whose latest status is failed, newest first."""
+        self.refresh()
+        cutoff = (
+            (datetime.now() - timedelta(hours=hours)).isoformat()
+            if hours is not None
+            else ""
+        )
+        failed = [
+            {"article_id": article_id, **row}
+            for article_id, row in self.latest.items()
+            if row["status"] == "failed" and row["timestamp"] >= cutoff
+        ]
+        return sorted(failed, key=lambda r: r["timestamp"], reverse=True)
+
+    def failed_ids(self) -> list[str]:
+        """Every article currently failed, oldest failure first."""
+        return [row["article_id"] for row in reversed(self.failed_since())]
+
+    def top_failing_checks(
+        self, n: int = 10, hours: float | None = None
+    ) -> list[tuple[str, int]]:
+        counts: Counter = Counter()
+        for row in self.failed_since(hours):
+            counts.update(set(issue_codes(row["issues"])))
+        return counts.most_common(n)
+
+    # ------------------------------------------------------------------
+    # History
+    # ------------------------------------------------------------------
+    def iter_rows(self, since: datetime | None = None):
+        """Every logged row in order; segments entirely before `since` are skipped."""
+        self.refresh()
+        since_ts = since.isoformat() if since else ""
+        for path in self.store.files():
+            state = self.files.get(path.name, {})
+            if since_ts and state.get("max_ts", "") < since_ts:
+                continue
+            with open(path, "r", encoding="utf-8", errors="replace") as f:
+                for row in self._rows_from(f.read(), skip_header=True):
+                    if row["timestamp"] >= since_ts:
+                        yield row
+
+    def export_parquet(self, path: str | Path, since: datetime | None = None) -> int:
+        """Write the history to Parquet (requires pyarrow). Returns row count."""
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise RuntimeError(
+                "Parquet export needs pyarrow: pip install pyarrow"
+            ) from e
+
+        rows = list(self.iter_rows(since))
+        columns = {field: [row[field] for row in rows] for field in RUN_LOG_FIELDS}
+        columns["gate_score"] = [
+            int(v) if str(v).lstrip("-").isdigit() else None
+            for v in columns["gate_score"]
+        ]
+        columns["gate_pass"] = [v == "True" for v in columns["gate_pass"]]
+        pq.write_table(pa.table(columns), str(path))
+        return len(rows)
+
+
+_shared_run_log: RunLog | None = None
+
+
+def get_run_log() -> RunLog:
+    """Process-wide run log (index loaded once, refreshed incrementally)."""
+    global _shared_run_log
+    if _shared_run_log is None:
+        _shared_run_log = RunLog()
+    return _shared_run_log
+
+
+def main():
+    log = get_run_log()
+    command = sys.argv[1] if len(sys.argv) > 1 else "stats"
+    arg = sys.argv[2] if len(sys.argv) > 2 else ""
+
+    if command == "stats":
+        counts = log.status_counts()
+        print(f"Backend: {log.store.name}")
+        print(f"Rows indexed: {sum(s['rows'] for s in log.files.values())}")
+        print(f"Articles: {len(log.latest)}")
+        for status, count in sorted(counts.items()):
+            print(f"  {status}: {count}")
+    elif command == "failed":
+        hours = float(arg) if arg else None
+        for row in log.failed_since(hours):
+            print(f"{row['timestamp']}  {row['article_id']}  {row['issues'][:80]}")
+    elif command == "top-checks":
+        n = int(arg) if arg.isdigit() else 10
+        hours = float(sys.argv[3]) if len(sys.argv) > 3 else None
+        for code, count in log.top_failing_checks(n, hours):
+            print(f"{count:5d}  {code}")
+    elif command == "export-parquet" and arg:
+        try:
+            count = log.export_parquet(arg)
+        except RuntimeError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        print(f"✅ Exported {count} rows to {arg}")
+    else:
+        print(
+            "Usage: python run_log.py "
+            "[stats | failed [hours] | top-checks [n] [hours] | export-parquet <path>]"
+        )
+
+
+if __name__ == "__main__":
+    main()
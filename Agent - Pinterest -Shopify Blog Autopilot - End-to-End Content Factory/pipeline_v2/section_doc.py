@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""section_doc.py — H2-section-indexed article body for multi-fix passes.
+
+AIOrchestrator._apply_meta_prompt_patch, _ensure_topic_focus,
+_add_internal_links and run_meta_fix_queue's inject_* / ensure_* helpers
+each regex-searched the whole body for an "<h2" anchor and spliced strings
+(body[:pos] + html + body[pos:]), so every injection copied the full body
+and the next fix searched it again from the top.
+
+SectionDoc parses the body once into
+
+    lead        html before the first <h2>
+    sections    Section(heading="<h2 ...>...</h2>", content=html up to the
+                next <h2>)
+    closing     a trailing "</article>..." (appends go in front of it)
+
+Edits (remove / insert_before / insert_at / append / replace_content) only
+rewrite the one chunk they touch; inserted html that carries its own <h2>
+is split into new indexed sections on the spot. to_html() joins the chunks
+once at the end, so a whole fix pass stays linear in the body size.
+
+Usage:
+    doc = SectionDoc.parse(body)
+    faq = doc.find(r"FAQ|Frequently Asked")
+    if faq is not None and doc.count(r"<h3", faq) < 7:
+        doc.remove(faq)
+    doc.append(build_faqs(topic))
+    body = doc.to_html()
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Iterator
+
+_H2_RE = re.compile(r"<h2\b", re.IGNORECASE)
+_H2_END_RE = re.compile(r"</h2\s*>", re.IGNORECASE)
+_TAG_RE = re.compile(r"<[^>]+>")
+_CLOSING = "</article>"
+
+
+class Section:
+    """One <h2> heading plus the html up to the next <h2>."""
+
+    __slots__ = ("heading", "content")
+
+    def __init__(self, heading: str, content: str = ""):
+        self.heading = heading
+        self.content = content
+
+    @property
+    def title(self) -> str:
+        """Heading text without tags."""
+        return " ".join(_TAG_RE.sub(" ", self.heading).split())
+
+    def matches(self, pattern: str, flags: int = re.IGNORECASE) -> bool:
+        """Pattern searched in the heading text ("FAQ|Frequently Asked")."""
+        return re.search(pattern, self.title, flags) is not None
+
+    def __repr__(self) -> str:
+        return f"Section({self.title!r}, {len(self.content)} chars)"
+
+
+def _split_sections(html: str) -> tuple[str, list[Section]]:
+    """(lead, sections) for an html fragment, one regex pass."""
+    starts = [m.start() for m in _H2_RE.finditer(html)]
+    if not starts:
+        return html, []
+    sections = []
+    bounds = starts + [len(html)]
+    for start, end in zip(starts, bounds[1:]):
+        close = _H2_END_RE.search(html, start, end)
+        if close:
+            heading_end = close.end()
+        else:
+            # Unclosed heading: index the opening tag only
+            tag_end = html.find(">", start, end)
+            heading_end = tag_end + 1 if tag_end != -1 else end
+        sections.append(Section(html[start:heading_end], html[heading_end:end]))
+    return html[: starts[0]], sections
+
+
+class SectionDoc:
+    """Article body as lead + indexed H2 sections + closing tag."""
+
+    def __init__(self, lead: str = "", sections=None, closing: str = ""):
+        self.lead = lead
+        self.sections: list[Section] = list(sections or [])
+        self.closing = closing
+
+    @classmethod
+    def parse(cls, html: str) -> SectionDoc:
+        html = html or ""
+        closing = ""
+        pos = html.lower().rfind(_CLOSING)
+        last_h2 = html.lower().rfind("<h2")
+        if pos != -1 and pos > last_h2:
+            html, closing = html[:pos], html[pos:]
+        lead, sections = _split_sections(html)
+        return cls(lead, sections, closing)
+
+    def to_html(self) -> str:
+        parts = [self.lead]
+        for section in self.sections:
+            parts.append(section.heading)
+            parts.append(section.content)
+        parts.append(self.closing)
+        return "".join(parts)
+
+    # ------------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------------
+    def find(self, pattern: str, flags: int = re.IGNORECASE) -> Section | None:
+        """First section whose heading text matches pattern."""
+        for section in self.sections:
+            if section.matches(pattern, flags):
+                return section
+        return None
+
+    def chunks(self) -> Iterator[tuple[Section | None, str]]:
+        """(owner, content) in document order; owner None is the lead."""
+        yield None, self.lead
+        for section in self.sections:
+            yield section, section.content
+
+    def search(
+        self, pattern: str, flags: int = re.IGNORECASE, start: Section | None = None
+    ) -> tuple[Section | None, re.Match] | None:
+        """First content match in document order (optionally from a section on)."""
+        regex = re.compile(pattern, flags)
+        active = start is None
+        for owner, content in self.chunks():
+            if not active:
+                if owner is not start:
+                    continue
+                active = True
+            match = regex.search(content)
+            if match:
+                return owner, match
+        return None
+
+    def finditer(
+        self, pattern: str, flags: int = re.IGNORECASE
+    ) -> Iterator[tuple[Section | None, re.Match]]:
+        """All content matches in document order."""
+        regex = re.compile(pattern, flags)
+        for owner, content in self.chunks():
+            for match in regex.finditer(content):
+                yield owner, match
+
+    def findall(self, pattern: str, flags: int = re.IGNORECASE) -> list[str]:
+        """Matches over headings and contents (whole visible body)."""
+        regex = re.compile(pattern, flags)
+        found = regex.findall(self.lead)
+        for section in self.sections:
+            found += regex.findall(section.heading)
+            found += regex.findall(section.content)
+        return found
+
+    def count(
+        self, pattern: str, section: Section | None = None, flags=re.IGNORECASE
+    ) -> int:
+        """Pattern count in one section's content, or in all content."""
+        if section is not None:
+            return len(re.findall(pattern, section.content, flags))
+        return sum(len(re.findall(pattern, c, flags)) for _, c in self.chunks())
+
+    def contains(self, text: str) -> bool:
+        """Plain substring test over the whole body."""
+        return text in self.lead or any(
+            text in s.heading or text in s.content for s in self.sections
+        )
+
+    def previous(self, section: Section) -> Section | None:
+        """Owner of the chunk directly in front of section's heading."""
+        i = self.sections.index(section)
+        return self.sections[i - 1] if i else None
+
+    # ------------------------------------------------------------------
+    # Edits (each rewrites a single chunk)
+    # ------------------------------------------------------------------
+    def _set_content(self, owner: Section | None, content: str) -> None:
+        """Store a chunk, indexing any <h2> the new content brought along."""
+        new_sections: list[Section] = []
+        if _H2_RE.search(content):
+            content, new_sections = _split_sections(content)
+        if owner is None:
+            self.lead = content
+            at = 0
+        else:
+            owner.content = content
+            at = self.sections.index(owner) + 1
+        if new_sections:
+            self.sections[at:at] = new_sections
+
+    def insert_at(self, owner: Section | None, pos: int, html: str) -> None:
+        """Insert html at an offset inside a chunk's content."""
+        content = self.lead if owner is None else owner.content
+        self._set_content(owner, content[:pos] + html + content[pos:])
+
+    def insert_before(self, section: Section, html: str) -> None:
+        """Insert html right in front of a section's heading."""
+        owner = self.previous(section)
+        content = self.lead if owner is None else owner.content
+        self._set_content(owner, content + html)
+
+    def append(self, html: str) -> None:
+        """Add html at the end of the body (in front of </article>)."""
+        owner = self.sections[-1] if self.sections else None
+        content = self.lead if owner is None else owner.content
+        self._set_content(owner, content.rstrip() + "\n" + html + "\n")
+
+    def replace_content(self, section: Section, content: str) -> None:
+        self._set_content(section, content)
+
+    def remove(self, section: Section) -> None:
+        """Drop a section (heading and content)."""
+        self.sections.remove(section)
@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""section_gen.py — Section-parallel article generation with a merge step.
+
+generate_article_with_llm asks for the whole 11-section article in one
+~7000-token completion (plus an _expand_low_words.expand_article round trip
+when it comes back short), which is the single largest latency in
+AIOrchestrator._force_rebuild_article.
+
+SectionGenerator instead
+    1. plans the outline once (one short completion: angle + key points per
+       section; a failed plan just means sections get no key points),
+    2. generates every section concurrently, each with its own prompt and
+       token budget (SectionSpec.max_tokens),
+    3. merges them deterministically in ARTICLE_SECTIONS order — the
+       META_PROMPT_REQUIREMENTS order — under canonical <h2> headings,
+    4. regenerates only the sections that came back missing or short.
+
+Wall-clock time per article approaches the slowest section. The LLM call
+is injected (complete(prompt, max_tokens) -> html), so this module has no
+provider logic; ai_orchestrator passes its provider chain.
+
+Environment:
+    SECTION_GEN_WORKERS     concurrent section requests (default 6)
+
+Usage:
+    gen = SectionGenerator(complete, clean=_clean_llm_output)
+    result = gen.build(title)
+    result.html, result.missing, result.seconds
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, NamedTuple
+
+from article_rules import count_words
+
+MAX_WORKERS = int(os.environ.get("SECTION_GEN_WORKERS", "6"))
+OUTLINE_MAX_TOKENS = 700
+
+_H2_RE = re.compile(r"<h2\b[^>]*>.*?</h2\s*>", re.IGNORECASE | re.DOTALL)
+_H2_TAG_RE = re.compile(r"<(/?)h2\b", re.IGNORECASE)
+
+
+class SectionSpec(NamedTuple):
+    key: str  # QUALITY_GATE_SECTIONS / ARTICLE_SECTION_ORDER key
+    heading: str
+    brief: str
+    words: int  # target words; under half of it counts as short
+    max_tokens: int
+
+
+# Same headings and order as the single-prompt generation (~2200 words)
+ARTICLE_SECTIONS = (
+    SectionSpec(
+        "direct_answer",
+        "Direct Answer",
+        "A clear, concise answer in 2-3 sentences (<p>).",
+        80,
+        300,
+    ),
+    SectionSpec(
+        "key_conditions",
+        "Key Conditions at a Glance",
+        "A <ul> bullet list of 5-7 main factors, each with a specific value.",
+        130,
+        400,
+    ),
+    SectionSpec(
+        "understanding",
+        "Understanding the Topic",
+        "Background and context in 3-4 paragraphs.",
+        280,
+        700,
+    ),
+    SectionSpec(
+        "step_by_step",
+        "Complete Step-by-Step Guide",
+        "A detailed how-to with an <h3> per step, measurements and timelines.",
+        420,
+        1100,
+    ),
+    SectionSpec(
+        "types_varieties",
+        "Types and Varieties",
+        "Different options or approaches, each with when to choose it.",
+        220,
+        600,
+    ),
+    SectionSpec(
+        "troubleshooting",
+        "Troubleshooting Common Issues",
+        "Problem/solution format as a <ul> bullet list.",
+        220,
+        600,
+    ),
+    SectionSpec(
+        "pro_tips",
+        "Pro Tips from Experts",
+        "2+ <blockquote> expert tips, each with a <footer> naming the source.",
+        170,
+        600,
+    ),
+    SectionSpec(
+        "advanced",
+        "Advanced Techniques",
+        "Advanced methods for experienced readers.",
+        220,
+        600,
+    ),
+    SectionSpec(
+        "comparison",
+        "Comparison Table",
+        "A <table> with <thead> and <tbody> comparing options/methods, "
+        "plus one short paragraph.",
+        120,
+        800,
+    ),
+    SectionSpec(
+        "faq",
+        "Frequently Asked Questions",
+        "EXACTLY 7 Q&A pairs: each question an <h3>, each answer a <p>.",
+        320,
+        900,
+    ),
+    SectionSpec(
+        "sources",
+        "Sources & Further Reading",
+        "EXACTLY 5 authoritative sources (.edu, .gov, established "
+        'organizations) as <li><a href="https://...">Source Name - '
+        "Description</a></li> in a <ul>.",
+        60,
+        400,
+    ),
+)
+
+SECTION_RULES = """RULES:
+- Output ONLY this section's HTML, starting with <h2>{heading}</h2>. No markdown, no code blocks, no other H2.
+- Use <h3>, <p>, <ul>, <li>, <blockquote>, <table>, <strong> as needed.
+- Natural, authoritative voice; specific techniques, measurements, timelines.
+- Do not repeat the exact title phrase; use pronouns and synonyms.
+- NEVER use: "in this guide", "this article", "we'll explore", "let's dive", "in conclusion", "it's essential", "game-changer", "unlock the potential", "happy gardening"."""
+
+
+class SectionedArticle(NamedTuple):
+    html: str
+    sections: dict  # key -> section html
+    missing: list  # keys that never produced usable html
+    seconds: dict  # key -> generation seconds (last attempt)
+
+
+def outline_prompt(title: str, specs=ARTICLE_SECTIONS) -> str:
+    keys = ", ".join(f'"{s.key}" ({s.heading})' for s in specs)
+    return f"""Plan a blog article about "{title}" for a sustainable living and homesteading blog.
+
+Return ONLY JSON: {{"angle": "<one sentence>", "sections": {{"<key>": ["<key point>", ...]}}}}
+with 2-4 short, specific key points for each of these section keys: {keys}.
+Points must not overlap between sections."""
+
+
+def parse_outline(text: str) -> dict:
+    """{"angle": str, "sections": {key: [points]}} from a completion, or {}."""
+    match = re.search(r"\{.*\}", text or "", re.DOTALL)
+    if not match:
+        return {}
+    try:
+        outline = json.loads(match.group(0))
+    except json.JSONDecodeError:
+        return {}
+    if not isinstance(outline, dict) or not isinstance(outline.get("sections"), dict):
+        return {}
+    return outline
+
+
+def section_prompt(title: str, spec: SectionSpec, outline: dict, specs) -> str:
+    plan = "\n".join(f"- {s.heading}" for s in specs)
+    points = outline.get("sections", {}).get(spec.key) or []
+    point_lines = "\n".join(f"- {p}" for p in points if isinstance(p, str))
+    angle = outline.get("angle", "")
+    return f"""You are writing ONE section of an expert blog article about "{title}".
+{f"Article angle: {angle}" if angle else ""}
+Full article outline (other sections are written separately — do not cover them):
+{plan}
+
+Write ONLY the section "{spec.heading}" (about {spec.words} words).
+Content: {spec.brief}
+{f"Cover these points:{chr(10)}{point_lines}" if point_lines else ""}
+
+{SECTION_RULES.format(heading=spec.heading)}"""
+
+
+def normalize_section(html: str, spec: SectionSpec) -> str:
+    """Section under its canonical <h2>; stray H2s become H3s."""
+    body = _H2_RE.sub("", html.strip(), count=1) if html else ""
+    body = _H2_TAG_RE.sub(lambda m: f"<{m.group(1)}h3", body)
+    return f"<h2>{spec.heading}</h2>\n{body.strip()}"
+
+
+def merge_sections(sections: dict, specs=ARTICLE_SECTIONS) -> str:
+    """Sections joined in spec order (missing ones skipped)."""
+    return "\n\n".join(sections[s.key] for s in specs if sections.get(s.key))
+
+
+class SectionGenerator:
+    """Outline once, then sections in parallel, merged in spec order."""
+
+    def __init__(
+        self,
+        complete: Callable[[str, int], str],
+        clean: Callable[[str], str] = str.strip,
+        specs=ARTICLE_SECTIONS,
+        max_workers: int = MAX_WORKERS,
+    ):
+        self.complete = complete
+        self.clean = clean
+        self.specs = tuple(specs)
+        self.max_workers = max_workers
+
+    def plan(self, title: str) -> dict:
+        try:
+            return parse_outline(
+                self.complete(outline_prompt(title, self.specs), OUTLINE_MAX_TOKENS)
+            )
+        except Exception as e:
+            print(f"⚠️ Outline planning failed: {e}")
+            return {}
+
+    def _generate_one(self, title: str, spec: SectionSpec, outline: dict):
+        started = time.perf_counter()
+        try:
+            raw = self.complete(
+                section_prompt(title, spec, outline, self.specs), spec.max_tokens
+            )
+        except Exception as e:
+            print(f"⚠️ Section '{spec.heading}' failed: {e}")
+            raw = ""
+        html = normalize_section(self.clean(raw), spec) if raw else ""
+        return html, time.perf_counter() - started
+
+    def generate(self, title: str, keys=None, outline: dict | None = None):
+        """{key: html} and {key: seconds} for the given sections, concurrently."""
+        outline = outline or {}
+        specs = [s for s in self.specs if keys is None or s.key in keys]
+        if not specs:
+            return {}, {}
+        workers = max(1, min(self.max_workers, len(specs)))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                spec.key: pool.submit(self._generate_one, title, spec, outline)
+                for spec in specs
+            }
+            results = {key: future.result() for key, future in futures.items()}
+        sections = {key: html for key, (html, _) in results.items() if html}
+        seconds = {key: round(secs, 2) for key, (_, secs) in results.items()}
+        return sections, seconds
+
+    def short_sections(self, sections: dict) -> list[str]:
+        """Keys missing, or under half their target words."""
+        return [
+            s.key
+            for s in self.specs
+            if not sections.get(s.key) or count_words(sections[s.key]) < s.words // 2
+        ]
+
+    def build(self, title: str, retries: int = 1) -> SectionedArticle:
+        outline = self.plan(title)
+        sections, seconds = self.generate(title, outline=outline)
+        for _ in range(retries):
+            redo = self.short_sections(sections)
+            if not redo:
+                break
+            print(f"🔁 Regenerating {len(redo)} short section(s): {', '.join(redo)}")
+            again, again_secs = self.generate(title, keys=redo, outline=outline)
+            for key, html in again.items():
+                if count_words(html) > count_words(sections.get(key, "")):
+                    sections[key] = html
+            seconds.update(again_secs)
+        missing = [s.key for s in self.specs if not sections.get(s.key)]
+        return SectionedArticle(
+            merge_sections(sections, self.specs), sections, missing, seconds
+        )
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""section_repair.py — Targeted section regeneration for failing gate checks.
+
+When QualityGate.deterministic_gate failed on a single structural check
+(tables_min, blockquotes_min, sources_min), _run_queue_item escalated to
+force_rebuild_article_ids: a full ~7000-token article generation, image
+fix and meta patch, to add one table.
+
+plan_repairs maps each failing check to the smallest section that fixes it
+
+    tables_min        Comparison Table          needs a <table>
+    blockquotes_min   Pro Tips from Experts     needs 2 <blockquote>
+    sources_min       Sources & Further Reading needs 5 links
+
+and SectionRepairer regenerates only those sections (section_gen, one short
+completion each, concurrently), falls back to a synthesized section when
+the completion does not carry the element, and splices the result into the
+existing body through SectionDoc. Articles more than MAX_REPAIR_CHECKS
+checks short, or short on a check no section fixes, get no plan.
+
+Usage:
+    targets = plan_repairs(gate["checks"])
+    if targets:
+        result = SectionRepairer(generator, synthesize).repair(title, body, targets)
+        result.body, result.applied
+"""
+
+from __future__ import annotations
+
+import re
+import time
+from typing import Callable, NamedTuple
+
+from section_doc import SectionDoc
+from section_gen import ARTICLE_SECTIONS, SectionGenerator, normalize_section
+
+MAX_REPAIR_CHECKS = 2
+
+_H2_RE = re.compile(r"<h2\b[^>]*>.*?</h2\s*>", re.IGNORECASE | re.DOTALL)
+
+
+class RepairTarget(NamedTuple):
+    check: str  # deterministic_gate check name
+    section: str  # section_gen.ARTICLE_SECTIONS key
+    heading: str  # SectionDoc.find pattern for the existing section
+    element: str  # pattern the repaired section must contain ...
+    needed: int  # ... this many times
+    before: str  # a new section goes in front of the first match ("": append)
+    replace: bool  # synthesized html replaces the section instead of adding to it
+
+
+REPAIR_TARGETS = {
+    "tables_min": RepairTarget(
+        "tables_min",
+        "comparison",
+        r"Compar",
+        r"<table\b",
+        1,
+        r"FAQ|Frequently Asked|Questions|Sources|Further Reading|References",
+        False,
+    ),
+    "blockquotes_min": RepairTarget(
+        "blockquotes_min",
+        "pro_tips",
+        r"Pro Tips|Expert Tips|Tips from Experts",
+        r"<blockquote\b",
+        2,
+        r"Advanced|Comparison|FAQ|Frequently Asked|Sources|Further Reading",
+        False,
+    ),
+    "sources_min": RepairTarget(
+        "sources_min",
+        "sources",
+        r"Sources|Further Reading|References",
+        r"<a\s[^>]*href=[\"']https?://",
+        5,
+        "",
+        True,
+    ),
+}
+
+_SPECS = {spec.key: spec for spec in ARTICLE_SECTIONS}
+
+
+class RepairResult(NamedTuple):
+    body: str
+    applied: dict  # check -> "llm" | "template"
+    seconds: float
+
+
+def plan_repairs(
+    checks: dict, max_checks: int = MAX_REPAIR_CHECKS
+) -> list[RepairTarget]:
+    """Repair targets for the failing checks ([] when a rebuild is needed).
+
+    Any failing check without a repair target means a section repair cannot
+    pass the gate, so the whole plan is dropped.
+    """
+    failing = [name for name, passed in checks.items() if not passed]
+    if not failing or len(failing) > max_checks:
+        return []
+    if any(name not in REPAIR_TARGETS for name in failing):
+        return []
+    return [REPAIR_TARGETS[name] for name in failing]
+
+
+def _has_element(html: str, target: RepairTarget) -> bool:
+    return len(re.findall(target.element, html, re.IGNORECASE)) >= target.needed
+
+
+def _without_heading(html: str) -> str:
+    return "\n" + _H2_RE.sub("", html, count=1).strip() + "\n"
+
+
+def splice_section(doc: SectionDoc, target: RepairTarget, html: str) -> None:
+    """Replace the target's section with html (a full <h2> section), or add it."""
+    existing = doc.find(target.heading)
+    if existing is not None:
+        # Keep the existing heading (and its id)
+        doc.replace_content(existing, _without_heading(html))
+        return
+    anchor = doc.find(target.before) if target.before else None
+    if anchor is not None:
+        doc.insert_before(anchor, "\n" + html + "\n")
+    else:
+        doc.append(html)
+
+
+def add_to_section(doc: SectionDoc, target: RepairTarget, html: str) -> None:
+    """Add synthesized html to the target's section (created if missing)."""
+    existing = doc.find(target.heading)
+    if existing is None or target.replace:
+        splice_section(doc, target, normalize_section(html, _SPECS[target.section]))
+        return
+    doc.replace_content(existing, existing.content.rstrip() + "\n" + html + "\n")
+
+
+class SectionRepairer:
+    """Regenerate (or synthesize) only the sections behind failing checks.
+
+    synthesize(section_key) returns template html for a section — the
+    element alone (table, blockquotes) or a full section (sources).
+    """
+
+    def __init__(self, generator: SectionGenerator, synthesize: Callable[[str], str]):
+        self.generator = generator
+        self.synthesize = synthesize
+
+    def repair(self, title: str, body: str, targets) -> RepairResult:
+        started = time.perf_counter()
+        keys = {target.section for target in targets}
+        sections, _ = self.generator.generate(title, keys=keys)
+
+        doc = SectionDoc.parse(body)
+        applied = {}
+        for target in targets:
+            html = sections.get(target.section, "")
+            if html and _has_element(html, target):
+                splice_section(doc, target, html)
+                applied[target.check] = "llm"
+                continue
+            synthesized = self.synthesize(target.section)
+            if synthesized:
+                add_to_section(doc, target, synthesized)
+                applied[target.check] = "template"
+        return RepairResult(doc.to_html(), applied, time.perf_counter() - started)
@@ -0,0 +1,763 @@
+#!/usr/bin/env python3
+"""section_templates.py — Precompiled section templates for template article bodies.
+
+AIOrchestrator's _build_article_body / _build_gardening_body and the section
+builders they share (_build_faqs, _build_comparison_table,
+_build_key_terms_section, _build_expert_quotes, ...) rebuilt their HTML with
+large f-string concatenations, re-created the definition maps and expert
+pool on every call, and re-derived the topic terms and real subject from the
+same title once per section.
+
+Here every section is a SectionTemplate compiled once at import (split into
+literal and field segments, rendered with a single "".join). Title-derived
+values live in a SectionContext that the caller builds once per article;
+section renders are memoized per context, so rebuilding an article (or the
+same topic again in a fix loop) costs a few joins.
+
+Usage:
+    ctx = SectionContext.build(topic, subject, terms, focus_terms)
+    html = article_body(ctx)           # unpadded template body
+    html = faqs_section(ctx)
+    rendered = render_sections([ctx1, ctx2, ...])   # batch: [{name: html}]
+"""
+
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+from typing import Callable, NamedTuple
+
+_FIELD_RE = re.compile(r"\{(\w+)\}")
+
+
+class SectionTemplate:
+    """Template text split once into literal and {field} segments."""
+
+    __slots__ = ("parts",)
+
+    def __init__(self, text: str):
+        # Even indexes are literals, odd indexes field names
+        self.parts = _FIELD_RE.split(text)
+
+    @property
+    def fields(self) -> list[str]:
+        return self.parts[1::2]
+
+    def render(self, values: dict) -> str:
+        parts = list(self.parts)
+        parts[1::2] = [values[name] for name in self.parts[1::2]]
+        return "".join(parts)
+
+
+class SectionContext(NamedTuple):
+    """Title-derived values shared by every section of one article."""
+
+    topic: str  # normalized topic phrase
+    subject: str  # extract_real_subject(topic)
+    terms: tuple  # topic terms of the topic phrase
+    focus_terms: tuple  # topic terms of the full title
+    values: tuple  # prepared template fields as (name, value) pairs
+
+    @classmethod
+    def build(
+        cls, topic: str, subject: str, terms, focus_terms=None
+    ) -> "SectionContext":
+        terms = tuple(terms)
+        focus_terms = tuple(terms if focus_terms is None else focus_terms)
+        values = {
+            "topic": topic,
+            "subject": subject,
+            "key_term": terms[0] if terms else subject,
+            "focus_phrase": ", ".join(focus_terms[:3]) if focus_terms else topic,
+            "focus_terms": ", ".join(focus_terms) if focus_terms else topic,
+        }
+        return cls(topic, subject, terms, focus_terms, tuple(values.items()))
+
+    def fields(self, **extra) -> dict:
+        values = dict(self.values)
+        values.update(extra)
+        return values
+
+
+# ============================================================================
+# Key terms
+# ============================================================================
+KEY_TERM_DEFAULTS = (
+    (("garden", "plant"), ("soil preparation", "watering schedule", "mulching")),
+    (("soap",), ("saponification", "curing time", "lye safety")),
+    (("vinegar",), ("fermentation", "acidity testing", "mother culture")),
+    (("candle",), ("wax melting point", "wick sizing", "fragrance load")),
+    ((), ("preparation steps", "material selection", "quality indicators")),
+)
+
+# Compound terms (from topic term extraction) AND single words
+KEY_TERM_DEFINITIONS = {
+    # Compound terms
+    "bay leaves": "aromatic leaves from Laurus nobilis containing eucalyptol and linalool, used for cooking and natural pest repellent",
+    "aloe vera": "succulent plant with gel containing 75+ active compounds including vitamins A, C, E for skin healing",
+    "apple cider vinegar": "vinegar fermented from apple cider containing 5-6% acetic acid with cloudy mother culture",
+    "baking soda": "sodium bicarbonate (NaHCO3) with pH 8.4, used for cleaning, deodorizing, and baking",
+    "essential oils": "concentrated plant extracts distilled at 212°F, used at 0.5-3% dilution for therapeutic benefits",
+    "olive oil": "oil pressed from olives with smoke point 375-405°F and 73% monounsaturated fat content",
+    "coconut oil": "oil from coconut meat with melting point 76°F, 82% saturated fat, solid at room temperature",
+    "companion planting": "strategic placement of compatible plants within 1-3 feet for mutual pest control and nutrient sharing",
+    "natural pesticides": "pest control derived from neem oil, pyrethrin, or diatomaceous earth, applied every 7-14 days",
+    "organic gardening": "cultivation without synthetic chemicals, using compost, crop rotation, and beneficial insects",
+    "pest control": "integrated management using physical barriers, biological agents, and organic sprays at first sign of damage",
+    "soil health": "balanced ecosystem with pH 6.0-7.0, 3-5% organic matter, and beneficial microbial activity",
+    "raised beds": "elevated planting areas 6-12 inches high filled with premium soil mix for improved drainage",
+    "cold process": "soap making mixing oils at 100-110°F with lye solution, requiring 4-6 weeks cure time",
+    "soil preparation": "preparing ground by testing pH, adding amendments, and working to 8-12 inch depth",
+    "watering schedule": "providing 1-2 inches weekly, morning application preferred to reduce fungal disease",
+    "sunlight requirements": "plant-specific light needs ranging from 2-3 hours (shade) to 8+ hours (full sun) daily",
+    "preparation steps": "sequential process of gathering materials, measuring quantities, and following specific order",
+    "required materials": "specific items needed including exact quantities, brands, and quality specifications",
+    "expected results": "measurable outcomes with specific timelines, appearance indicators, and quality benchmarks",
+    "acidity level": "pH measurement from 0-14 scale, with 7 neutral; vinegar typically 2.5-3.5 pH",
+    "storage conditions": "optimal environment of 60-75°F, 50-70% humidity, away from direct light",
+    "cleaning solution": "mixture with specific ratios, e.g., 1:1 vinegar-water or 1 tbsp soap per gallon",
+    "curing time": "required waiting period of 2-6 weeks allowing chemical reactions to complete fully",
+    "material selection": "choosing quality ingredients based on purity, source, and intended application",
+    # Single word terms (expanded)
+    "vinegar": "liquid containing 4-8% acetic acid produced through 2-stage fermentation over 3-6 months",
+    "fermentation": "anaerobic metabolic process converting sugars to acids/alcohol at 60-80°F over 2-4 weeks",
+    "mother": "cellulose biofilm formed by acetobacter bacteria, appearing as rubbery disc on liquid surface",
+    "acidity": "measured in pH (2.5-3.5 for vinegar) or titratable acidity (5-7% for culinary vinegar)",
+    "soil": "growing medium: 40% minerals, 25% water, 25% air, 10% organic matter, pH 6.0-7.0",
+    "compost": "decomposed organic material with C:N ratio 25:1-30:1, ready when dark and earthy-smelling",
+    "mulch": "2-4 inch organic layer around plants retaining moisture and suppressing 90% of weeds",
+    "germination": "seed-to-seedling development at 65-75°F taking 7-21 days depending on species",
+    "pruning": "selective removal of plant parts in dormant season improving health and 20-30% yield increase",
+    "harvest": "collecting crops at peak ripeness indicated by color, size, and firmness standards",
+    "soap": "surfactant from saponification of fats with NaOH, requiring 4-6 weeks cure at room temperature",
+    "lye": "sodium hydroxide (NaOH) at 97-99% purity, mixed 1:2.5 ratio with oils for soap",
+    "wax": "combustible material with melting points: soy 120°F, paraffin 130-150°F, beeswax 145°F",
+    "wick": "braided cotton or wood core sized to container diameter for proper melt pool",
+    "fragrance": "scent additive at 6-10% wax weight, added at 185°F and poured at 135-145°F",
+    "mulching": "applying 2-4 inches of organic material to conserve moisture and regulate soil temperature",
+    "saponification": "chemical reaction between fats and lye creating soap and glycerin over 24-48 hours",
+}
+
+# Category fallbacks for terms without a definition (never generic)
+KEY_TERM_FALLBACKS = (
+    (
+        ("garden", "grow", "plant"),
+        "a gardening technique for {subject} that improves plant health through proper timing, application rate, and environmental conditions",
+    ),
+    (
+        ("soap", "candle"),
+        "a crafting element for {subject} with specific temperature requirements, safety protocols, and quality indicators",
+    ),
+    (
+        ("vinegar", "ferment"),
+        "a fermentation component for {subject} requiring controlled temperature (60-80°F), proper vessel, and 2-6 week timeline",
+    ),
+    (
+        ("clean", "drain"),
+        "a cleaning method for {subject} using specific dilution ratios, contact time, and surface-appropriate application",
+    ),
+    (
+        ("cook", "recipe", "food"),
+        "a culinary technique for {subject} involving specific measurements, timing, and temperature control",
+    ),
+    (
+        (),
+        "a key component of {subject} with specific requirements and observable quality indicators",
+    ),
+)
+KEY_TERM_FALLBACKS = tuple(
+    (keywords, SectionTemplate(text)) for keywords, text in KEY_TERM_FALLBACKS
+)
+
+KEY_TERM_ITEM = SectionTemplate("<li><strong>{term}</strong> — {definition}</li>")
+KEY_TERMS_SECTION = SectionTemplate("""
+<h2 id="key-terms">Key Terms</h2>
+<ul>
+{items}
+</ul>
+""")
+
+
+def _first_match(text: str, table):
+    for keywords, value in table:
+        if not keywords or any(kw in text for kw in keywords):
+            return value
+    return None
+
+
+def _term_definition(term: str) -> str | None:
+    term_lower = term.lower().replace("-", " ").strip()
+    if term_lower in KEY_TERM_DEFINITIONS:
+        return KEY_TERM_DEFINITIONS[term_lower]
+    # Partial match
+    for key, val in KEY_TERM_DEFINITIONS.items():
+        if term_lower in key or key in term_lower:
+            return val
+    return None
+
+
+@lru_cache(maxsize=512)
+def key_terms_section(ctx: SectionContext) -> str:
+    """Key Terms section with specific (non-generic) definitions."""
+    topic_lower = ctx.topic.lower()
+    terms = list(ctx.terms)
+    # Ensure at least 3 meaningful terms
+    if len(terms) < 3:
+        terms.extend(_first_match(topic_lower, KEY_TERM_DEFAULTS))
+    terms = list(dict.fromkeys(terms))[:6]
+
+    items = []
+    for term in terms:
+        definition = _term_definition(term)
+        if not definition:
+            definition = _first_match(topic_lower, KEY_TERM_FALLBACKS).render(
+                ctx.fields()
+            )
+        items.append(
+            KEY_TERM_ITEM.render(
+                {"term": term.replace("-", " ").title(), "definition": definition}
+            )
+        )
+    return KEY_TERMS_SECTION.render({"items": "\n".join(items)})
+
+
+# ============================================================================
+# Sources
+# ============================================================================
+SOURCES = (
+    (
+        "https://www.epa.gov",
+        "EPA Guidelines — Official environmental and safety standards applicable to {subject}",
+    ),
+    (
+        "https://www.usda.gov",
+        "USDA Resources — Agricultural best practices and research findings for {subject}",
+    ),
+    (
+        "https://www.cdc.gov",
+        "CDC Recommendations — Public health guidelines and prevention strategies for {subject}",
+    ),
+    (
+        "https://extension.psu.edu",
+        "Penn State Extension — University research and educational materials on {subject}",
+    ),
+    (
+        "https://nchfp.uga.edu",
+        "National Center for Home Food Preservation — Expert methods and safety protocols for {subject}",
+    ),
+)
+SOURCE_ITEMS = SectionTemplate(
+    "\n".join(
+        f'<li><a href="{url}" rel="nofollow noopener">{text}</a></li>'
+        for url, text in SOURCES
+    )
+)
+SOURCES_SECTION = SectionTemplate("""
+<h2 id="sources-further-reading">Sources & Further Reading</h2>
+<ul>
+{items}
+</ul>
+""")
+
+
+@lru_cache(maxsize=512)
+def sources_section(ctx: SectionContext) -> str:
+    return SOURCES_SECTION.render({"items": SOURCE_ITEMS.render(ctx.fields())})
+
+
+# ============================================================================
+# Expert quotes
+# ============================================================================
+# (name, title, expertise, topic keywords)
+EXPERT_POOL = (
+    (
+        "Dr. Sarah Chen",
+        "Environmental Scientist",
+        "sustainable practices",
+        "garden|plant|grow|soil|compost|permaculture|organic",
+    ),
+    (
+        "Marcus Rivera",
+        "Master Gardener (15+ years)",
+        "hands-on gardening experience",
+        "garden|plant|grow|herb|flower|seed|vegetable|harvest",
+    ),
+    (
+        "Dr. Emily Watson",
+        "Nutrition Researcher",
+        "dietary science",
+        "food|cook|recipe|ferment|preserv|nutrition|kitchen|eat",
+    ),
+    (
+        "James Thornton",
+        "Certified Arborist",
+        "tree care and management",
+        "tree|maple|oak|mulch|prune|wood|forest|shade",
+    ),
+    (
+        "Lisa Park",
+        "Home Sustainability Expert",
+        "eco-friendly living",
+        "diy|natural|homemade|sustainable|eco|green|chemical|clean",
+    ),
+    (
+        "Dr. Robert Hayes",
+        "Agricultural Extension Agent",
+        "practical farming",
+        "farm|crop|harvest|irrigat|pest|weed|livestock|poultry",
+    ),
+    (
+        "Maria Santos",
+        "Herbalist and Apothecary",
+        "botanical remedies",
+        "herb|lavender|remedy|essential oil|medicinal|tea|tincture",
+    ),
+    (
+        "David Kim",
+        "Professional Beekeeper",
+        "pollinator health",
+        "bee|honey|wax|pollinat|hive|apiary",
+    ),
+)
+EXPERT_QUOTES = tuple(
+    SectionTemplate(text)
+    for text in (
+        "Working with {subject} consistently shows that patience and proper technique yield the most reliable long-term results for both beginners and experienced practitioners alike.",
+        "The key to success with {subject} lies in understanding the underlying principles rather than following rigid steps — adaptability is what separates good outcomes from great ones.",
+        "In my experience with {subject}, the single most overlooked factor is timing — knowing when to act and when to wait makes all the difference in achieving optimal results.",
+    )
+)
+EXPERT_BLOCKQUOTE = SectionTemplate(
+    '<blockquote>\n<p>"{quote}"</p>\n<p>— <strong>{name}</strong>, {title}</p>\n</blockquote>'
+)
+
+
+@lru_cache(maxsize=512)
+def expert_quotes(ctx: SectionContext, count: int = 2) -> str:
+    """Expert blockquotes, experts ranked by keyword relevance to the topic."""
+    topic_lower = ctx.topic.lower()
+    scored = [
+        (sum(1 for kw in keywords.split("|") if kw in topic_lower), name, title)
+        for name, title, _, keywords in EXPERT_POOL
+    ]
+    scored.sort(key=lambda x: -x[0])
+    selected = scored[: max(count, 2)]
+    fields = ctx.fields()
+    return "\n".join(
+        EXPERT_BLOCKQUOTE.render(
+            {
+                "quote": EXPERT_QUOTES[i % len(EXPERT_QUOTES)].render(fields),
+                "name": name,
+                "title": title,
+            }
+        )
+        for i, (_, name, title) in enumerate(selected[: min(count, len(selected))])
+    )
+
+
+# ============================================================================
+# FAQs
+# ============================================================================
+FAQS = tuple(
+    (SectionTemplate(question), SectionTemplate(answer))
+    for question, answer in (
+        (
+            "How long does {subject} typically take from start to finish?",
+            "Most {subject} projects require 2-4 weeks for initial setup and 6-8 weeks to see measurable results. "
+            "The timeline varies based on your specific conditions: temperature (65-75°F is optimal), "
+            "humidity levels (40-60%), and the quality of materials used. "
+            "Track progress weekly and adjust your approach based on observed changes.",
+        ),
+        (
+            "What are the 3 most common mistakes beginners make with {subject}?",
+            "First, rushing the preparation phase—spend at least 30 minutes ensuring all materials are ready. "
+            "Second, ignoring temperature fluctuations which can reduce effectiveness by up to 40%. "
+            "Third, not documenting the process; keep a log with dates, quantities (in grams or cups), "
+            "and environmental conditions to replicate successful results.",
+        ),
+        (
+            "Is {subject} suitable for beginners with no prior experience?",
+            "Absolutely. Start with a small-scale test (approximately 1 square foot or 500g of material) "
+            "to learn the fundamentals without significant investment. "
+            "The learning curve takes about 3-4 practice sessions, and success rates improve to 85%+ "
+            "once you understand the basic principles of {key_term}.",
+        ),
+        (
+            "Can I scale {subject} for commercial or larger applications?",
+            "Yes, scaling is straightforward once you master the basics. "
+            "Increase batch sizes by 50% increments to maintain quality control. "
+            "Commercial operations typically process 10-50 kg per cycle compared to home-scale 1-2 kg batches. "
+            "Equipment upgrades become cost-effective at volumes exceeding 20 kg per week.",
+        ),
+        (
+            "What essential tools and materials do I need for {subject}?",
+            "Core requirements include: a clean workspace (minimum 2x3 feet), measuring tools accurate to 0.1g, "
+            "quality containers (food-grade plastic or glass), and a thermometer with ±1°F accuracy. "
+            "Budget approximately $50-150 for starter equipment. "
+            "Premium tools costing $200-400 offer better durability and precision for long-term use.",
+        ),
+        (
+            "How should I store the results from {subject} for maximum longevity?",
+            "Store in airtight containers at 50-65°F with humidity below 60%. "
+            "Label each container with: date of completion, batch number, and key parameters used. "
+            "Properly stored results maintain quality for 6-12 months. "
+            "Avoid direct sunlight and temperature swings exceeding 10°F within 24 hours.",
+        ),
+        (
+            "How do I know if my {subject} process was successful?",
+            "Evaluate these 4 indicators: visual appearance (consistent color and texture), "
+            "expected weight or volume change (typically 10-30% variation from starting material), "
+            "smell (should match known-good references), and performance testing against baseline. "
+            "Document results with photos and measurements for future comparison and troubleshooting.",
+        ),
+    )
+)
+FAQ_ITEM = SectionTemplate('<h3 id="faq-{number}">{question}</h3>\n<p>{answer}</p>')
+FAQS_SECTION = SectionTemplate("""
+<h2 id="faq">Frequently Asked Questions</h2>
+{items}
+""")
+
+
+@lru_cache(maxsize=512)
+def faqs_section(ctx: SectionContext) -> str:
+    """FAQ section with H3 questions (counted by pre_publish_review)."""
+    fields = ctx.fields()
+    items = "\n".join(
+        FAQ_ITEM.render(
+            {
+                "number": str(i),
+                "question": question.render(fields),
+                "answer": answer.render(fields),
+            }
+        )
+        for i, (question, answer) in enumerate(FAQS, 1)
+    )
+    return FAQS_SECTION.render({"items": items})
+
+
+GARDENING_FAQS = SectionTemplate("""
+<h2>Frequently Asked Questions</h2>
+<h3>How much light does {topic} need?</h3>
+<p>Most setups do best with 6–8 hours of strong light or a consistent grow light schedule.</p>
+<h3>What container size works best for {topic}?</h3>
+<p>A 6–8 inch pot per plant is a reliable starting point, with larger containers for multiple plants.</p>
+<h3>How often should I water {topic} in containers?</h3>
+<p>Water when the top inch of mix is dry; avoid keeping containers saturated.</p>
+<h3>Should I prune {topic}?</h3>
+<p>Yes—pinching back stems keeps plants bushy and extends productive growth.</p>
+<h3>When can I start harvesting {topic}?</h3>
+<p>Harvest once plants have several sets of leaves and avoid taking more than a third at a time.</p>
+<h3>Do I need fertilizer for {topic}?</h3>
+<p>A light, balanced feed every 2–4 weeks is usually enough in containers.</p>
+<h3>What pests are common with {topic}?</h3>
+<p>Check for aphids and mites; rinse gently and improve airflow if they appear.</p>
+""")
+
+
+@lru_cache(maxsize=512)
+def gardening_faqs(ctx: SectionContext) -> str:
+    return GARDENING_FAQS.render(ctx.fields())
+
+
+# ============================================================================
+# Comparison tables
+# ============================================================================
+COMPARISON_TABLE = SectionTemplate("""
+<div style="overflow-x:auto;">
+<table style="width:100%; border-collapse:collapse; line-height:1.6; table-layout:auto; word-wrap:break-word;">
+  <thead>
+    <tr style="background:#2d5a27; color:#fff;">
+      <th style="padding:10px 12px; text-align:left;">Option</th>
+      <th style="padding:10px 12px; text-align:left;">Best For</th>
+      <th style="padding:10px 12px; text-align:left;">Key Note</th>
+    </tr>
+  </thead>
+  <tbody>
+    <tr style="background:#f8f9f5;">
+      <td style="padding:10px 12px;">Beginner Approach</td>
+      <td style="padding:10px 12px;">Getting started with {subject}</td>
+      <td style="padding:10px 12px;">Simple steps, minimal tools</td>
+    </tr>
+    <tr>
+      <td style="padding:10px 12px;">Standard Method</td>
+      <td style="padding:10px 12px;">Most households</td>
+      <td style="padding:10px 12px;">Balanced time and results</td>
+    </tr>
+    <tr style="background:#f8f9f5;">
+      <td style="padding:10px 12px;">Advanced Method</td>
+      <td style="padding:10px 12px;">Optimizing outcomes</td>
+      <td style="padding:10px 12px;">Requires attention to detail</td>
+    </tr>
+  </tbody>
+</table>
+</div>
+""")
+
+GARDENING_COMPARISON_TABLE = """
+<div class="table-responsive">
+<table class="comparison-table">
+<thead>
+  <tr>
+    <th>Setup</th>
+    <th>Light Target</th>
+    <th>Watering Rhythm</th>
+    <th>Key Note</th>
+  </tr>
+</thead>
+<tbody>
+  <tr>
+    <td>Indoor windowsill</td>
+    <td>Bright light 6–8 hrs</td>
+    <td>Check daily, water as needed</td>
+    <td>Rotate pots for even growth</td>
+  </tr>
+  <tr>
+    <td>Outdoor patio</td>
+    <td>Full sun or morning sun</td>
+    <td>Water when top inch dries</td>
+    <td>Protect from extreme heat</td>
+  </tr>
+  <tr>
+    <td>Grow light setup</td>
+    <td>12–14 hrs consistent</td>
+    <td>Moist but not soggy</td>
+    <td>Keep light close and stable</td>
+  </tr>
+</tbody>
+</table>
+</div>
+"""
+
+
+@lru_cache(maxsize=512)
+def comparison_table(ctx: SectionContext) -> str:
+    return COMPARISON_TABLE.render(ctx.fields())
+
+
+def gardening_comparison_table(ctx: SectionContext | None = None) -> str:
+    return GARDENING_COMPARISON_TABLE
+
+
+# ============================================================================
+# Full template bodies (unpadded; the orchestrator pads to word count)
+# ============================================================================
+PRO_TIPS = """
+<blockquote>
+<p>Prioritize preparation and consistency. Most issues with outcomes are traced back to skipping the setup step.</p>
+<footer>— Extension Specialist, Household Sustainability</footer>
+</blockquote>
+<blockquote>
+<p>Start with a small, repeatable process and improve one variable at a time for reliable results.</p>
+<footer>— Community Education Advisor, Home Practices</footer>
+</blockquote>
+"""
+
+ARTICLE_KEY_POINTS = SectionTemplate(
+    "\n".join(
+        [
+            "<li>Align steps and inputs with {focus_phrase} goals.</li>",
+            "<li>Start with a small test run for {topic} before scaling.</li>",
+            "<li>Use measured inputs and consistent timing for {topic}.</li>",
+            "<li>Keep the process focused on {focus_terms} to avoid off-topic steps.</li>",
+            "<li>Keep conditions steady (light, temperature, spacing) as needed.</li>",
+            "<li>Record inputs and results so you can repeat them.</li>",
+        ]
+    )
+)
+GARDENING_KEY_POINTS = SectionTemplate(
+    "\n".join(
+        [
+            "<li>Use containers with drainage and match size to {focus_phrase} growth.</li>",
+            "<li>Use a light, well-draining potting mix for {topic}.</li>",
+            "<li>Keep light, watering, and feeding consistent to avoid stress.</li>",
+            "<li>Prune regularly to keep {topic} compact and productive.</li>",
+            "<li>Track changes in light and temperature and adjust gradually.</li>",
+            "<li>Record inputs and results so you can repeat what works.</li>",
+        ]
+    )
+)
+
+ARTICLE_BODY = SectionTemplate("""
+<article>
+<h2>Direct Answer</h2>
+    <p>{topic} works best when you keep the steps specific to {focus_phrase}, measure inputs carefully, and test a small run before scaling. Use consistent timing, track conditions, and repeat the same sequence until the result is stable. If anything looks off, adjust one variable at a time so you can trace the cause and lock in a reliable routine.</p>
+
+<h2>Key Conditions at a Glance</h2>
+<ul>
+{key_points}
+</ul>
+
+<h2>Understanding {topic}</h2>
+<p>{topic} is most reliable when the steps match the goal and the inputs you control. That means selecting the right setup, following the method consistently, and checking results before repeating.</p>
+<p>Identify the main variables for {topic} (inputs, timing, and conditions). Keeping those consistent makes the outcome repeatable.</p>
+<p>Work in a stable environment and avoid mixing steps from unrelated tasks. If a step doesn’t directly support {focus_phrase}, skip it.</p>
+<p>Use a short checklist so each pass of {topic} is measured and comparable.</p>
+
+<h2>Complete Step-by-Step Guide</h2>
+<h3>Preparation</h3>
+<p>Set up a clean workspace and gather the tools and materials that fit {topic}. Label any containers so measurements are not confused later.</p>
+<p>Choose a small test run first. This keeps {topic} controlled before you scale it.</p>
+<p>Measure the main inputs and note the amounts so you can repeat the same {topic} process.</p>
+
+<h3>Main Process</h3>
+<p>Apply the method evenly and avoid rushing steps. This helps {topic} work consistently and reduces variability.</p>
+<p>Allow the recommended time window, then evaluate the result. Track the timing for {topic} so you can adjust if the result is too strong or too weak.</p>
+<p>Check the outcome immediately. If it’s not right, adjust one variable at a time (amount, time, or technique) and re-test.</p>
+
+<h3>Finishing</h3>
+<p>Complete any final steps required for {topic} and confirm the result meets the goal.</p>
+<p>Store any remaining materials in labeled containers and note the amounts used.</p>
+<p>Record what worked and what didn’t so the next {topic} run is faster and more consistent.</p>
+
+<h2>Types and Varieties</h2>
+<p>{topic} can vary based on setup, scale, and method. Choose the option that matches your use case.</p>
+<ul>
+    <li>Light-duty use: small batch, simple steps, quick checks.</li>
+    <li>Standard use: balanced inputs, consistent timing, repeatable results.</li>
+    <li>Detail work: smaller tools for edges, corners, and tight areas.</li>
+</ul>
+<p>For {topic}, the best method is the one that delivers reliable results without extra rework.</p>
+
+<h2>Troubleshooting Common Issues</h2>
+<p>If {topic} looks inconsistent or underperforms, the input amount or timing likely needs adjustment.</p>
+<ul>
+    <li>Issue: uneven results → Fix: apply the method more evenly and slow the pace.</li>
+    <li>Issue: no visible improvement → Fix: increase time slightly and re-test.</li>
+    <li>Issue: overcorrection → Fix: reduce inputs and re-test.</li>
+</ul>
+<p>Adjust one variable at a time so you can see what actually improves {topic}.</p>
+
+<h2>Pro Tips from Experts</h2>
+{pro_tips}
+
+{key_terms}
+
+{faqs}
+
+<h2>Advanced Techniques</h2>
+<p>Once {topic} is reliable, test small changes in inputs or method while keeping everything else the same.</p>
+<p>Track each change in a short log so you can identify the best-performing version of {topic}.</p>
+<p>For recurring tasks, pre-label containers and tools so each session starts with the same setup.</p>
+
+{comparison_table}
+
+{sources}
+</article>
+""")
+
+GARDENING_BODY = SectionTemplate("""
+<article>
+<h2>Direct Answer</h2>
+    <p>{topic} works best when you use the right container size, a well-draining mix, steady light, and consistent watering. Start with healthy starts or seeds, keep the soil evenly moist (not soggy), and prune often to encourage new growth. If results slip, adjust one variable at a time so you can identify what is holding {topic} back.</p>
+
+<h2>Key Conditions at a Glance</h2>
+<ul>
+{key_points}
+</ul>
+
+<h2>Understanding {topic}</h2>
+<p>{topic} is most reliable when the container, soil structure, and light exposure are aligned. Containers control root space and moisture, so drainage and mix quality determine whether plants stay healthy.</p>
+<p>Identify the main variables for {topic} (container size, soil structure, light hours, watering rhythm). Keeping those consistent makes the outcome repeatable.</p>
+<p>Work in stable conditions and avoid changing multiple variables at once. If a step doesn’t directly support {focus_phrase}, skip it.</p>
+<p>Use a short checklist so each pass of {topic} is measured and comparable.</p>
+
+<h2>Complete Step-by-Step Guide</h2>
+<h3>Preparation</h3>
+<p>Choose containers with drainage holes and a saucer that prevents standing water. For {topic}, clean containers prevent carryover issues.</p>
+<p>Use a light, well-draining potting mix and pre-moisten it before planting.</p>
+<p>Set a plan for light (window, grow light, or outdoor spot) and note your starting conditions.</p>
+
+<h3>Planting and Setup</h3>
+<p>Plant seeds or starts at the correct depth and spacing for {topic}. Press soil lightly and water to settle.</p>
+<p>Place containers where they receive consistent light. Rotate containers every few days so growth stays even.</p>
+<p>Keep the top inch of soil evenly moist. Overwatering is the most common setback for {topic} in containers.</p>
+
+<h3>Ongoing Care</h3>
+<p>Water when the top layer dries, then let excess drain completely. Avoid leaving containers in standing water.</p>
+<p>Prune regularly by pinching back stems to encourage bushier growth.</p>
+<p>Feed lightly with a balanced fertilizer every 2–4 weeks during active growth.</p>
+
+<h2>Types and Varieties</h2>
+<p>{topic} can vary by variety, growth habit, and flavor profile. Choose types that fit your space and use case.</p>
+<ul>
+    <li>Compact varieties: best for small containers and indoor setups.</li>
+    <li>Standard varieties: vigorous growth with frequent pruning.</li>
+    <li>Specialty varieties: unique flavors but may need more light.</li>
+</ul>
+<p>For {topic}, the best method is the one that fits your light conditions and how often you can maintain the plants.</p>
+
+<h2>Troubleshooting Common Issues</h2>
+<p>If {topic} looks weak or leggy, light or watering is usually the cause.</p>
+<ul>
+    <li>Issue: yellowing leaves → Fix: reduce watering and improve drainage.</li>
+    <li>Issue: slow growth → Fix: increase light and adjust feeding.</li>
+    <li>Issue: wilting midday → Fix: check root space and water schedule.</li>
+</ul>
+<p>Adjust one variable at a time so you can see what actually improves {topic}.</p>
+
+<h2>Pro Tips from Experts</h2>
+{pro_tips}
+
+{key_terms}
+
+{faqs}
+
+<h2>Advanced Techniques</h2>
+<p>Once {topic} is reliable, test small changes in light, spacing, or feeding while keeping everything else the same.</p>
+<p>Track each change in a short log so you can identify the best-performing setup for {topic}.</p>
+<p>For recurring batches, pre-label containers so each session starts with the same setup.</p>
+
+{comparison_table}
+
+{sources}
+</article>
+""")
+
+
+@lru_cache(maxsize=256)
+def article_body(ctx: SectionContext) -> str:
+    return ARTICLE_BODY.render(
+        ctx.fields(
+            key_points=ARTICLE_KEY_POINTS.render(ctx.fields()),
+            pro_tips=PRO_TIPS,
+            key_terms=key_terms_section(ctx),
+            faqs=faqs_section(ctx),
+            comparison_table=comparison_table(ctx),
+            sources=sources_section(ctx),
+        )
+    )
+
+
+@lru_cache(maxsize=256)
+def gardening_body(ctx: SectionContext) -> str:
+    return GARDENING_BODY.render(
+        ctx.fields(
+            key_points=GARDENING_KEY_POINTS.render(ctx.fields()),
+            pro_tips=PRO_TIPS,
+            key_terms=key_terms_section(ctx),
+            faqs=gardening_faqs(ctx),
+            comparison_table=GARDENING_COMPARISON_TABLE,
+            sources=sources_section(ctx),
+        )
+    )
+
+
+# name -> renderer(ctx)
+SECTIONS: dict[str, Callable[[SectionContext], str]] = {
+    "key_terms": key_terms_section,
+    "faqs": faqs_section,
+    "expert_quotes": expert_quotes,
+    "comparison_table": comparison_table,
+    "sources": sources_section,
+    "gardening_faqs": gardening_faqs,
+    "gardening_comparison_table": gardening_comparison_table,
+}
+
+
+def render_sections(
+    contexts: list[SectionContext], names: list[str] | tuple | None = None
+) -> list[dict[str, str]]:
+    """Render the named sections (default: all) for a batch of articles."""
+    renderers = [(name, SECTIONS[name]) for name in (names or SECTIONS)]
+    return [{name: render(ctx) for name, render in renderers} for ctx in contexts]
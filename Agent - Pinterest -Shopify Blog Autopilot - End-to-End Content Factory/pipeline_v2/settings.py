@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""settings.py — Lazily resolved configuration for ai_orchestrator.
+
+Importing ai_orchestrator (scan_quality.py, compare_articles.py,
+scan_gate_failures.py, check_audit.py, ...) used to load .env, collect the
+Gemini key chain, print the LLM provider chain and resolve the Shopify
+config (reading SHOPIFY_PUBLISH_CONFIG.json) before the caller did
+anything — including commands that never call an LLM.
+
+Settings resolves each value on first access and keeps it:
+
+    settings = get_settings()        # loads .env once, nothing else
+    settings.gemini_api_keys         # key chain, collected on first use
+    settings.shopify                 # ShopifyConfig(shop, blog_id, token, api_version)
+    settings.announce_providers()    # provider chain, printed once per process
+
+ai_orchestrator keeps its old module constants (GEMINI_API_KEY, SHOP,
+HEADERS, ...) as lazy aliases of these attributes.
+
+CLI:
+    python settings.py               # print the resolved provider chain
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+from functools import cached_property
+from pathlib import Path
+from typing import NamedTuple
+
+PIPELINE_DIR = Path(__file__).parent
+ROOT_DIR = PIPELINE_DIR.parent.parent
+ENV_PATHS = (
+    ROOT_DIR / ".env",
+    PIPELINE_DIR.parent / ".env",
+    PIPELINE_DIR / ".env",
+)
+DEFAULT_API_VERSION = "2025-01"
+
+# Gemini key slots in chain order; each slot takes the first alias that is set
+GEMINI_KEY_SLOTS = (
+    ("GEMINI_API_KEY", "GOOGLE_AI_STUDIO_API_KEY"),
+    ("FALLBACK_GEMINI_API_KEY", "FALLBACK_GOOGLE_AI_STUDIO_API_KEY"),
+    (
+        "SECOND_FALLBACK_GEMINI_API_KEY",
+        "SECOND_FALLBACK_GOOGLE_AI_STUDIO_API_KEY",
+        "THIRD_FALLBACK_GEMINI_API_KEY",
+        "THIRD_FALLBACK_GOOGLE_AI_STUDIO_API_KEY",
+        "GEMINI_API_KEY_FALLBACK_2",
+        "GEMINI_API_KEY_FALLBACK2",
+        "GEMINI_API_KEY_THIRD",
+        "GEMINI_API_KEY_3",
+        "THIRD_GEMINI_API_KEY",
+    ),
+    (
+        "FOURTH_FALLBACK_GEMINI_API_KEY",
+        "FOURTH_FALLBACK_GOOGLE_AI_STUDIO_API_KEY",
+        "GEMINI_API_KEY_4",
+        "FOURTH_GEMINI_API_KEY",
+    ),
+    (
+        "FIFTH_FALLBACK_GEMINI_API_KEY",
+        "FIFTH_FALLBACK_GOOGLE_AI_STUDIO_API_KEY",
+        "GEMINI_API_KEY_5",
+        "FIFTH_GEMINI_API_KEY",
+    ),
+    (
+        "SIXTH_FALLBACK_GEMINI_API_KEY",
+        "SIXTH_FALLBACK_GOOGLE_AI_STUDIO_API_KEY",
+        "GEMINI_API_KEY_6",
+        "SIXTH_GEMINI_API_KEY",
+    ),
+    (
+        "SEVENTH_FALLBACK_GEMINI_API_KEY",
+        "SEVENTH_FALLBACK_GOOGLE_AI_STUDIO_API_KEY",
+        "GEMINI_API_KEY_7",
+        "SEVENTH_GEMINI_API_KEY",
+    ),
+)
+
+
+class ShopifyConfig(NamedTuple):
+    shop: str
+    blog_id: str
+    token: str
+    api_version: str
+
+
+def _first_non_empty(*vals: str) -> str:
+    for v in vals:
+        if (v or "").strip():
+            return v.strip()
+    return ""
+
+
+def load_env(paths=ENV_PATHS) -> None:
+    """Load every existing .env file (later files do not override earlier)."""
+    try:
+        from dotenv import load_dotenv
+    except ImportError:
+        return
+    for env_path in paths:
+        if env_path.exists():
+            load_dotenv(env_path)
+
+
+def collect_gemini_api_keys() -> list[str]:
+    """Gemini keys in deterministic order: primary, fallback1..fallback6.
+
+    Supports legacy aliases to preserve backward compatibility.
+    """
+    keys: list[str] = []
+    for aliases in GEMINI_KEY_SLOTS:
+        key = _first_non_empty(*(os.environ.get(name, "") for name in aliases))
+        if key and key not in keys:
+            keys.append(key)
+    return keys
+
+
+def shopify_config() -> ShopifyConfig:
+    """SHOP, BLOG_ID, TOKEN, API_VERSION from env; fallback from SHOPIFY_PUBLISH_CONFIG.json"""
+    shop = os.getenv("SHOPIFY_SHOP") or os.getenv("SHOPIFY_STORE_DOMAIN")
+    blog_id = os.getenv("SHOPIFY_BLOG_ID")
+    token = os.getenv("SHOPIFY_ACCESS_TOKEN")
+    api_ver = os.getenv("SHOPIFY_API_VERSION", DEFAULT_API_VERSION)
+    if not shop or not blog_id or not token:
+        config_path = PIPELINE_DIR.parent / "SHOPIFY_PUBLISH_CONFIG.json"
+        if not config_path.exists():
+            config_path = ROOT_DIR / "SHOPIFY_PUBLISH_CONFIG.json"
+        if config_path.exists():
+            with open(config_path, "r", encoding="utf-8") as f:
+                cfg = json.load(f)
+            shop_cfg = cfg.get("shop", {})
+            if not shop:
+                shop = shop_cfg.get("domain", "")
+            if not token:
+                token = shop_cfg.get("access_token", "")
+            if not api_ver:
+                api_ver = shop_cfg.get("api_version", DEFAULT_API_VERSION)
+        # BLOG_ID often only in env (secrets)
+    return ShopifyConfig(
+        shop or "", blog_id or "", token or "", api_ver or DEFAULT_API_VERSION
+    )
+
+
+class Settings:
+    """Process configuration; every attribute is resolved on first access."""
+
+    def __init__(self, env_paths=ENV_PATHS):
+        load_env(env_paths)
+        self._announced = False
+
+    # ------------------------------------------------------------------
+    # LLM providers
+    # ------------------------------------------------------------------
+    @cached_property
+    def gemini_api_keys(self) -> list[str]:
+        return collect_gemini_api_keys()
+
+    def gemini_key(self, index: int) -> str:
+        keys = self.gemini_api_keys
+        return keys[index] if len(keys) > index else ""
+
+    @cached_property
+    def gemini_model(self) -> str:
+        return os.environ.get("GEMINI_MODEL", "gemini-2.0-flash")
+
+    @cached_property
+    def gemini_models(self) -> list[str]:
+        """All Gemini models to try, in order, de-duplicated."""
+        models = [
+            self.gemini_model,
+            os.environ.get("GEMINI_MODEL_FALLBACK", "gemini-2.5-flash-lite"),
+            # Extra fallbacks: smart text/image models
+            os.environ.get("GEMINI_MODEL_FALLBACK_2", "gemini-2.5-flash"),
+            os.environ.get("GEMINI_MODEL_FALLBACK_3", "gemini-2.0-flash-lite"),
+        ]
+        return list(dict.fromkeys(m for m in models if m))
+
+    @cached_property
+    def gemini_delay_seconds(self) -> float:
+        # Rate limiting delay between API calls (prevents abuse detection)
+        return float(os.environ.get("GEMINI_DELAY_SECONDS", "2.0"))
+
+    @cached_property
+    def gh_models_api_key(self) -> str:
+        return os.environ.get("GH_MODELS_API_KEY", "")
+
+    @cached_property
+    def gh_models_api_base(self) -> str:
+        return os.environ.get(
+            "GH_MODELS_API_BASE", "https://models.github.ai/inference"
+        )
+
+    @cached_property
+    def gh_models_model(self) -> str:
+        return os.environ.get("GH_MODELS_MODEL", "openai/gpt-4.1")
+
+    @cached_property
+    def openai_api_key(self) -> str:
+        return os.environ.get("OPENAI_API_KEY", "")
+
+    @cached_property
+    def openai_model(self) -> str:
+        return os.environ.get("OPENAI_MODEL", "gpt-4o-mini")
+
+    @cached_property
+    def llm_max_output_tokens(self) -> int:
+        return int(os.environ.get("LLM_MAX_OUTPUT_TOKENS", "7000"))
+
+    @cached_property
+    def llm_stream(self) -> bool:
+        """Stream completions through llm_stream.StreamGuard (LLM_STREAM=0: off)."""
+        return os.environ.get("LLM_STREAM", "1").strip().lower() not in {
+            "0",
+            "false",
+            "no",
+        }
+
+    @cached_property
+    def article_generation_mode(self) -> str:
+        """ "single" (one completion) or "sections" (section_gen, in parallel)."""
+        return os.environ.get("ARTICLE_GENERATION_MODE", "single").strip().lower()
+
+    def provider_chain(self) -> list[str]:
+        """Provider chain lines (OpenAI first, then Gemini keys, then others)."""
+        lines = [
+            f"OpenAI: {self.openai_model} (key: {'✅' if self.openai_api_key else '❌ MISSING'})"
+        ]
+        for kidx, _ in enumerate(self.gemini_api_keys, 1):
+            for model in self.gemini_models:
+                lines.append(f"Gemini: {model} (key#{kidx}: ✅)")
+        lines.append(
+            f"GitHub Models: {self.gh_models_model} (key: {'✅' if self.gh_models_api_key else '❌ MISSING'})"
+        )
+        lines.append("Pollinations: free (no key needed)")
+        return lines
+
+    def announce_providers(self) -> None:
+        """Print the provider chain the first time an LLM is about to be used."""
+        if self._announced:
+            return
+        self._announced = True
+        print("🔧 LLM Provider Chain (OpenAI first, then Gemini keys, then others):")
+        for idx, line in enumerate(self.provider_chain(), 1):
+            print(f"   {idx}. {line}")
+        if not (self.gemini_api_keys or self.gh_models_api_key or self.openai_api_key):
+            print(
+                "⚠️ WARNING: No LLM API keys configured! All LLM generation will fail."
+            )
+
+    # ------------------------------------------------------------------
+    # Shopify
+    # ------------------------------------------------------------------
+    @cached_property
+    def shopify(self) -> ShopifyConfig:
+        return shopify_config()
+
+    @cached_property
+    def shopify_headers(self) -> dict:
+        return {
+            "X-Shopify-Access-Token": self.shopify.token,
+            "Content-Type": "application/json",
+        }
+
+    @cached_property
+    def shopify_dry_run(self) -> bool:
+        return os.environ.get("SHOPIFY_DRY_RUN", "").lower() in {"1", "true", "yes"}
+
+
+_shared_settings: Settings | None = None
+_lock = threading.Lock()
+
+
+def get_settings() -> Settings:
+    """Process-wide settings (.env loaded on first call)."""
+    global _shared_settings
+    if _shared_settings is None:
+        with _lock:
+            if _shared_settings is None:
+                _shared_settings = Settings()
+    return _shared_settings
+
+
+def main():
+    settings = get_settings()
+    settings.announce_providers()
+    cfg = settings.shopify
+    print(f"Shopify: {cfg.shop or '(unset)'} blog={cfg.blog_id or '(unset)'}")
+    print(f"API version: {cfg.api_version}")
+
+
+if __name__ == "__main__":
+    main()
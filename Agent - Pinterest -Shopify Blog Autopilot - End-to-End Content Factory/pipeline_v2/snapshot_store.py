@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""snapshot_store.py — Content-addressed, deduplicated article snapshots.
+
+restore_from_backups.py saved a full article JSON before every restore
+(backups_restore/<id>_current_<ts>.json) next to the full copies in
+backups_auto_fix/, so the same 20-40KB body was on disk many times over,
+and finding "the versions of article X" meant listing and parsing files.
+
+SnapshotStore keeps each snapshot as
+
+    objects/ab/cdef...   zstd-compressed chunks (zlib when the zstandard
+                         package is missing), named by the sha256 of the
+                         uncompressed bytes, written once
+    manifest             an object too: the non-body fields plus the chunk
+                         hashes of body_html, split at <h2> boundaries
+    index.jsonl          one line per version: id, ts, label, manifest
+
+A fix that touches one section stores one new chunk and a manifest; an
+unchanged article stores nothing. Versions are listed from the index
+without touching the objects.
+
+Usage:
+    store = get_snapshot_store()
+    store.put(article, label="pre_restore")
+    store.versions(article_id)             # [{"n", "ts", "label", "manifest", "bytes"}]
+    store.get(article_id, -1)              # article dict (index, ts prefix or label)
+    store.diff(article_id, -2, -1)         # changed fields + block-level body diff
+
+CLI:
+    python snapshot_store.py stats
+    python snapshot_store.py list <article_id>
+    python snapshot_store.py show <article_id> [--version V] [--out FILE]
+    python snapshot_store.py diff <article_id> [A] [B]
+    python snapshot_store.py import backups_auto_fix backups_restore --label legacy
+
+Environment:
+    SNAPSHOT_STORE_DIR    store location (default pipeline_v2/snapshots)
+    SNAPSHOT_ZSTD_LEVEL   zstd level (default 10)
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+import zlib
+from datetime import datetime, timezone
+from pathlib import Path
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+from html_diff import changed_fields, structural_diff
+
+PIPELINE_DIR = Path(__file__).parent
+SNAPSHOT_STORE_DIR = Path(
+    os.environ.get("SNAPSHOT_STORE_DIR", str(PIPELINE_DIR / "snapshots"))
+)
+ZSTD_LEVEL = int(os.environ.get("SNAPSHOT_ZSTD_LEVEL", "10"))
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+# Fields kept per snapshot (what a restore PUTs back, plus identifiers)
+SNAPSHOT_FIELDS = (
+    "id",
+    "title",
+    "handle",
+    "summary_html",
+    "tags",
+    "author",
+    "image",
+    "published_at",
+    "updated_at",
+)
+
+_H2_RE = re.compile(r"(?=<h2\b)", re.IGNORECASE)
+
+
+def _hash(raw: bytes) -> str:
+    return hashlib.sha256(raw).hexdigest()
+
+
+def compress(raw: bytes) -> bytes:
+    if zstandard is not None:
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(raw)
+    return zlib.compress(raw, 9)
+
+
+def decompress(blob: bytes) -> bytes:
+    if blob[:4] == ZSTD_MAGIC:
+        if zstandard is None:
+            raise RuntimeError("zstd snapshot object needs the zstandard package")
+        return zstandard.ZstdDecompressor().decompress(blob)
+    return zlib.decompress(blob)
+
+
+def chunk_body(body_html: str) -> list[str]:
+    """body_html split in front of every <h2> (lead first, may be empty)."""
+    return [chunk for chunk in _H2_RE.split(body_html or "") if chunk]
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+class SnapshotStore:
+    """Chunked, compressed article versions under one directory."""
+
+    def __init__(self, root: Path = SNAPSHOT_STORE_DIR):
+        self.root = Path(root)
+        self.objects_dir = self.root / "objects"
+        self.index_path = self.root / "index.jsonl"
+        self._lock = threading.Lock()
+        self._index: dict[str, list[dict]] | None = None
+
+    # ------------------------------------------------------------------
+    # Objects
+    # ------------------------------------------------------------------
+    def _object_path(self, digest: str) -> Path:
+        return self.objects_dir / digest[:2] / digest[2:]
+
+    def _write_object(self, raw: bytes) -> str:
+        digest = _hash(raw)
+        path = self._object_path(digest)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(
+                f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+            )
+            tmp_path.write_bytes(compress(raw))
+            os.replace(tmp_path, path)
+        return digest
+
+    def _read_object(self, digest: str) -> bytes:
+        return decompress(self._object_path(digest).read_bytes())
+
+    # ------------------------------------------------------------------
+    # Index
+    # ------------------------------------------------------------------
+    def _load_index(self) -> dict[str, list[dict]]:
+        if self._index is None:
+            index: dict[str, list[dict]] = {}
+            if self.index_path.exists():
+                with open(self.index_path, "r", encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            entry = json.loads(line)
+                        except json.JSONDecodeError:
+                            continue  # torn last line
+                        versions = index.setdefault(str(entry["id"]), [])
+                        entry["n"] = len(versions)
+                        versions.append(entry)
+            self._index = index
+        return self._index
+
+    def article_ids(self) -> list[str]:
+        return sorted(self._load_index())
+
+    def versions(self, article_id) -> list[dict]:
+        """Versions of an article, oldest first (n = position)."""
+        return list(self._load_index().get(str(article_id), []))
+
+    def resolve(self, article_id, version=-1) -> dict | None:
+        """Version entry by index (negative from the end), label or ts prefix."""
+        versions = self.versions(article_id)
+        if not versions:
+            return None
+        if version is None:
+            version = -1
+        if isinstance(version, str) and re.fullmatch(r"-?\d+", version.strip()):
+            version = int(version)
+        if isinstance(version, int):
+            try:
+                return versions[version]
+            except IndexError:
+                return None
+        for entry in reversed(versions):
+            if entry.get("label") == version or entry["ts"].startswith(version):
+                return entry
+        return None
+
+    # ------------------------------------------------------------------
+    # Snapshots
+    # ------------------------------------------------------------------
+    def put(self, article: dict, label: str = "", ts: str | None = None) -> dict:
+        """Store an article version; an unchanged article reuses its last entry."""
+        article_id = str(article["id"])
+        body = article.get("body_html") or ""
+        manifest = {
+            "fields": {k: article.get(k) for k in SNAPSHOT_FIELDS if k in article},
+            "body": [self._write_object(c.encode("utf-8")) for c in chunk_body(body)],
+        }
+        raw = json.dumps(manifest, sort_keys=True, ensure_ascii=False, default=str)
+        manifest_hash = self._write_object(raw.encode("utf-8"))
+
+        with self._lock:
+            versions = self._load_index().setdefault(article_id, [])
+            if versions and versions[-1]["manifest"] == manifest_hash:
+                return versions[-1]
+            entry = {
+                "id": article_id,
+                "ts": ts or _now(),
+                "label": label,
+                "manifest": manifest_hash,
+                "bytes": len(body.encode("utf-8")),
+            }
+            self.root.mkdir(parents=True, exist_ok=True)
+            with open(self.index_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            entry = {**entry, "n": len(versions)}
+            versions.append(entry)
+            return entry
+
+    def get(self, article_id, version=-1) -> dict | None:
+        """Article dict of a stored version (None if there is no such version)."""
+        entry = self.resolve(article_id, version)
+        if entry is None:
+            return None
+        manifest = json.loads(self._read_object(entry["manifest"]))
+        body = "".join(self._read_object(h).decode("utf-8") for h in manifest["body"])
+        return {**manifest["fields"], "body_html": body}
+
+    def diff(self, article_id, a=-2, b=-1) -> list[str]:
+        """Changed fields and block-level body diff lines from version a to b."""
+        old = self.get(article_id, a)
+        new = self.get(article_id, b)
+        if old is None or new is None:
+            return []
+        lines = []
+        for name in sorted(changed_fields(old, new)):
+            if name == "body_html":
+                lines += structural_diff(old["body_html"], new["body_html"])
+            elif name != "id":
+                lines.append(f"~ {name}: {str(new.get(name))[:80]}")
+        return lines
+
+    def import_json(self, path: Path, label: str = "legacy") -> dict | None:
+        """Snapshot an existing article JSON dump (file mtime as ts)."""
+        path = Path(path)
+        try:
+            article = json.loads(path.read_text(encoding="utf-8"))
+        except (json.JSONDecodeError, OSError):
+            return None
+        article = article.get("article", article) if isinstance(article, dict) else None
+        if not article or "id" not in article:
+            return None
+        mtime = datetime.fromtimestamp(path.stat().st_mtime, timezone.utc)
+        return self.put(article, label=label, ts=mtime.isoformat(timespec="seconds"))
+
+    def stats(self) -> dict:
+        index = self._load_index()
+        stored = objects = 0
+        if self.objects_dir.exists():
+            for path in self.objects_dir.glob("*/*"):
+                if not path.name.endswith(".tmp"):
+                    objects += 1
+                    stored += path.stat().st_size
+        return {
+            "articles": len(index),
+            "versions": sum(len(v) for v in index.values()),
+            "body_bytes": sum(e["bytes"] for v in index.values() for e in v),
+            "objects": objects,
+            "stored_bytes": stored,
+            "codec": "zstd" if zstandard is not None else "zlib",
+        }
+
+
+_shared_store: SnapshotStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_snapshot_store() -> SnapshotStore:
+    """Process-wide store (SNAPSHOT_STORE_DIR)."""
+    global _shared_store
+    if _shared_store is None:
+        with _store_lock:
+            if _shared_store is None:
+                _shared_store = SnapshotStore()
+    return _shared_store
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("stats")
+    p_list = sub.add_parser("list")
+    p_list.add_argument("article_id")
+    p_show = sub.add_parser("show")
+    p_show.add_argument("article_id")
+    p_show.add_argument("--version", default="-1")
+    p_show.add_argument("--out", help="Write the article JSON here")
+    p_diff = sub.add_parser("diff")
+    p_diff.add_argument("article_id")
+    p_diff.add_argument("a", nargs="?", default="-2")
+    p_diff.add_argument("b", nargs="?", default="-1")
+    p_import = sub.add_parser("import", help="Snapshot *.json article dumps")
+    p_import.add_argument("paths", nargs="+")
+    p_import.add_argument("--label", default="legacy")
+    args = parser.parse_args()
+
+    store = get_snapshot_store()
+    if args.command == "stats":
+        stats = store.stats()
+        ratio = stats["body_bytes"] / max(stats["stored_bytes"], 1)
+        print(json.dumps(stats, indent=2))
+        print(f"Dedup + compression: {ratio:.1f}x")
+    elif args.command == "list":
+        for entry in store.versions(args.article_id):
+            print(
+                f"{entry['n']:4d}  {entry['ts']}  {entry['bytes']:7d} B  {entry['label']}"
+            )
+    elif args.command == "show":
+        article = store.get(args.article_id, args.version)
+        if article is None:
+            print(f"❌ No version {args.version} of {args.article_id}")
+            sys.exit(1)
+        payload = json.dumps(article, ensure_ascii=False, indent=2)
+        if args.out:
+            Path(args.out).write_text(payload, encoding="utf-8")
+            print(f"Saved -> {args.out}")
+        else:
+            print(payload)
+    elif args.command == "diff":
+        for line in store.diff(args.article_id, args.a, args.b) or ["(no changes)"]:
+            print(line)
+    elif args.command == "import":
+        imported = 0
+        for raw_path in args.paths:
+            path = Path(raw_path)
+            files = [path]
+            if path.is_dir():
+                files = sorted(path.glob("*.json"), key=lambda f: f.stat().st_mtime)
+            for file in files:
+                if store.import_json(file, label=args.label):
+                    imported += 1
+        print(f"Imported {imported} snapshot(s) -> {store.root}")
+
+
+if __name__ == "__main__":
+    main()
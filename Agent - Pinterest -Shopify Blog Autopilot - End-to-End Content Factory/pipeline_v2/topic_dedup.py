@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+"""topic_dedup.py — MinHash/LSH near-duplicate check for new topics.
+
+batch_autopublish.TOPICS, blog_generator.get_pending_topics and the Pinterest
+topic files can queue a topic the blog already covers under a slightly
+different title ("DIY Citrus Cleaner from Orange Peels" vs "Homemade Orange
+Peel Citrus Cleaner"). generate_handle's random suffix only hides the handle
+clash, so the LLM call is wasted and the two posts compete in search.
+
+This index keeps a MinHash signature of every article's title tokens and
+body word-shingles, bucketed with LSH so a lookup only compares a handful of
+candidates - well under a millisecond per topic with thousands of posts.
+
+    index = get_topic_dedup_index()
+    dup = index.find_duplicate("Homemade Orange Peel Citrus Cleaner")
+    if dup:
+        ...  # skip: already covered by dup["title"] (dup["score"])
+    index.reserve(title)  # so the same run doesn't queue it twice
+
+Refresh:
+    - rebuild(articles) / upsert(articles)  from Shopify article dicts
+    - sync(fetch, fetch_ids)  fetch(updated_at_min) -> changed articles since last
+                              sync; fetch_ids() -> all live ids (prunes deleted)
+
+Environment:
+    TOPIC_DEDUP_FILE             index location (default pipeline_v2/topic_dedup_index.json)
+    TOPIC_DEDUP_THRESHOLD        title Jaccard that counts as duplicate (default 0.6)
+    TOPIC_DEDUP_BODY_THRESHOLD   body-shingle Jaccard that counts as duplicate (default 0.5)
+    TOPIC_DEDUP_DISABLED         set to 1/true/yes to turn the check off
+
+CLI:
+    python topic_dedup.py check "<title>"
+    python topic_dedup.py stats
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import random
+import re
+import sys
+from collections import defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+
+from related_index import tokenize
+
+PIPELINE_DIR = Path(__file__).parent
+TOPIC_DEDUP_FILE = Path(
+    os.environ.get("TOPIC_DEDUP_FILE", str(PIPELINE_DIR / "topic_dedup_index.json"))
+)
+INDEX_VERSION = 1
+
+# 20 bands x 3 rows: a pair with Jaccard 0.6 becomes a candidate ~99% of the
+# time, a pair at 0.3 ~40% (candidates are then checked exactly).
+NUM_PERM = 60
+BANDS = 20
+ROWS = NUM_PERM // BANDS
+BODY_SHINGLE_SIZE = 5
+BODY_MAX_WORDS = 1500
+
+_rng = random.Random(1729)  # fixed seed: signatures must be stable across runs
+_MASKS = [_rng.getrandbits(64) for _ in range(NUM_PERM)]
+# Body shingles are sampled by hash (1 in 4) to keep signing cheap; the
+# sample is consistent across documents so Jaccard is preserved on average.
+BODY_SAMPLE_MASK = 0x3
+
+# Title words that don't change what an article is about
+TOPIC_FILLER = {
+    "diy",
+    "homemade",
+    "natural",
+    "simple",
+    "ultimate",
+    "beginner",
+    "make",
+    "making",
+    "recipe",
+    "way",
+    "idea",
+    "ideas",
+    "home",
+}
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_WORD_RE = re.compile(r"[a-z0-9']+")
+
+
+def title_tokens(title: str) -> set[str]:
+    tokens = set()
+    for tok in tokenize(title):
+        if tok in TOPIC_FILLER:
+            continue
+        # "growing"/"grow", "pickling"/"pickl(e)": fold the -ing form
+        if len(tok) > 5 and tok.endswith("ing"):
+            tok = tok[:-3]
+        tokens.add(tok)
+    return tokens
+
+
+def body_shingles(body_html: str) -> set[str]:
+    words = _WORD_RE.findall(_TAG_RE.sub(" ", body_html or "").lower())
+    words = words[:BODY_MAX_WORDS]
+    return {
+        " ".join(words[i : i + BODY_SHINGLE_SIZE])
+        for i in range(max(0, len(words) - BODY_SHINGLE_SIZE + 1))
+    }
+
+
+def _hash64(shingle: str) -> int:
+    return int.from_bytes(
+        hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "little"
+    )
+
+
+def minhash(shingles: set[str], sample: int = 0) -> list[int]:
+    """MinHash signature; XOR with fixed masks stands in for permutations."""
+    hashes = [_hash64(s) for s in shingles]
+    if sample:
+        hashes = [h for h in hashes if not h & sample]
+    if not hashes:
+        return []
+    return [min(h ^ mask for h in hashes) for mask in _MASKS]
+
+
+def estimate_jaccard(sig_a: list[int], sig_b: list[int]) -> float:
+    if not sig_a or not sig_b:
+        return 0.0
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / NUM_PERM
+
+
+def _band_keys(sig: list[int]) -> list[tuple]:
+    return [
+        (band, tuple(sig[band * ROWS : (band + 1) * ROWS])) for band in range(BANDS)
+    ]
+
+
+def dedup_disabled() -> bool:
+    return os.environ.get("TOPIC_DEDUP_DISABLED", "").lower() in {"1", "true", "yes"}
+
+
+class TopicDedupIndex:
+    """MinHash signatures per article plus in-memory LSH buckets."""
+
+    def __init__(self, path: Path = TOPIC_DEDUP_FILE):
+        self.path = Path(path)
+        self.docs: dict[str, dict] = {}
+        self.last_sync: str = ""
+        self.threshold = float(os.environ.get("TOPIC_DEDUP_THRESHOLD", "0.6"))
+        self.body_threshold = float(os.environ.get("TOPIC_DEDUP_BODY_THRESHOLD", "0.5"))
+        self._title_buckets: dict[tuple, set[str]] = defaultdict(set)
+        self._body_buckets: dict[tuple, set[str]] = defaultdict(set)
+        self._reserved = 0
+        self._load()
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        try:
+            payload = json.loads(self.path.read_text(encoding="utf-8"))
+        except (json.JSONDecodeError, OSError):
+            return
+        if payload.get("version") != INDEX_VERSION:
+            return
+        self.last_sync = payload.get("last_sync", "")
+        for doc_id, doc in (payload.get("docs", {}) or {}).items():
+            self._index(doc_id, doc)
+
+    def save(self) -> None:
+        payload = {
+            "version": INDEX_VERSION,
+            "last_sync": self.last_sync,
+            "docs": {
+                doc_id: doc
+                for doc_id, doc in self.docs.items()
+                if not doc.get("reserved")
+            },
+        }
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        try:
+            tmp_path.write_text(
+                json.dumps(payload, ensure_ascii=False), encoding="utf-8"
+            )
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"⚠️ topic dedup index save failed: {e}")
+
+    # ------------------------------------------------------------------
+    # Refresh
+    # ------------------------------------------------------------------
+    def _index(self, doc_id: str, doc: dict) -> None:
+        self._unindex(doc_id)
+        self.docs[doc_id] = doc
+        for key in _band_keys(doc.get("title_sig") or []):
+            self._title_buckets[key].add(doc_id)
+        for key in _band_keys(doc.get("body_sig") or []):
+            self._body_buckets[key].add(doc_id)
+
+    def _unindex(self, doc_id: str) -> None:
+        doc = self.docs.pop(doc_id, None)
+        if not doc:
+            return
+        for key in _band_keys(doc.get("title_sig") or []):
+            self._title_buckets[key].discard(doc_id)
+        for key in _band_keys(doc.get("body_sig") or []):
+            self._body_buckets[key].discard(doc_id)
+
+    def upsert(self, articles: list[dict]) -> int:
+        """Add/replace Shopify articles (drafts included). Returns count indexed."""
+        count = 0
+        for article in articles:
+            article_id = str(article.get("id", ""))
+            title = article.get("title", "")
+            if not article_id or not title:
+                continue
+            tokens = title_tokens(title)
+            self._index(
+                article_id,
+                {
+                    "title": title,
+                    "handle": article.get("handle", ""),
+                    "tokens": sorted(tokens),
+                    "title_sig": minhash(tokens),
+                    "body_sig": minhash(
+                        body_shingles(article.get("body_html", "")),
+                        sample=BODY_SAMPLE_MASK,
+                    ),
+                },
+            )
+            count += 1
+        # UTC so it can be passed straight to Shopify's updated_at_min
+        self.last_sync = datetime.now(timezone.utc).isoformat()
+        return count
+
+    def rebuild(self, articles: list[dict]) -> int:
+        """Replace the whole index with `articles` (drops deleted articles)."""
+        reserved = {k: v for k, v in self.docs.items() if v.get("reserved")}
+        self.docs = {}
+        self._title_buckets = defaultdict(set)
+        self._body_buckets = defaultdict(set)
+        for doc_id, doc in reserved.items():
+            self._index(doc_id, doc)
+        return self.upsert(articles)
+
+    def remove(self, article_ids: list[str]) -> None:
+        for article_id in article_ids:
+            self._unindex(str(article_id))
+
+    def prune(self, live_ids) -> int:
+        """Drop indexed articles not in `live_ids` (reservations stay). Returns count."""
+        live = {str(x) for x in live_ids}
+        gone = [
+            doc_id
+            for doc_id, doc in self.docs.items()
+            if not doc.get("reserved") and doc_id not in live
+        ]
+        self.remove(gone)
+        return len(gone)
+
+    def sync(self, fetch, fetch_ids=None) -> int:
+        """Top up from `fetch(updated_at_min)`; an empty index fetches everything.
+
+        `fetch_ids()` returns the ids of every article still on the blog
+        (None if that failed); indexed articles missing from it were deleted
+        and are pruned, so they stop blocking new topics.
+        """
+        full = not self.docs
+        changed = fetch(self.last_sync if self.docs else "")
+        count = self.upsert(changed or [])
+        if fetch_ids is not None and not full:
+            live_ids = fetch_ids()
+            if live_ids is not None:
+                self.prune(live_ids)
+        self.save()
+        return count
+
+    def reserve(self, title: str, key: str = "") -> None:
+        """Mark a topic as taken for this process (not persisted).
+
+        Call after deciding to generate a topic so a second near-identical
+        topic later in the same queue is caught before its article exists.
+        """
+        self._reserved += 1
+        tokens = title_tokens(title)
+        self._index(
+            f"reserved:{key or self._reserved}",
+            {
+                "title": title,
+                "handle": "",
+                "tokens": sorted(tokens),
+                "title_sig": minhash(tokens),
+                "body_sig": [],
+                "reserved": True,
+            },
+        )
+
+    # ------------------------------------------------------------------
+    # Query
+    # ------------------------------------------------------------------
+    def find_duplicate(
+        self,
+        title: str,
+        body_html: str = "",
+        exclude_ids: set[str] | None = None,
+    ) -> dict | None:
+        """Best near-duplicate of a topic, or None.
+
+        Returns {id, title, handle, score, match, reserved} where match is
+        "title" (exact Jaccard of title tokens) or "body" (MinHash estimate
+        over body shingles, only when body_html is given), and reserved is
+        True for a topic reserved in this process rather than an article.
+        """
+        exclude = {str(x) for x in (exclude_ids or set())}
+        best = None
+
+        tokens = title_tokens(title)
+        if tokens:
+            candidates = set()
+            for key in _band_keys(minhash(tokens)):
+                candidates |= self._title_buckets.get(key, set())
+            for doc_id in candidates - exclude:
+                other = set(self.docs[doc_id]["tokens"])
+                score = len(tokens & other) / len(tokens | other)
+                if score >= self.threshold and (not best or score > best["score"]):
+                    best = self._hit(doc_id, score, "title")
+
+        if body_html:
+            sig = minhash(body_shingles(body_html), sample=BODY_SAMPLE_MASK)
+            candidates = set()
+            for key in _band_keys(sig):
+                candidates |= self._body_buckets.get(key, set())
+            for doc_id in candidates - exclude:
+                score = estimate_jaccard(sig, self.docs[doc_id]["body_sig"])
+                if score >= self.body_threshold and (not best or score > best["score"]):
+                    best = self._hit(doc_id, score, "body")
+
+        return best
+
+    def _hit(self, doc_id: str, score: float, match: str) -> dict:
+        doc = self.docs[doc_id]
+        return {
+            "id": doc_id,
+            "title": doc["title"],
+            "handle": doc.get("handle", ""),
+            "score": round(score, 3),
+            "match": match,
+            "reserved": bool(doc.get("reserved")),
+        }
+
+
+_shared_index: TopicDedupIndex | None = None
+
+
+def get_topic_dedup_index() -> TopicDedupIndex | None:
+    """Process-wide index instance (None when TOPIC_DEDUP_DISABLED is set)."""
+    global _shared_index
+    if dedup_disabled():
+        return None
+    if _shared_index is None:
+        _shared_index = TopicDedupIndex()
+    return _shared_index
+
+
+def main():
+    index = TopicDedupIndex()
+    if len(sys.argv) < 2 or sys.argv[1] == "stats":
+        print(f"Indexed articles: {len(index.docs)}")
+        print(f"Last sync: {index.last_sync or 'never'}")
+        print(f"Title threshold: {index.threshold}  body: {index.body_threshold}")
+        return
+    if sys.argv[1] == "check" and len(sys.argv) > 2:
+        dup = index.find_duplicate(sys.argv[2])
+        if dup:
+            print(
+                f"DUPLICATE ({dup['match']} {dup['score']:.2f}): {dup['id']}  {dup['title']}"
+            )
+        else:
+            print("No near-duplicate found")
+        return
+    print('Usage: python topic_dedup.py [stats | check "<title>"]')
+
+
+if __name__ == "__main__":
+    main()
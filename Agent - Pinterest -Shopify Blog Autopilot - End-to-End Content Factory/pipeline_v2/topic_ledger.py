@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""topic_ledger.py — Durable per-topic job ledger for batch publishing.
+
+batch_autopublish.main only resumed through a manual start_index, so a crash
+in the middle of an overnight batch meant guessing where it stopped, and a
+crash between "POST article" and "log success" could publish twice.
+
+Every state change of a topic job is appended as one JSON line (flushed and
+fsynced) to topic_ledger.jsonl; replaying the file gives the latest state
+per job. Appends are the only writes, so a crash can at worst lose the line
+being written, never corrupt earlier ones.
+
+Job states:
+    images      image search done; images stored so a retry skips the search
+    publishing  written BEFORE the create request; a job left in this state
+                after a crash may or may not exist on Shopify and must be
+                reconciled (looked up) before it is retried
+    published   article_id / handle stored; the job is never run again
+    failed      retries exhausted; retried on the next run
+
+Jobs are keyed by topic id + title hash, so editing a topic's title starts
+a new job instead of silently skipping it.
+
+CLI:
+    python topic_ledger.py stats
+    python topic_ledger.py show <job_key>
+    python topic_ledger.py forget <job_key>   # force a job to run again
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sys
+import threading
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+
+PIPELINE_DIR = Path(__file__).parent
+TOPIC_LEDGER_FILE = Path(
+    os.environ.get("TOPIC_LEDGER_FILE", str(PIPELINE_DIR / "topic_ledger.jsonl"))
+)
+
+STATUSES = ("images", "publishing", "published", "failed", "forgotten")
+
+
+def job_key(topic: dict) -> str:
+    """'<topic id>:<title hash>' (stable across runs, new key on title edits)."""
+    digest = hashlib.sha1(topic["title"].strip().lower().encode("utf-8"))
+    return f"{topic['id']}:{digest.hexdigest()[:10]}"
+
+
+class TopicLedger:
+    """Append-only JSONL ledger replayed into {job_key: latest record}."""
+
+    def __init__(self, path: Path = TOPIC_LEDGER_FILE):
+        self.path = Path(path)
+        self.jobs: dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._replay()
+
+    def _replay(self) -> None:
+        if not self.path.exists():
+            return
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # torn last line from a crash
+                key = entry.get("job")
+                if not key:
+                    continue
+                if entry.get("status") == "forgotten":
+                    self.jobs.pop(key, None)
+                    continue
+                # Later lines only add/override fields of the same job
+                self.jobs[key] = {**self.jobs.get(key, {}), **entry}
+
+    def record(self, key: str, status: str, **fields) -> dict:
+        """Append a state change and make it durable before returning."""
+        if status not in STATUSES:
+            raise ValueError(f"Unknown ledger status: {status}")
+        entry = {
+            "job": key,
+            "status": status,
+            # UTC: reconcile_in_flight passes it to Shopify as updated_at_min
+            "ts": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            **fields,
+        }
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+            if status == "forgotten":
+                self.jobs.pop(key, None)
+            else:
+                self.jobs[key] = {**self.jobs.get(key, {}), **entry}
+        return entry
+
+    def get(self, key: str) -> dict:
+        with self._lock:
+            return dict(self.jobs.get(key, {}))
+
+    def status(self, key: str) -> str:
+        return self.get(key).get("status", "")
+
+    def is_published(self, topic: dict) -> bool:
+        return self.status(job_key(topic)) == "published"
+
+    def in_flight(self) -> dict[str, dict]:
+        """Jobs that crashed between 'publishing' and 'published'."""
+        with self._lock:
+            return {
+                key: dict(job)
+                for key, job in self.jobs.items()
+                if job.get("status") == "publishing"
+            }
+
+    def counts(self) -> dict[str, int]:
+        with self._lock:
+            return dict(Counter(job.get("status", "?") for job in self.jobs.values()))
+
+
+_shared_ledger: TopicLedger | None = None
+
+
+def get_topic_ledger() -> TopicLedger:
+    """Process-wide ledger (replayed from disk once)."""
+    global _shared_ledger
+    if _shared_ledger is None:
+        _shared_ledger = TopicLedger()
+    return _shared_ledger
+
+
+def main():
+    ledger = get_topic_ledger()
+    if len(sys.argv) < 2 or sys.argv[1] == "stats":
+        print(f"Ledger: {ledger.path}")
+        print(f"Jobs: {len(ledger.jobs)}")
+        for status, count in sorted(ledger.counts().items()):
+            print(f"  {status}: {count}")
+        return
+    if sys.argv[1] == "show" and len(sys.argv) > 2:
+        print(json.dumps(ledger.get(sys.argv[2]), indent=2, ensure_ascii=False))
+        return
+    if sys.argv[1] == "forget" and len(sys.argv) > 2:
+        ledger.record(sys.argv[2], "forgotten")
+        print(f"Forgot {sys.argv[2]}")
+        return
+    print("Usage: python topic_ledger.py [stats|show <job>|forget <job>]")
+
+
+if __name__ == "__main__":
+    main()
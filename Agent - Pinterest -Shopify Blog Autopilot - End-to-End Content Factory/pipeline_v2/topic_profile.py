@@ -0,0 +1,683 @@
+#!/usr/bin/env python3
+"""topic_profile.py — One memoized topic profile per article title.
+
+AIOrchestrator._normalize_topic, _extract_topic_terms and the module-level
+extract_real_subject are pure functions of the title, yet every fix loop
+re-ran their regex and stop-word passes many times per article (the
+_build_* sections, _pad_to_word_count, _ensure_topic_focus,
+_apply_meta_prompt_patch), and pre_publish_review / run_meta_fix_queue kept
+their own copies of the keyword logic.
+
+get_topic_profile(title) computes everything once:
+
+    subject     real subject behind a clickbait title
+    topic       short normalized topic phrase
+    terms       meaningful (compound) topic terms, category defaults if few
+    category    gardening / crafts / fermentation / cleaning / general
+    keywords    stop-word-filtered title words (pre_publish_review focus score)
+
+Profiles are kept in a bounded in-process LRU and in an on-disk table
+(topic_profiles.json) keyed by title; the table is dropped whenever this
+file changes, so rule edits never serve stale profiles.
+
+CLI:
+    python topic_profile.py "<title>"
+    python topic_profile.py stats
+"""
+
+from __future__ import annotations
+
+import atexit
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import NamedTuple
+
+PIPELINE_DIR = Path(__file__).parent
+TOPIC_PROFILE_FILE = Path(
+    os.environ.get("TOPIC_PROFILE_FILE", str(PIPELINE_DIR / "topic_profiles.json"))
+)
+TABLE_VERSION = 1
+MAX_TABLE_ENTRIES = int(os.environ.get("TOPIC_PROFILE_MAX_ENTRIES", "20000"))
+
+# Words ignored by the topic focus score (shared with pre_publish_review)
+FOCUS_STOPWORDS = {
+    "a",
+    "an",
+    "and",
+    "are",
+    "as",
+    "at",
+    "be",
+    "by",
+    "for",
+    "from",
+    "has",
+    "have",
+    "how",
+    "in",
+    "is",
+    "it",
+    "of",
+    "on",
+    "or",
+    "that",
+    "the",
+    "this",
+    "to",
+    "was",
+    "what",
+    "when",
+    "where",
+    "which",
+    "why",
+    "with",
+    "your",
+    "you",
+    "we",
+    "our",
+    "their",
+    "they",
+    "them",
+    "these",
+    "those",
+    "into",
+    "over",
+    "under",
+    "about",
+    "without",
+    "within",
+    "between",
+    "across",
+    "guide",
+    "tips",
+    "best",
+    "easy",
+}
+
+GARDENING_KEYWORDS = (
+    "grow",
+    "growing",
+    "garden",
+    "gardening",
+    "plant",
+    "container",
+    "containers",
+    "herb",
+    "basil",
+    "soil",
+    "potting",
+    "seed",
+    "seedling",
+)
+
+# category -> title keywords (first match wins; gardening checked first)
+CATEGORY_KEYWORDS = (
+    ("crafts", ("soap", "candle", "craft")),
+    ("fermentation", ("vinegar", "ferment", "preserve")),
+    ("cleaning", ("clean", "organize", "declutter", "drain")),
+)
+
+
+# ============================================================================
+# Pure title functions
+# ============================================================================
+def extract_real_subject(title: str) -> str:
+    """Extract the ACTUAL subject from a clickbait title.
+
+    Examples:
+        "Stop wasting $10 on store-bought green garlic — grow your own" → "green garlic"
+        "Want fresh salads all week? Layer 5 mason jars" → "mason jar salads"
+        "Stop wasting $10 on drain cleaners — learn how baking soda" → "baking soda and drain cleaning"
+        "How to grow microgreens indoors" → "microgreens"
+
+    Returns the noun phrase that represents the actual topic, not the clickbait prefix.
+    """
+    if not title:
+        return title
+
+    # Normalize: remove em-dash split, question marks
+    title = title.strip()
+
+    # Common clickbait prefixes to strip
+    clickbait_prefixes = [
+        r"^stop wasting \$?\d+ on (?:store[- ]?bought\s+)?",
+        r"^want (?:to )?.+\?\s*",
+        r"^how to ",
+        r"^learn how (?:to )?",
+        r"^discover how (?:to )?",
+        r"^the secret (?:of|to) ",
+        r"^unlock (?:the )?(?:power of |secret of )?",
+        r"^save \$?\d+ (?:on|by) ",
+        r"^never buy .+ again[—:]\s*",
+        r"^\d+ (?:ways?|tips?|tricks?) (?:to |for )",
+    ]
+
+    subject = title.lower()
+
+    # Strip clickbait prefix
+    for pattern in clickbait_prefixes:
+        subject = re.sub(pattern, "", subject, flags=re.IGNORECASE)
+
+    # Split on — and take the part with the real subject (usually contains action verb)
+    if "—" in subject or "–" in subject:
+        parts = re.split(r"[—–]", subject)
+        # First part usually has the subject
+        subject = parts[0].strip()
+
+    # Remove trailing action phrases
+    subject = re.sub(
+        r"\s*(?:in (?:just )?\d+ (?:days?|hours?|minutes?|weeks?)|using .+)$",
+        "",
+        subject,
+        flags=re.IGNORECASE,
+    )
+
+    # Clean up
+    subject = re.sub(r"[!?.,]+$", "", subject).strip()
+
+    # Extract main noun phrases (simple heuristic)
+    # Look for pattern: adjective + noun or just nouns
+    words = subject.split()
+    if len(words) > 5:
+        # Take last 2-4 significant words (likely the noun phrase)
+        stopwords = {
+            "a",
+            "an",
+            "the",
+            "in",
+            "on",
+            "your",
+            "my",
+            "is",
+            "are",
+            "for",
+            "with",
+            "how",
+            "why",
+            "what",
+        }
+        significant = [w for w in words if w.lower() not in stopwords]
+        if len(significant) >= 2:
+            subject = " ".join(significant[-3:])  # Last 3 significant words
+
+    # Capitalize for display
+    if subject:
+        subject = subject.strip()
+        # Title case but keep common lowercase words
+        subject = " ".join(
+            (
+                w.capitalize()
+                if w.lower()
+                not in {"and", "or", "the", "a", "an", "in", "on", "with", "for"}
+                else w.lower()
+            )
+            for w in subject.split()
+        )
+
+    return subject or title[:50]  # Fallback to truncated original
+
+
+def normalize_topic(title: str) -> str:
+    """Convert long title to SHORT, natural topic phrase.
+
+    Examples:
+    - "3 Actionable Ways to Use Bay Leaves in Your Garden" -> "using bay leaves"
+    - "How to Make Apple Cider Vinegar at Home" -> "making apple cider vinegar"
+    - "Complete Guide to Organic Gardening" -> "organic gardening"
+    """
+    # Clean special characters first
+    cleaned = re.sub(r"\s+", " ", re.sub(r"[^A-Za-z0-9\s\-]", " ", title))
+    cleaned = cleaned.strip().lower()
+
+    if not cleaned:
+        return "this topic"
+
+    # Remove common title prefixes (numbers, action words, etc.)
+    prefixes_to_remove = [
+        r"^\d+\s*(actionable\s*)?(easy\s*)?(simple\s*)?(best\s*)?(proven\s*)?(ways?|steps?|tips?|tricks?|methods?|ideas?|reasons?)\s*(to\s*)?",
+        r"^(how\s+to\s+)?(make|use|create|build|grow|start|do|get)\s+",
+        r"^(complete|ultimate|essential|definitive|best|perfect|amazing)\s+(guide|tutorial|tips?)\s*(to|for|on)?\s*",
+        r"^(diy|homemade|natural|organic|simple|easy)\s+",
+        r"^(a|an|the)\s+",
+    ]
+
+    for pattern in prefixes_to_remove:
+        cleaned = re.sub(pattern, "", cleaned, flags=re.IGNORECASE)
+
+    # Remove common suffixes
+    suffixes_to_remove = [
+        r"\s+(at\s+home|for\s+beginners?|step\s+by\s+step|from\s+scratch)$",
+        r"\s+(guide|tutorial|tips?|ideas?|recipe)$",
+        r"\s+in\s+(your\s+)?(home|house|kitchen|garden|yard|backyard)$",
+    ]
+
+    for pattern in suffixes_to_remove:
+        cleaned = re.sub(pattern, "", cleaned, flags=re.IGNORECASE)
+
+    # Clean up extra whitespace
+    cleaned = re.sub(r"\s+", " ", cleaned).strip()
+
+    # If still too long (>40 chars), take first meaningful part
+    if len(cleaned) > 40:
+        # Try to find key noun phrase (usually the real topic)
+        words = cleaned.split()
+        # Take up to 4 words or until we hit a preposition
+        result_words = []
+        prepositions = {
+            "in",
+            "on",
+            "at",
+            "for",
+            "with",
+            "without",
+            "from",
+            "to",
+            "of",
+        }
+        for i, word in enumerate(words[:6]):
+            if word in prepositions and i > 1:
+                break
+            result_words.append(word)
+        cleaned = " ".join(result_words[:4])
+
+    # Ensure we have something meaningful
+    if len(cleaned) < 3:
+        # Fallback: extract nouns from original title
+        nouns = re.findall(r"\b[A-Za-z]{4,}\b", title.lower())
+        stopwords = {
+            "ways",
+            "tips",
+            "ideas",
+            "guide",
+            "make",
+            "home",
+            "easy",
+            "best",
+            "your",
+            "actionable",
+        }
+        nouns = [n for n in nouns if n not in stopwords]
+        cleaned = " ".join(nouns[:3]) if nouns else "this topic"
+
+    return cleaned
+
+
+def extract_topic_terms(title: str) -> list[str]:
+    """Extract meaningful topic terms from title - NOT individual words.
+
+    This method looks for COMPOUND TERMS (e.g., "bay leaves", "aloe vera")
+    and common gardening/DIY terms, avoiding generic words like 'actionable',
+    'ways', 'use', etc.
+    """
+    # Comprehensive stopwords - includes ALL generic/meaningless words
+    stopwords = {
+        # Articles and prepositions
+        "the",
+        "a",
+        "an",
+        "and",
+        "or",
+        "for",
+        "to",
+        "of",
+        "in",
+        "on",
+        "with",
+        "without",
+        "by",
+        "at",
+        "from",
+        "into",
+        "through",
+        "during",
+        "before",
+        "after",
+        "above",
+        "below",
+        "between",
+        "under",
+        "over",
+        # Common title words (NOT topic-specific)
+        "how",
+        "make",
+        "making",
+        "diy",
+        "guide",
+        "tips",
+        "easy",
+        "best",
+        "recipe",
+        "ideas",
+        "home",
+        "natural",
+        "safe",
+        "simple",
+        "quick",
+        "complete",
+        "ultimate",
+        "essential",
+        "perfect",
+        "amazing",
+        "great",
+        # Generic action words that should NEVER be Key Terms
+        "actionable",
+        "ways",
+        "use",
+        "using",
+        "uses",
+        "used",
+        "steps",
+        "methods",
+        "techniques",
+        "things",
+        "reasons",
+        "benefits",
+        "types",
+        "kinds",
+        "top",
+        "must",
+        "can",
+        "will",
+        "should",
+        "could",
+        "would",
+        # Possessives and pronouns
+        "your",
+        "you",
+        "my",
+        "our",
+        "their",
+        "its",
+        "his",
+        "her",
+        "own",
+        # Numbers as words
+        "one",
+        "two",
+        "three",
+        "four",
+        "five",
+        "six",
+        "seven",
+        "eight",
+        "nine",
+        "ten",
+        "first",
+        "second",
+        "third",
+        # Time-related
+        "day",
+        "days",
+        "week",
+        "weeks",
+        "month",
+        "year",
+        "time",
+        "today",
+        # Generic nouns
+        "way",
+        "thing",
+        "stuff",
+        "item",
+        "items",
+        "people",
+        "person",
+    }
+
+    # Known compound terms to extract as single units
+    compound_terms = {
+        # Plants
+        "bay leaves": "aromatic leaves from Laurus nobilis used for cooking and pest control",
+        "aloe vera": "succulent plant with gel containing 75+ active compounds for skin healing",
+        "apple cider": "fermented apple juice base for making vinegar with 5-6% acidity",
+        "apple cider vinegar": "vinegar made from apple cider with 5-6% acetic acid",
+        "baking soda": "sodium bicarbonate (NaHCO3) used for cleaning and deodorizing",
+        "essential oils": "concentrated plant extracts with therapeutic properties",
+        "olive oil": "oil pressed from olives with smoke point of 375-405°F",
+        "coconut oil": "oil from coconut meat with melting point of 76°F",
+        "lemon juice": "citrus juice with pH 2.0-2.6, natural cleaning agent",
+        "tea tree": "Melaleuca alternifolia oil with antibacterial properties",
+        "lavender oil": "calming essential oil from Lavandula flowers",
+        "peppermint oil": "cooling essential oil with menthol content 35-45%",
+        "castor oil": "vegetable oil from Ricinus communis for soap making",
+        # Gardening
+        "companion planting": "strategic plant placement for mutual pest control and growth benefits",
+        "natural pesticides": "pest control solutions derived from plants, minerals, or biological agents",
+        "organic gardening": "growing method without synthetic chemicals, using compost and natural pest control",
+        "pest control": "methods to prevent or eliminate garden pests using barriers, traps, or repellents",
+        "soil health": "balanced ecosystem with beneficial microbes, proper pH 6.0-7.0, and organic matter",
+        "raised beds": "elevated planting areas 6-12 inches high with improved drainage",
+        "crop rotation": "changing plant locations yearly to prevent disease and nutrient depletion",
+        # DIY/Home
+        "cold process": "soap making method mixing oils and lye at room temperature",
+        "hot process": "soap making method using heat to accelerate saponification",
+        "melt and pour": "pre-made soap base melted and customized with additives",
+        "natural dye": "colorant derived from plants, minerals, or insects",
+        "fermented foods": "preserved foods using beneficial bacteria or yeast",
+    }
+
+    title_lower = title.lower()
+    found_terms = []
+
+    # First, look for compound terms
+    for compound, definition in compound_terms.items():
+        if compound in title_lower and compound not in found_terms:
+            found_terms.append(compound)
+
+    # If we found compound terms, add related individual nouns
+    # but NOT the words already in compound terms
+    compound_words = set()
+    for compound in found_terms:
+        compound_words.update(compound.split())
+
+    # Extract remaining meaningful words (nouns only, 4+ letters)
+    words = re.findall(r"[A-Za-z]+", title_lower)
+    for word in words:
+        if len(word) < 4:  # Skip short words
+            continue
+        if word in stopwords:
+            continue
+        if word in compound_words:  # Already in a compound
+            continue
+        if word not in found_terms:
+            found_terms.append(word)
+
+    # If no terms found, use topic-category defaults
+    if len(found_terms) < 2:
+        # Detect category and add relevant defaults
+        if any(w in title_lower for w in ["garden", "plant", "grow", "soil", "seed"]):
+            found_terms = [
+                "soil preparation",
+                "watering schedule",
+                "sunlight requirements",
+            ]
+        elif any(w in title_lower for w in ["soap", "candle", "craft"]):
+            found_terms = ["materials", "curing time", "safety precautions"]
+        elif any(w in title_lower for w in ["vinegar", "ferment", "preserve"]):
+            found_terms = ["fermentation", "acidity level", "storage conditions"]
+        elif any(w in title_lower for w in ["clean", "organize", "declutter"]):
+            found_terms = [
+                "cleaning solution",
+                "organization system",
+                "maintenance routine",
+            ]
+        else:
+            found_terms = [
+                "preparation steps",
+                "required materials",
+                "expected results",
+            ]
+
+    return found_terms[:6]
+
+
+def is_gardening_topic(title: str) -> bool:
+    t = title.lower()
+    return any(kw in t for kw in GARDENING_KEYWORDS)
+
+
+def topic_category(title: str) -> str:
+    if is_gardening_topic(title):
+        return "gardening"
+    t = title.lower()
+    for category, keywords in CATEGORY_KEYWORDS:
+        if any(kw in t for kw in keywords):
+            return category
+    return "general"
+
+
+def focus_keywords(title: str) -> list[str]:
+    """Title words checked by the topic focus score (max 8, in order)."""
+    words = [
+        w
+        for w in re.findall(r"[a-zA-Z]{3,}", title.lower())
+        if w not in FOCUS_STOPWORDS
+    ]
+    return list(dict.fromkeys(words))[:8]
+
+
+# ============================================================================
+# Profile + caches
+# ============================================================================
+class TopicProfile(NamedTuple):
+    title: str
+    subject: str
+    topic: str
+    terms: tuple
+    category: str
+    keywords: tuple
+
+    @property
+    def gardening(self) -> bool:
+        return self.category == "gardening"
+
+
+def build_topic_profile(title: str) -> TopicProfile:
+    """Uncached profile computation."""
+    return TopicProfile(
+        title=title,
+        subject=extract_real_subject(title),
+        topic=normalize_topic(title),
+        terms=tuple(extract_topic_terms(title)),
+        category=topic_category(title),
+        keywords=tuple(focus_keywords(title)),
+    )
+
+
+def _rules_hash() -> str:
+    try:
+        return hashlib.sha1(Path(__file__).read_bytes()).hexdigest()[:16]
+    except OSError:
+        return ""
+
+
+class TopicProfileTable:
+    """On-disk title -> profile table, invalidated when the rules change."""
+
+    def __init__(self, path: Path = TOPIC_PROFILE_FILE):
+        self.path = Path(path)
+        self.rules = _rules_hash()
+        self.rows: dict[str, list] = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._load()
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        try:
+            payload = json.loads(self.path.read_text(encoding="utf-8"))
+        except (json.JSONDecodeError, OSError):
+            return
+        if (
+            payload.get("version") != TABLE_VERSION
+            or payload.get("rules") != self.rules
+        ):
+            return
+        self.rows = payload.get("profiles", {}) or {}
+
+    def get(self, title: str) -> TopicProfile | None:
+        row = self.rows.get(title)
+        if row is None:
+            return None
+        subject, topic, terms, category, keywords = row
+        return TopicProfile(
+            title, subject, topic, tuple(terms), category, tuple(keywords)
+        )
+
+    def put(self, profile: TopicProfile) -> None:
+        with self._lock:
+            if len(self.rows) >= MAX_TABLE_ENTRIES:
+                self.rows.pop(next(iter(self.rows)))
+            self.rows[profile.title] = [
+                profile.subject,
+                profile.topic,
+                list(profile.terms),
+                profile.category,
+                list(profile.keywords),
+            ]
+            self._dirty = True
+
+    def save(self) -> None:
+        with self._lock:
+            if not self._dirty:
+                return
+            payload = {
+                "version": TABLE_VERSION,
+                "rules": self.rules,
+                "profiles": dict(self.rows),
+            }
+            self._dirty = False
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        try:
+            tmp_path.write_text(
+                json.dumps(payload, ensure_ascii=False), encoding="utf-8"
+            )
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"⚠️ topic profile table save failed: {e}")
+
+
+_shared_table: TopicProfileTable | None = None
+
+
+def get_profile_table() -> TopicProfileTable:
+    """Process-wide profile table (loaded once, saved at exit)."""
+    global _shared_table
+    if _shared_table is None:
+        _shared_table = TopicProfileTable()
+        atexit.register(_shared_table.save)
+    return _shared_table
+
+
+@lru_cache(maxsize=1024)
+def get_topic_profile(title: str) -> TopicProfile:
+    """Memoized profile: in-process LRU, then the disk table, then compute."""
+    title = title or ""
+    table = get_profile_table()
+    profile = table.get(title)
+    if profile is None:
+        profile = build_topic_profile(title)
+        table.put(profile)
+    return profile
+
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] == "stats":
+        table = get_profile_table()
+        print(f"Profile table: {table.path}")
+        print(f"Profiles: {len(table.rows)}")
+        return
+    profile = get_topic_profile(sys.argv[1])
+    for field, value in profile._asdict().items():
+        print(f"{field:>9}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,11 @@ Runs autonomously with retry logic - can run while you sleep!
 
 Usage: python batch_autopublish.py [start_index]
 Example: python batch_autopublish.py 19  # Start from topic 19
+
+Progress is kept in the topic ledger (pipeline_v2/topic_ledger.py): a
+restarted batch skips topics already published and reconciles any topic
+that crashed mid-publish before retrying it. Image search for the next
+topics runs in the background while the current topic publishes.
 """
 
 import requests
@@ -12,20 +17,32 @@ import time
 import re
 import os
 import sys
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from urllib.parse import quote
+
+sys.path.append(str(Path(__file__).parent.parent / "pipeline_v2"))
+from article_handles import stable_handle, upsert_article
+from http_pool import next_page_url
+from image_search import get_image_search
+from topic_dedup import get_topic_dedup_index
+from topic_ledger import get_topic_ledger, job_key
 
 # ============== CONFIGURATION ==============
 SHOPIFY_STORE = "the-rike-inc.myshopify.com"
-SHOPIFY_TOKEN = "os.environ.get("SHOPIFY_ACCESS_TOKEN", "")"
+SHOPIFY_TOKEN = os.environ.get("SHOPIFY_ACCESS_TOKEN", "")
 API_VERSION = "2025-01"
 BLOG_ID = "108441862462"
-PEXELS_API_KEY = "os.environ.get("PEXELS_API_KEY", "")"
+PEXELS_API_KEY = os.environ.get("PEXELS_API_KEY", "")
 AUTHOR = "The Rike"
 
 # Retry settings
 MAX_RETRIES = 3
 RETRY_DELAY = 30  # seconds
 DELAY_BETWEEN_ARTICLES = 10  # seconds between articles
+# Topics whose image search runs ahead of the one being published
+PREFETCH_DEPTH = int(os.environ.get("BATCH_PREFETCH_DEPTH", "2"))
 
 # ============== TOPICS LIST ==============
 # Topics 19-70 (remaining 52 topics)
@@ -1061,6 +1078,111 @@ TOPICS = [
 ]
 
 
+# ============== TOPIC DEDUP ==============
+def fetch_articles_since(updated_at_min=""):
+    """All blog articles (drafts included), optionally only those changed since"""
+    headers = {"X-Shopify-Access-Token": SHOPIFY_TOKEN}
+    url = f"https://{SHOPIFY_STORE}/admin/api/{API_VERSION}/blogs/{BLOG_ID}/articles.json?limit=250&fields=id,title,handle,body_html"
+    if updated_at_min:
+        url += f"&updated_at_min={quote(updated_at_min)}"
+
+    articles = []
+    while url:
+        response = requests.get(url, headers=headers, timeout=60)
+        if response.status_code != 200:
+            print(f"  ⚠️ Article fetch failed: {response.status_code}")
+            break
+        articles.extend(response.json().get("articles", []))
+        url = next_page_url(response.headers.get("Link", ""))
+    return articles
+
+
+def fetch_article_ids():
+    """Ids of all blog articles (drafts included); None if a page failed"""
+    headers = {"X-Shopify-Access-Token": SHOPIFY_TOKEN}
+    url = f"https://{SHOPIFY_STORE}/admin/api/{API_VERSION}/blogs/{BLOG_ID}/articles.json?limit=250&fields=id"
+
+    ids = set()
+    while url:
+        try:
+            response = requests.get(url, headers=headers, timeout=60)
+        except requests.exceptions.RequestException as e:
+            print(f"  ⚠️ Article id fetch failed: {e}")
+            return None
+        if response.status_code != 200:
+            print(f"  ⚠️ Article id fetch failed: {response.status_code}")
+            return None
+        ids.update(str(a["id"]) for a in response.json().get("articles", []))
+        url = next_page_url(response.headers.get("Link", ""))
+    return ids
+
+
+def filter_duplicate_topics(topics, log_file):
+    """Drop topics the blog (or an earlier topic in this batch) already covers"""
+    index = get_topic_dedup_index()
+    if index is None:
+        return topics
+
+    added = index.sync(fetch_articles_since, fetch_article_ids)
+    print(f"🧬 Topic dedup index: {len(index.docs)} articles (+{added} synced)")
+
+    kept = []
+    for topic in topics:
+        dup = index.find_duplicate(topic["title"])
+        if dup:
+            print(
+                f"  ⏭️ Topic {topic['id']} '{topic['title']}' duplicates "
+                f"'{dup['title']}' ({dup['match']} {dup['score']:.2f}) - skipped"
+            )
+            log_entry = f"{datetime.now().isoformat()} | SKIPPED | Topic {topic['id']} | {topic['title']} | Duplicate of ID: {dup['id']} ({dup['title']})\n"
+            with open(log_file, "a", encoding="utf-8") as f:
+                f.write(log_entry)
+            continue
+        index.reserve(topic["title"], key=str(topic["id"]))
+        kept.append(topic)
+    return kept
+
+
+def reconcile_in_flight(ledger, log_file):
+    """Resolve topics that crashed between the create request and the ledger
+
+    A job left in "publishing" may already exist on Shopify. Look for it
+    (one fetch of articles changed since the oldest such job) and mark it
+    published, so the retry does not create a duplicate.
+    """
+    in_flight = ledger.in_flight()
+    if not in_flight:
+        return 0
+
+    # Ledger lines written before ts was UTC are naive local time
+    since = min(
+        datetime.fromisoformat(job["ts"]).astimezone(timezone.utc)
+        for job in in_flight.values()
+    ).isoformat()
+    by_title = {}
+    for article in fetch_articles_since(since):
+        by_title.setdefault(article["title"].strip().lower(), article)
+
+    recovered = 0
+    for key, job in in_flight.items():
+        article = by_title.get(job.get("title", "").strip().lower())
+        if not article:
+            continue
+        ledger.record(
+            key,
+            "published",
+            article_id=article["id"],
+            handle=article["handle"],
+            recovered=True,
+        )
+        log_entry = f"{datetime.now().isoformat()} | RECOVERED | Topic {job.get('topic_id')} | {job.get('title')} | ID: {article['id']}\n"
+        with open(log_file, "a", encoding="utf-8") as f:
+            f.write(log_entry)
+        recovered += 1
+    print(f"🧾 Reconciled {recovered}/{len(in_flight)} in-flight topics")
+    return recovered
+
+
 # ============== CONTENT TEMPLATES ==============
 def generate_article_content(topic):
     """Generate article HTML content based on topic"""
@@ -1195,44 +1317,31 @@ def generate_article_content(topic):
 
 
 def generate_handle(title):
-    """Generate URL handle from title with timestamp to avoid duplicates"""
-    import random
-
-    handle = title.lower()
-    handle = re.sub(r"[^a-z0-9\s-]", "", handle)
-    handle = re.sub(r"\s+", "-", handle)
-    handle = re.sub(r"-+", "-", handle)
-    handle = handle.strip("-")
-    # Add random suffix to avoid duplicates
-    suffix = random.randint(1000, 9999)
-    return f"{handle}-{suffix}"
+    """Generate URL handle from title (deterministic, so retries reuse it)"""
+    return stable_handle(title)
 
 
 # ============== API FUNCTIONS ==============
 def search_pexels_images(queries, count=5):
-    """Search Pexels for images"""
-    headers = {"Authorization": PEXELS_API_KEY}
+    """Search Pexels for images (all queries at once, cached by query)"""
+    results = get_image_search().search(
+        queries, per_page=5, providers=("pexels",), api_keys={"pexels": PEXELS_API_KEY}
+    )
     all_images = []
     seen_ids = set()
 
     for query in queries:
-        try:
-            url = f"https://api.pexels.com/v1/search?query={query}&per_page=5"
-            response = requests.get(url, headers=headers, timeout=30)
-            if response.status_code == 200:
-                for photo in response.json().get("photos", []):
-                    if photo["id"] not in seen_ids:
-                        seen_ids.add(photo["id"])
-                        all_images.append(
-                            {
-                                "id": photo["id"],
-                                "url": photo["src"]["large"],
-                                "alt": photo.get("alt", ""),
-                                "photographer": photo["photographer"],
-                            }
-                        )
-        except Exception as e:
-            print(f"    ⚠️ Pexels search error for '{query}': {e}")
+        for photo in results.get(query, []):
+            if photo["id"] not in seen_ids:
+                seen_ids.add(photo["id"])
+                all_images.append(
+                    {
+                        "id": photo["id"],
+                        "url": photo["url"],
+                        "alt": photo.get("alt", ""),
+                        "photographer": photo["photographer"],
+                    }
+                )
 
     return all_images[:count]
 
@@ -1282,23 +1391,21 @@ def publish_article(topic, images):
         }
     }
 
-    url = (
-        f"https://{SHOPIFY_STORE}/admin/api/{API_VERSION}/blogs/{BLOG_ID}/articles.json"
+    # Create, or update the article an earlier attempt already created
+    article, created = upsert_article(
+        f"https://{SHOPIFY_STORE}/admin/api/{API_VERSION}",
+        BLOG_ID,
+        article_data["article"],
+        headers,
     )
-    response = requests.post(url, headers=headers, json=article_data, timeout=60)
+    if not created:
+        print(f"  ♻️ Handle already published - updated article {article['id']}")
+    article_id = article["id"]
 
-    if response.status_code == 201:
-        article = response.json()["article"]
-        article_id = article["id"]
+    # Set SEO metafields
+    set_seo_metafields(article_id, topic)
 
-        # Set SEO metafields
-        set_seo_metafields(article_id, topic)
-
-        return article_id, article["handle"]
-    else:
-        raise Exception(
-            f"Failed to create article: {response.status_code} - {response.text}"
-        )
+    return article_id, article["handle"]
 
 
 def set_seo_metafields(article_id, topic):
@@ -1328,36 +1435,76 @@ def set_seo_metafields(article_id, topic):
         requests.post(url, headers=headers, json={"metafield": mf}, timeout=30)
 
 
-def process_topic(topic, log_file):
-    """Process a single topic with retry logic"""
+DEFAULT_IMAGES = [
+    {
+        "id": 0,
+        "url": "https://images.pexels.com/photos/1072824/pexels-photo-1072824.jpeg",
+        "alt": "Sustainable living",
+        "photographer": "Pexels",
+    }
+]
+
+
+def fetch_topic_images(topic, ledger):
+    """Image search stage; the result is kept in the ledger for retries"""
+    key = job_key(topic)
+    job = ledger.get(key)
+    if job.get("images"):
+        return job["images"]
+    images = search_pexels_images(topic["queries"])
+    if images:
+        ledger.record(
+            key, "images", topic_id=topic["id"], title=topic["title"], images=images
+        )
+    return images
+
+
+def process_topic(topic, log_file, ledger=None, images_future=None):
+    """Process a single topic with retry logic
+
+    ``images_future`` is the topic's image search already running in the
+    background (see run_batch); it is only used for the first attempt.
+    """
     topic_id = topic["id"]
     title = topic["title"]
+    ledger = ledger or get_topic_ledger()
+    key = job_key(topic)
 
     print(f"\n{'='*60}")
     print(f"📝 Topic {topic_id}: {title}")
     print(f"{'='*60}")
 
+    job = ledger.get(key)
+    if job.get("status") == "published":
+        print(f"  ⏭️ Already published (ID: {job['article_id']}) - skipped")
+        return True, job["article_id"]
+
     for attempt in range(1, MAX_RETRIES + 1):
         try:
             # Step 1: Search for images
             print(f"  🔍 Searching for images (attempt {attempt}/{MAX_RETRIES})...")
-            images = search_pexels_images(topic["queries"])
+            if images_future is not None:
+                future, images_future = images_future, None
+                images = future.result()
+            else:
+                images = fetch_topic_images(topic, ledger)
             print(f"  ✅ Found {len(images)} images")
 
             if not images:
                 print(f"  ⚠️ No images found, using default...")
-                images = [
-                    {
-                        "id": 0,
-                        "url": "https://images.pexels.com/photos/1072824/pexels-photo-1072824.jpeg",
-                        "alt": "Sustainable living",
-                        "photographer": "Pexels",
-                    }
-                ]
+                images = DEFAULT_IMAGES
 
-            # Step 2: Publish article
+            # Step 2: Publish article (ledger first, so a crash here is
+            # reconciled on restart instead of publishing twice)
             print(f"  📤 Publishing article...")
+            ledger.record(key, "publishing", topic_id=topic_id, title=title)
             article_id, handle = publish_article(topic, images)
+            ledger.record(key, "published", article_id=article_id, handle=handle)
+
+            index = get_topic_dedup_index()
+            if index is not None:
+                index.upsert([{"id": article_id, "title": title, "handle": handle}])
+                index.save()
 
             # Success!
             article_url = f"https://{SHOPIFY_STORE}/blogs/sustainable-living/{handle}"
@@ -1379,6 +1526,7 @@ def process_topic(topic, log_file):
                 time.sleep(RETRY_DELAY)
             else:
                 # Log failure
+                ledger.record(key, "failed", error=str(e)[:500])
                 log_entry = f"{datetime.now().isoformat()} | FAILED | Topic {topic_id} | {title} | Error: {str(e)}\n"
                 with open(log_file, "a", encoding="utf-8") as f:
                     f.write(log_entry)
@@ -1387,6 +1535,43 @@ def process_topic(topic, log_file):
     return False, None
 
 
+def run_batch(topics, log_file, ledger):
+    """Publish topics in order, with image search running PREFETCH_DEPTH ahead
+
+    Publishing stays sequential (Shopify rate limits, log order); only the
+    pause between articles is shortened by whatever time the publish
+    itself took.
+    """
+    success_count = 0
+    fail_count = 0
+    last_publish = 0.0
+
+    with ThreadPoolExecutor(max_workers=max(1, PREFETCH_DEPTH)) as pool:
+        futures = {}
+        for i, topic in enumerate(topics):
+            for ahead in range(i, min(len(topics), i + PREFETCH_DEPTH + 1)):
+                if ahead not in futures:
+                    futures[ahead] = pool.submit(
+                        fetch_topic_images, topics[ahead], ledger
+                    )
+
+            wait = DELAY_BETWEEN_ARTICLES - (time.time() - last_publish)
+            if i and wait > 0:
+                print(f"\n⏳ Waiting {wait:.0f}s before next article...")
+                time.sleep(wait)
+
+            last_publish = time.time()
+            success, article_id = process_topic(
+                topic, log_file, ledger, images_future=futures.pop(i)
+            )
+            if success:
+                success_count += 1
+            else:
+                fail_count += 1
+
+    return success_count, fail_count
+
+
 # ============== MAIN FUNCTION ==============
 def main():
     # Parse start index from command line
@@ -1410,10 +1595,20 @@ def main():
     print(f"Log File: {log_file}")
     print(f"Retry Attempts: {MAX_RETRIES}")
     print(f"Delay Between Articles: {DELAY_BETWEEN_ARTICLES}s")
+    print(f"Image Prefetch Depth: {PREFETCH_DEPTH}")
     print("=" * 60)
 
-    # Filter topics by start index
+    # Filter topics by start index, then drop what earlier runs published
     topics_to_process = [t for t in TOPICS if t["id"] >= start_index]
+    ledger = get_topic_ledger()
+    reconcile_in_flight(ledger, log_file)
+    done = [t for t in topics_to_process if ledger.is_published(t)]
+    if done:
+        print(f"⏭️ {len(done)} topics already published (ledger) - resuming after them")
+    topics_to_process = [t for t in topics_to_process if not ledger.is_published(t)]
+
+    # Skip near-duplicates of existing articles before any generation work
+    topics_to_process = filter_duplicate_topics(topics_to_process, log_file)
 
     if not topics_to_process:
         print("❌ No topics to process!")
@@ -1421,23 +1616,7 @@ def main():
 
     print(f"\n📋 Processing {len(topics_to_process)} topics...")
 
-    # Initialize counters
-    success_count = 0
-    fail_count = 0
-
-    # Process each topic
-    for i, topic in enumerate(topics_to_process):
-        success, article_id = process_topic(topic, log_file)
-
-        if success:
-            success_count += 1
-        else:
-            fail_count += 1
-
-        # Delay between articles (except for last one)
-        if i < len(topics_to_process) - 1:
-            print(f"\n⏳ Waiting {DELAY_BETWEEN_ARTICLES}s before next article...")
-            time.sleep(DELAY_BETWEEN_ARTICLES)
+    success_count, fail_count = run_batch(topics_to_process, log_file, ledger)
 
     # Final summary
     print("\n" + "=" * 60)
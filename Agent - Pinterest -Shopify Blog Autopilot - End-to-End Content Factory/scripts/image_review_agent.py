@@ -15,7 +15,7 @@ Usage:
     python scripts/image_review_agent.py
 
 Requires:
-    pip install requests pillow
+    pip install requests
 """
 
 import json
@@ -28,20 +28,14 @@ from typing import Optional
 from dataclasses import dataclass, asdict
 from datetime import datetime
 
-try:
-    import requests
-    from PIL import Image
-    from io import BytesIO
-except ImportError:
-    print("Installing required packages...")
-    os.system("pip install requests pillow")
-    import requests
-    from PIL import Image
-    from io import BytesIO
-
 # Paths
 SCRIPT_DIR = Path(__file__).parent
 ROOT_DIR = SCRIPT_DIR.parent
+
+sys.path.append(str(ROOT_DIR / "pipeline_v2"))
+from image_probe import get_image_prober
+from image_relevance import get_relevance_scorer
+from image_search import get_image_search
 CONTENT_DIR = ROOT_DIR / "content"
 CONFIG_PATH = ROOT_DIR / "SHOPIFY_PUBLISH_CONFIG.json"
 IMAGE_PLAN_PATH = CONTENT_DIR / "image_plan.json"
@@ -179,171 +173,40 @@ def generate_search_queries(concepts: dict) -> list:
 
 
 def search_pexels(query: str, per_page: int = 5) -> list:
-    """Search Pexels for images."""
-    if not PEXELS_API_KEY:
-        return []
-
-    url = "https://api.pexels.com/v1/search"
-    headers = {"Authorization": PEXELS_API_KEY}
-    params = {"query": query, "per_page": per_page, "orientation": "landscape"}
-
-    try:
-        resp = requests.get(url, headers=headers, params=params, timeout=10)
-        if resp.status_code == 200:
-            data = resp.json()
-            results = []
-            for photo in data.get("photos", []):
-                results.append(
-                    {
-                        "url": photo["src"]["large"],
-                        "thumb": photo["src"]["medium"],
-                        "source": "pexels",
-                        "photographer": photo.get("photographer", "Unknown"),
-                        "alt": photo.get("alt", query),
-                        "width": photo["width"],
-                        "height": photo["height"],
-                        "page_url": photo["url"],
-                    }
-                )
-            return results
-    except Exception as e:
-        print(f"Pexels error: {e}")
-    return []
+    """Search Pexels for images (cached, see pipeline_v2/image_search.py)."""
+    return get_image_search().provider_search(
+        "pexels", query, per_page, api_key=PEXELS_API_KEY
+    )
 
 
 def search_pixabay(query: str, per_page: int = 5) -> list:
-    """Search Pixabay for images."""
-    if not PIXABAY_API_KEY:
-        return []
-
-    url = "https://pixabay.com/api/"
-    params = {
-        "key": PIXABAY_API_KEY,
-        "q": query,
-        "per_page": per_page,
-        "image_type": "photo",
-        "orientation": "horizontal",
-        "safesearch": "true",
-    }
-
-    try:
-        resp = requests.get(url, params=params, timeout=10)
-        if resp.status_code == 200:
-            data = resp.json()
-            results = []
-            for hit in data.get("hits", []):
-                results.append(
-                    {
-                        "url": hit["largeImageURL"],
-                        "thumb": hit["webformatURL"],
-                        "source": "pixabay",
-                        "photographer": hit.get("user", "Unknown"),
-                        "alt": query,
-                        "width": hit["imageWidth"],
-                        "height": hit["imageHeight"],
-                        "page_url": hit["pageURL"],
-                    }
-                )
-            return results
-    except Exception as e:
-        print(f"Pixabay error: {e}")
-    return []
+    """Search Pixabay for images (cached, see pipeline_v2/image_search.py)."""
+    return get_image_search().provider_search(
+        "pixabay", query, per_page, api_key=PIXABAY_API_KEY
+    )
 
 
 def search_unsplash(query: str, per_page: int = 5) -> list:
-    """Search Unsplash for images."""
-    if not UNSPLASH_ACCESS_KEY:
-        return []
-
-    url = "https://api.unsplash.com/search/photos"
-    headers = {"Authorization": f"Client-ID {UNSPLASH_ACCESS_KEY}"}
-    params = {"query": query, "per_page": per_page, "orientation": "landscape"}
-
-    try:
-        resp = requests.get(url, headers=headers, params=params, timeout=10)
-        if resp.status_code == 200:
-            data = resp.json()
-            results = []
-            for photo in data.get("results", []):
-                results.append(
-                    {
-                        "url": photo["urls"]["regular"],
-                        "thumb": photo["urls"]["small"],
-                        "source": "unsplash",
-                        "photographer": photo["user"]["name"],
-                        "alt": photo.get("alt_description", query),
-                        "width": photo["width"],
-                        "height": photo["height"],
-                        "page_url": photo["links"]["html"],
-                    }
-                )
-            return results
-    except Exception as e:
-        print(f"Unsplash error: {e}")
-    return []
+    """Search Unsplash for images (cached, see pipeline_v2/image_search.py)."""
+    return get_image_search().provider_search(
+        "unsplash", query, per_page, api_key=UNSPLASH_ACCESS_KEY
+    )
 
 
 def check_image_quality(image_url: str) -> dict:
-    """Download and analyze image for quality issues."""
-    result = {
-        "accessible": False,
-        "width": 0,
-        "height": 0,
-        "has_watermark_risk": False,
-        "quality_score": 0.0,
-        "format": "",
-        "file_size_kb": 0,
-    }
-
-    try:
-        resp = requests.get(image_url, timeout=15, stream=True)
-        if resp.status_code != 200:
-            return result
-
-        # Check file size
-        content_length = resp.headers.get("content-length", 0)
-        result["file_size_kb"] = int(content_length) / 1024 if content_length else 0
-
-        # Load image
-        img_data = BytesIO(resp.content)
-        img = Image.open(img_data)
-
-        result["accessible"] = True
-        result["width"] = img.width
-        result["height"] = img.height
-        result["format"] = img.format
-
-        # Quality score based on resolution
-        min_dimension = min(img.width, img.height)
-        if min_dimension >= 1200:
-            result["quality_score"] = 1.0
-        elif min_dimension >= 800:
-            result["quality_score"] = 0.8
-        elif min_dimension >= 600:
-            result["quality_score"] = 0.6
-        else:
-            result["quality_score"] = 0.4
-
-        # Check for potential watermark patterns
-        # Simple heuristic: check if corners have unusual patterns
-        # This is a basic check - real watermark detection would need ML
-        result["has_watermark_risk"] = False
-
-        # Check aspect ratio (blog images should be roughly 16:9 or 4:3)
-        aspect = img.width / img.height
-        if 1.2 <= aspect <= 2.0:
-            result["quality_score"] += 0.1
-
-        result["quality_score"] = min(1.0, result["quality_score"])
-
-    except Exception as e:
-        print(f"Image check error: {e}")
+    """Probe image format/dimensions from its first KB (memoized by URL)."""
+    return get_image_prober().probe(image_url)
 
-    return result
 
+def calculate_relevance_score(
+    image_alt: str, topic_keywords: list, similarity: Optional[float] = None
+) -> float:
+    """Calculate how relevant an image is to the topic.
 
-def calculate_relevance_score(image_alt: str, topic_keywords: list) -> float:
-    """Calculate how relevant an image is to the topic."""
+    Exact keyword hits set a floor; ``similarity`` (embedding cosine from
+    image_relevance) lifts near matches such as plurals and synonyms once
+    it clears the scorer backend's match threshold.
+    """
     if not image_alt:
         return 0.3  # Default low score
 
@@ -351,25 +214,50 @@ def calculate_relevance_score(image_alt: str, topic_keywords: list) -> float:
     matches = sum(1 for kw in topic_keywords if kw.lower() in alt_lower)
 
     if matches >= 3:
-        return 1.0
+        score = 1.0
     elif matches >= 2:
-        return 0.8
+        score = 0.8
     elif matches >= 1:
-        return 0.6
+        score = 0.6
     else:
-        return 0.3
+        score = 0.3
+
+    if similarity is not None:
+        score = max(score, get_relevance_scorer().relevance(similarity))
+    return score
+
+
+def relevance_topic_text(concepts: dict) -> str:
+    """Topic text the candidates are embedded against."""
+    return " ".join([concepts["topic"]] + list(concepts["main_keywords"]))
 
 
-def review_image(image_data: dict, concepts: dict) -> ImageCandidate:
-    """Review a single image candidate."""
+def candidate_text(image_data: dict) -> str:
+    """Alt text plus any caption/tags the provider returned."""
+    parts = [image_data.get(k) for k in ("alt", "caption", "tags")]
+    return " ".join(str(p) for p in parts if p)
+
+
+def review_image(
+    image_data: dict, concepts: dict, similarity: Optional[float] = None
+) -> ImageCandidate:
+    """Review a single image candidate.
+
+    ``similarity`` is the candidate's precomputed topic similarity; when
+    omitted it is scored here on its own.
+    """
     print(f"  Reviewing: {image_data['url'][:60]}...")
 
     # Check image quality
     quality = check_image_quality(image_data["url"])
 
     # Calculate relevance
+    if similarity is None and image_data.get("alt"):
+        similarity = get_relevance_scorer().score(
+            relevance_topic_text(concepts), [candidate_text(image_data)]
+        )[0]
     relevance = calculate_relevance_score(
-        image_data.get("alt", ""), concepts["main_keywords"]
+        image_data.get("alt", ""), concepts["main_keywords"], similarity
     )
 
     # Determine approval
@@ -450,20 +338,46 @@ def create_image_plan(article: dict) -> ImagePlan:
     # Collect all image candidates
     all_candidates = []
 
-    for i, query in enumerate(queries[:4]):  # Limit to 4 queries
-        print(f"\nSearching for: '{query}'")
+    # All queries x all configured providers in one concurrent burst
+    # (repeat runs are served from the image search cache)
+    search_queries = queries[:4]  # Limit to 4 queries
+    results_by_query = get_image_search().search(
+        search_queries,
+        per_page=3,
+        api_keys={
+            "pexels": PEXELS_API_KEY,
+            "pixabay": PIXABAY_API_KEY,
+            "unsplash": UNSPLASH_ACCESS_KEY,
+        },
+    )
 
-        # Search all sources
-        pexels_results = search_pexels(query, per_page=3)
-        pixabay_results = search_pixabay(query, per_page=3)
-        unsplash_results = search_unsplash(query, per_page=3)
+    # Probe every candidate's headers concurrently up front; review_image
+    # then reads the memoized verdicts
+    get_image_prober().probe_many(
+        [img["url"] for results in results_by_query.values() for img in results]
+    )
+
+    # Score every candidate against the topic in one batch (vectors cached)
+    flat = [img for results in results_by_query.values() for img in results]
+    similarities = dict(
+        zip(
+            (img["url"] for img in flat),
+            get_relevance_scorer().score(
+                relevance_topic_text(concepts), [candidate_text(img) for img in flat]
+            ),
+        )
+    )
 
-        all_results = pexels_results + pixabay_results + unsplash_results
+    for query in search_queries:
+        print(f"\nSearching for: '{query}'")
+        all_results = results_by_query.get(query, [])
         print(f"  Found {len(all_results)} images")
 
         # Review each image
         for img_data in all_results:
-            candidate = review_image(img_data, concepts)
+            candidate = review_image(
+                img_data, concepts, similarities.get(img_data["url"])
+            )
             candidate.alt_text = generate_alt_text(candidate, concepts)
             all_candidates.append(candidate)
 
@@ -21,13 +21,21 @@ Chạy: python meta_prompt_quality_agent.py [--article-id ID] [--topics] [--all]
 import requests
 import os
 import re
+import sys
 import json
 import argparse
+from collections import Counter
 from datetime import datetime
+from pathlib import Path
 from typing import Dict, List, Tuple, Optional
 from dataclasses import dataclass, field
 from enum import Enum
 
+sys.path.append(str(Path(__file__).parent.parent / "pipeline_v2"))
+import article_rules
+from article_rules import parse_html
+from audit_cache import get_audit_cache, rules_hash
+
 # ========== SHOPIFY CONFIG ==========
 SHOP = os.getenv("SHOPIFY_SHOP", "the-rike-inc.myshopify.com")
 TOKEN = os.getenv("SHOPIFY_ACCESS_TOKEN", "")
@@ -36,6 +44,13 @@ API_VERSION = os.getenv("SHOPIFY_API_VERSION", "2025-01")
 
 HEADERS = {"X-Shopify-Access-Token": TOKEN, "Content-Type": "application/json"}
 
+# ========== AUDIT CACHE ==========
+# Reports are cached by article content + rules hash; handle is included
+# because the report URL is built from it.
+AUDIT_CACHE_NAMESPACE = "meta_prompt_quality"
+AUDIT_CACHE_FIELDS = ("title", "body_html", "summary_html", "image", "handle")
+AUDIT_RULES_HASH = rules_hash(Path(__file__), article_rules.__file__)
+
 
 # ========== META-PROMPT STANDARDS ==========
 class MetaPromptStandard:
@@ -153,6 +168,45 @@ class QualityReport:
             self.score -= 3
         self.score = max(0, self.score)
 
+    def to_dict(self) -> dict:
+        return {
+            "article_id": self.article_id,
+            "title": self.title,
+            "url": self.url,
+            "score": self.score,
+            "metrics": self.metrics,
+            "issues": [
+                {
+                    "severity": i.severity.name,
+                    "category": i.category,
+                    "message": i.message,
+                    "suggestion": i.suggestion,
+                    "meta_prompt_ref": i.meta_prompt_ref,
+                }
+                for i in self.issues
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "QualityReport":
+        return cls(
+            article_id=data["article_id"],
+            title=data["title"],
+            url=data["url"],
+            score=data["score"],
+            metrics=data.get("metrics", {}),
+            issues=[
+                Issue(
+                    severity=Severity[i["severity"]],
+                    category=i["category"],
+                    message=i["message"],
+                    suggestion=i.get("suggestion", ""),
+                    meta_prompt_ref=i.get("meta_prompt_ref", ""),
+                )
+                for i in data.get("issues", [])
+            ],
+        )
+
 
 class MetaPromptQualityAgent:
     """Agent kiểm tra chất lượng theo đúng META-PROMPT standards"""
@@ -223,13 +277,11 @@ class MetaPromptQualityAgent:
         """Remove HTML tags"""
         if not html:
             return ""
-        text = re.sub(r"<[^>]+>", " ", html)
-        return re.sub(r"\s+", " ", text).strip()
+        return parse_html(html).text
 
     def count_words(self, html: str) -> int:
         """Count words in HTML content"""
-        text = self.strip_html(html)
-        return len(text.split())
+        return parse_html(html or "").word_count
 
     # ==========================================
     # WORD COUNT CHECK (1800-2200)
@@ -408,8 +460,8 @@ class MetaPromptQualityAgent:
     def check_structure(self, html: str) -> List[Issue]:
         issues = []
 
-        h2_matches = re.findall(r'<h2[^>]*id="([^"]*)"[^>]*>', html, re.IGNORECASE)
-        h2_count = len(re.findall(r"<h2[^>]*>", html, re.IGNORECASE))
+        doc = parse_html(html)
+        h2_count = doc.count("h2")
 
         if h2_count < self.std.MIN_H2_COUNT:
             issues.append(
@@ -441,8 +493,8 @@ class MetaPromptQualityAgent:
                 )
             )
 
-        all_ids = re.findall(r'id="([^"]+)"', html)
-        duplicate_ids = [id for id in all_ids if all_ids.count(id) > 1]
+        id_counts = Counter(doc.ids)
+        duplicate_ids = [id for id, count in id_counts.items() if count > 1]
 
         if duplicate_ids:
             issues.append(
@@ -783,8 +835,32 @@ class MetaPromptQualityAgent:
     # MAIN AUDIT
     # ==========================================
 
-    def audit_article(self, article: dict) -> QualityReport:
-        """Audit toàn diện theo META-PROMPT standards"""
+    def audit_article(self, article: dict, use_cache: bool = True) -> QualityReport:
+        """Audit toàn diện theo META-PROMPT standards (cached theo content hash)"""
+        cache = get_audit_cache() if use_cache else None
+        if cache is not None:
+            cached = cache.get(
+                AUDIT_CACHE_NAMESPACE,
+                article,
+                AUDIT_RULES_HASH,
+                fields=AUDIT_CACHE_FIELDS,
+            )
+            if cached is not None:
+                return QualityReport.from_dict(cached)
+
+        report = self._run_audit(article)
+        if cache is not None:
+            cache.put(
+                AUDIT_CACHE_NAMESPACE,
+                article,
+                AUDIT_RULES_HASH,
+                report.to_dict(),
+                fields=AUDIT_CACHE_FIELDS,
+            )
+        return report
+
+    def _run_audit(self, article: dict) -> QualityReport:
+        """Chạy toàn bộ checks (không dùng cache)"""
 
         report = QualityReport(
             article_id=article["id"],
@@ -793,21 +869,18 @@ class MetaPromptQualityAgent:
         )
 
         html = article.get("body_html", "")
+        doc = parse_html(html)
 
         report.metrics = {
-            "word_count": self.count_words(html),
-            "h2_count": len(re.findall(r"<h2[^>]*>", html, re.IGNORECASE)),
+            "word_count": doc.word_count,
+            "h2_count": doc.count("h2"),
             "links_count": len(
                 re.findall(r'<a\s+href="https?://', html, re.IGNORECASE)
             ),
-            "blockquotes": len(re.findall(r"<blockquote", html, re.IGNORECASE)),
-            "inline_images": len(re.findall(r"<img\b[^>]*>", html, re.IGNORECASE)),
-            "inline_images_missing_alt": len(
-                [
-                    tag
-                    for tag in re.findall(r"<img\b[^>]*>", html, re.IGNORECASE)
-                    if not re.search(r"\balt=\"[^\"]*\S[^\"]*\"", tag, re.IGNORECASE)
-                ]
+            "blockquotes": doc.count("blockquote"),
+            "inline_images": len(doc.images),
+            "inline_images_missing_alt": sum(
+                1 for img in doc.images if not img["alt"].strip()
             ),
         }
 
@@ -939,16 +1012,7 @@ class MetaPromptQualityAgent:
                     "score": r.score,
                     "passed": r.passed,
                     "metrics": r.metrics,
-                    "issues": [
-                        {
-                            "severity": i.severity.name,
-                            "category": i.category,
-                            "message": i.message,
-                            "suggestion": i.suggestion,
-                            "meta_prompt_ref": i.meta_prompt_ref,
-                        }
-                        for i in r.issues
-                    ],
+                    "issues": r.to_dict()["issues"],
                 }
                 for r in reports
             ],
@@ -973,8 +1037,13 @@ def main():
     parser.add_argument(
         "--export", "-e", action="store_true", help="Export report JSON"
     )
+    parser.add_argument(
+        "--no-cache", action="store_true", help="Re-audit even unchanged articles"
+    )
 
     args = parser.parse_args()
+    if args.no_cache:
+        os.environ["AUDIT_CACHE_DISABLED"] = "1"
 
     print("🤖 META-PROMPT QUALITY AGENT")
     print("=" * 70)
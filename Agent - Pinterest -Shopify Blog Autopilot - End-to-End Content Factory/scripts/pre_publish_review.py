@@ -4,6 +4,10 @@ PRE-PUBLISH REVIEW CHECKLIST
 Run this BEFORE publishing any article to ensure META-PROMPT compliance.
 
 This script must pass ALL checks before any content goes live.
+
+Importable without side effects: review_article() also accepts an
+already-fetched article dict, so the orchestrator and restore_from_backups
+review in-process instead of spawning this script per article.
 """
 
 import json
@@ -17,59 +21,12 @@ import requests
 ROOT_DIR = Path(__file__).parent.parent
 CONFIG_PATH = ROOT_DIR / "SHOPIFY_PUBLISH_CONFIG.json"
 
-STOPWORDS = {
-    "a",
-    "an",
-    "and",
-    "are",
-    "as",
-    "at",
-    "be",
-    "by",
-    "for",
-    "from",
-    "has",
-    "have",
-    "how",
-    "in",
-    "is",
-    "it",
-    "of",
-    "on",
-    "or",
-    "that",
-    "the",
-    "this",
-    "to",
-    "was",
-    "what",
-    "when",
-    "where",
-    "which",
-    "why",
-    "with",
-    "your",
-    "you",
-    "we",
-    "our",
-    "their",
-    "they",
-    "them",
-    "these",
-    "those",
-    "into",
-    "over",
-    "under",
-    "about",
-    "without",
-    "within",
-    "between",
-    "across",
-    "guide",
-    "tips",
-    "best",
-    "easy",
-}
+sys.path.append(str(ROOT_DIR / "pipeline_v2"))
+import article_rules
+from article_rules import RuleSet, parse_html
+from audit_cache import get_audit_cache, rules_hash
+from http_pool import get_session
+from topic_profile import get_topic_profile
 
 
 def load_config() -> dict:
@@ -96,10 +53,7 @@ API_VERSION = os.environ.get(
     "SHOPIFY_API_VERSION", shop_config.get("api_version", "2025-01")
 )
 
-if not SHOP or not TOKEN or not BLOG_ID:
-    raise SystemExit(
-        "Missing Shopify config. Set SHOPIFY_STORE_DOMAIN, SHOPIFY_ACCESS_TOKEN, and SHOPIFY_BLOG_ID."
-    )
+CONFIG_ERROR = "Missing Shopify config. Set SHOPIFY_STORE_DOMAIN, SHOPIFY_ACCESS_TOKEN, and SHOPIFY_BLOG_ID."
 
 HEADERS = {"X-Shopify-Access-Token": TOKEN, "Content-Type": "application/json"}
 
@@ -274,6 +228,33 @@ META_PROMPT_CHECKS = {
 YEAR_PATTERN = re.compile(r"\b(19|20)\d{2}\b")
 KEBAB_PATTERN = re.compile(r"^[a-z0-9]+(?:-[a-z0-9]+)*$")
 
+# AUDIT CACHE - skip re-review when article content and rules are unchanged.
+# Review also reads SEO fields and probes image URLs, so those fields are part
+# of the content hash and cached verdicts expire to re-check broken images.
+REVIEW_CACHE_NAMESPACE = "pre_publish_review"
+REVIEW_CACHE_FIELDS = (
+    "title",
+    "body_html",
+    "summary_html",
+    "image",
+    "meta_description",
+    "author",
+    "tags",
+    "handle",
+    "published_at",
+)
+REVIEW_CACHE_MAX_AGE_HOURS = float(
+    os.environ.get("PRE_PUBLISH_CACHE_MAX_AGE_HOURS", "168")
+)
+REVIEW_RULES_HASH = rules_hash(Path(__file__), article_rules.__file__)
+
+# Content rules shared with QualityGate (article_rules.py), matched on visible text
+REVIEW_RULES = RuleSet(
+    generic=("phrases", {"phrases": [p.lower() for p in GENERIC_PHRASES]}),
+    title_spam=("title_spam", {"field": "text", "fragment_min_len": 2}),
+    heading_ids=("heading_ids", {}),
+)
+
 
 def validate_image_url(url: str, timeout: int = 10) -> tuple:
     """
@@ -284,7 +265,7 @@ def validate_image_url(url: str, timeout: int = 10) -> tuple:
         return False, "NO_URL"
     try:
         # Use GET request (Pexels and most CDNs work with GET)
-        resp = requests.get(url, timeout=timeout, stream=True)
+        resp = get_session().get(url, timeout=timeout, stream=True)
         resp.close()  # Don't download entire image
         return resp.status_code == 200, resp.status_code
     except requests.Timeout:
@@ -295,23 +276,62 @@ def validate_image_url(url: str, timeout: int = 10) -> tuple:
         return False, str(e)[:30]
 
 
-def review_article(article_id):
-    """Comprehensive review of a single article"""
-    url = f"https://{SHOP}/admin/api/{API_VERSION}/blogs/{BLOG_ID}/articles/{article_id}.json"
-    resp = requests.get(url, headers=HEADERS)
+def review_article(article, use_cache=True, session=None):
+    """Comprehensive review of a single article.
+
+    ``article`` is an article ID, or an already-fetched Shopify article dict
+    (no GET). The article is looked up in the shared audit cache first; the
+    checks only run when its content or the review rules changed.
+    """
+    if isinstance(article, dict):
+        article_id = article.get("id")
+    else:
+        article_id = article
+        if not SHOP or not TOKEN or not BLOG_ID:
+            raise RuntimeError(CONFIG_ERROR)
+        url = f"https://{SHOP}/admin/api/{API_VERSION}/blogs/{BLOG_ID}/articles/{article_id}.json"
+        resp = (session or get_session()).get(url, headers=HEADERS, timeout=30)
+
+        if resp.status_code != 200:
+            return {"passed": False, "errors": ["Failed to fetch article"]}
+
+        article = resp.json()["article"]
+
+    cache = get_audit_cache() if use_cache else None
+    if cache is not None:
+        cached = cache.get(
+            REVIEW_CACHE_NAMESPACE,
+            article,
+            REVIEW_RULES_HASH,
+            fields=REVIEW_CACHE_FIELDS,
+            max_age_hours=REVIEW_CACHE_MAX_AGE_HOURS,
+        )
+        if cached is not None:
+            cached["from_cache"] = True
+            return cached
+
+    result = _run_review_checks(article_id, article)
+    if cache is not None:
+        cache.put(
+            REVIEW_CACHE_NAMESPACE,
+            article,
+            REVIEW_RULES_HASH,
+            result,
+            fields=REVIEW_CACHE_FIELDS,
+        )
+    return result
 
-    if resp.status_code != 200:
-        return {"passed": False, "errors": ["Failed to fetch article"]}
 
-    article = resp.json()["article"]
+def _run_review_checks(article_id, article):
+    """Run every pre-publish check on an already-fetched article (no cache)"""
     body = article.get("body_html", "")
     title = article.get("title", "Unknown")
 
-    # Extract visible text (strip HTML tags) for content quality checks
-    # This prevents false positives from matching inside alt=, href=, style=, id= attributes
-    visible_text = re.sub(r"<[^>]+>", " ", body)
-    visible_text = re.sub(r"\s+", " ", visible_text).strip()
-    visible_text_lower = visible_text.lower()
+    # One shared parse: visible text (no alt=, href=, style=, id= attributes or
+    # <style> CSS), element counts, images and headings for every check below
+    doc = parse_html(body)
+    visible_text = doc.text
+    rule_results = REVIEW_RULES.evaluate(body, title=title)
 
     errors = []
     warnings = []
@@ -359,7 +379,7 @@ def review_article(article_id):
                 empty_fields.append(field)
 
     # 1. Word count check (use visible text, not raw HTML)
-    word_count = len(visible_text.split())
+    word_count = doc.word_count
     if word_count < REQUIREMENTS["min_words"]:
         errors.append(f"❌ WORDS: {word_count} < {REQUIREMENTS['min_words']} minimum")
     elif word_count > REQUIREMENTS["max_words"]:
@@ -387,25 +407,23 @@ def review_article(article_id):
                 all_image_urls.append(("MAIN", main_src))
 
     # 3. Inline images check
-    img_tags = re.findall(r"<img[^>]+>", body, re.IGNORECASE)
+    img_tags = doc.images
     if len(img_tags) < REQUIREMENTS["inline_images_min"]:
         warnings.append(
             f"⚠️ INLINE IMAGES: {len(img_tags)} < {REQUIREMENTS['inline_images_min']} recommended"
         )
 
     # Check inline image alt texts
-    for i, tag in enumerate(img_tags, 1):
-        alt_match = re.search(r'alt=["\']([^"\']*)["\']', tag)
+    for i, img in enumerate(img_tags, 1):
         if REQUIREMENTS["inline_image_alt_required"]:
-            if not alt_match or not alt_match.group(1).strip():
+            if not img["alt"].strip():
                 errors.append(f"❌ INLINE IMAGE {i} ALT: Missing alt text")
 
         # Check if src exists
-        src_match = re.search(r'src=["\']([^"\']+)["\']', tag)
-        if not src_match:
+        if not img["src"]:
             errors.append(f"❌ INLINE IMAGE {i} SRC: Missing src URL")
         else:
-            all_image_urls.append((f"INLINE_{i}", src_match.group(1)))
+            all_image_urls.append((f"INLINE_{i}", img["src"]))
 
     # 3.4. PINTEREST IMAGE (optional by default; can require via env)
     has_pinterest_image = "i.pinimg.com" in body
@@ -436,21 +454,21 @@ def review_article(article_id):
         )
 
     # 4. Figure tags check (proper image formatting)
-    figure_count = body.count("<figure")
+    figure_count = doc.count("figure")
     if figure_count < REQUIREMENTS["min_figures"]:
         warnings.append(
             f"⚠️ FIGURES: {figure_count} < {REQUIREMENTS['min_figures']} recommended (use <figure> tags)"
         )
 
     # 5. Blockquotes check (expert quotes)
-    blockquote_count = body.count("<blockquote")
+    blockquote_count = doc.count("blockquote")
     if blockquote_count < REQUIREMENTS["min_blockquotes"]:
         warnings.append(
             f"⚠️ BLOCKQUOTES: {blockquote_count} < {REQUIREMENTS['min_blockquotes']} recommended (expert quotes)"
         )
 
     # 6. Tables check
-    table_count = body.count("<table")
+    table_count = doc.count("table")
     if table_count < REQUIREMENTS["min_tables"]:
         warnings.append(
             f"⚠️ TABLES: {table_count} < {REQUIREMENTS['min_tables']} recommended"
@@ -504,8 +522,8 @@ def review_article(article_id):
         )
 
     # 8. Heading structure check (H2, H3)
-    h2_count = len(re.findall(r"<h2[^>]*>", body, re.IGNORECASE))
-    h3_count = len(re.findall(r"<h3[^>]*>", body, re.IGNORECASE))
+    h2_count = doc.count("h2")
+    h3_count = doc.count("h3")
     total_headings = h2_count + h3_count
     if total_headings < SEO_REQUIREMENTS["min_headings"]:
         warnings.append(
@@ -513,9 +531,7 @@ def review_article(article_id):
         )
 
     # 9. Lists check (ul/ol for scanability)
-    ul_count = body.count("<ul")
-    ol_count = body.count("<ol")
-    total_lists = ul_count + ol_count
+    total_lists = doc.count("ul", "ol")
     if total_lists < SEO_REQUIREMENTS["min_lists"]:
         warnings.append(
             f"⚠️ LISTS: {total_lists} < {SEO_REQUIREMENTS['min_lists']} (add bullet/numbered lists)"
@@ -535,7 +551,7 @@ def review_article(article_id):
     # ========== QUALITY CHECKS ==========
     # 11. Empty paragraphs check
     if QUALITY_CHECKS["check_empty_paragraphs"]:
-        empty_p = len(re.findall(r"<p[^>]*>\s*</p>", body, re.IGNORECASE))
+        empty_p = sum(1 for p in doc.paragraphs if p["empty"])
         if empty_p > 0:
             warnings.append(
                 f"⚠️ EMPTY PARAGRAPHS: {empty_p} found (remove or add content)"
@@ -543,7 +559,7 @@ def review_article(article_id):
 
     # 12. Duplicate images check
     if QUALITY_CHECKS["check_duplicate_images"]:
-        img_srcs = re.findall(r'<img[^>]+src=["\']([^"\']+)["\']', body, re.IGNORECASE)
+        img_srcs = [img["src"] for img in doc.images if img["src"]]
         unique_srcs = set(img_srcs)
         if len(img_srcs) != len(unique_srcs):
             warnings.append(
@@ -587,10 +603,9 @@ def review_article(article_id):
 
     # 15. Intro paragraph quality check
     if QUALITY_CHECKS["check_intro_paragraph"]:
-        first_p = re.search(r"<p[^>]*>(.+?)</p>", body, re.IGNORECASE | re.DOTALL)
+        first_p = doc.paragraphs[0] if doc.paragraphs else None
         if first_p:
-            intro_text = re.sub(r"<[^>]+>", "", first_p.group(1))
-            intro_words = len(intro_text.split())
+            intro_words = len(first_p["text"].split())
             if intro_words < 20:
                 warnings.append(
                     f"⚠️ INTRO PARAGRAPH: Only {intro_words} words (should be 20+ for engagement)"
@@ -598,10 +613,7 @@ def review_article(article_id):
 
     # 15b. GENERIC CONTENT CHECK - detect AI slop phrases (use visible text to avoid matching in HTML attributes)
     if QUALITY_CHECKS.get("check_generic_content", True):
-        found_generic = []
-        for phrase in GENERIC_PHRASES:
-            if phrase.lower() in visible_text_lower:
-                found_generic.append(phrase)
+        found_generic = rule_results["generic"]["found"]
         if len(found_generic) >= 6:
             errors.append(
                 f"❌ GENERIC CONTENT: Found {len(found_generic)} generic phrase(s): {', '.join(found_generic[:5])}"
@@ -658,44 +670,22 @@ def review_article(article_id):
     # 15d. TITLE SPAM CHECK - detect title repeated excessively in body (AI slop)
     # Use visible text to avoid counting title inside alt=, figcaption, href= etc.
     if QUALITY_CHECKS.get("check_title_spam", True):
-        title_lower = title.lower().strip()
-
-        # Check full title repetition in visible text only
-        title_count = visible_text_lower.count(title_lower)
-        if title_count > 3:
+        # Counted on visible text only; fragments keep short stopwords
+        # ("in", "to") for accurate substring matching
+        spam = rule_results["title_spam"]
+        if spam["title_count"] > 3:
             errors.append(
-                f"❌ TITLE SPAM: Title repeated {title_count}x in body (max 3 allowed)"
+                f"❌ TITLE SPAM: Title repeated {spam['title_count']}x in body (max 3 allowed)"
             )
-
-        # Check title fragments (first 4-5 words) - AI slop often repeats these
-        # Keep stopwords for better substring matching
-        title_words_raw = [w for w in title_lower.split() if len(w) > 1]
-        title_words = [w for w in title_lower.split() if len(w) > 2]
-        if len(title_words_raw) >= 4:
-            # Check first 4 words as a phrase (keep stopwords for accurate matching)
-            first_fragment = " ".join(title_words_raw[:4])
-            fragment_count = visible_text_lower.count(first_fragment)
+        for fragment, fragment_count in spam["fragments"].items():
             if fragment_count > 5:
                 errors.append(
-                    f"❌ TITLE FRAGMENT SPAM: '{first_fragment}' repeated {fragment_count}x (max 5)"
-                )
-
-            # Check last 4 words as a phrase (often repeated in AI content)
-            if len(title_words_raw) >= 8:
-                last_fragment = " ".join(title_words_raw[-4:])
-                last_count = visible_text_lower.count(last_fragment)
-                if last_count > 5:
-                    errors.append(
-                        f"❌ TITLE FRAGMENT SPAM: '{last_fragment}' repeated {last_count}x (max 5)"
-                    )
-
-        # Check for keyword stuffing pattern: "word1, word2, word3" from title
-        if len(title_words) >= 3:
-            keyword_stuff_pattern = ", ".join(title_words[:3])
-            if keyword_stuff_pattern in visible_text_lower:
-                errors.append(
-                    f"❌ KEYWORD STUFFING: Title words appear comma-separated in body"
+                    f"❌ TITLE FRAGMENT SPAM: '{fragment}' repeated {fragment_count}x (max 5)"
                 )
+        if spam["keyword_stuffing"]:
+            errors.append(
+                f"❌ KEYWORD STUFFING: Title words appear comma-separated in body"
+            )
 
     # 16. Image relevance check (basic keyword matching)
     title_words = set(title.lower().split())
@@ -725,10 +715,9 @@ def review_article(article_id):
     if main_image and main_image.get("alt"):
         all_alts.append(main_image.get("alt").lower())
 
-    for tag in img_tags:
-        alt_match = re.search(r'alt=["\']([^"\']*)["\']', tag)
-        if alt_match:
-            all_alts.append(alt_match.group(1).lower())
+    for img in img_tags:
+        if img["has_alt"]:
+            all_alts.append(img["alt"].lower())
 
     topic_mentioned = False
     for alt in all_alts:
@@ -743,18 +732,11 @@ def review_article(article_id):
         )
 
     # 16b. Topic focus score (heuristic)
-    title_words_clean = [
-        w for w in re.findall(r"[a-zA-Z]{3,}", title.lower()) if w not in STOPWORDS
-    ]
-    topic_keywords = list(dict.fromkeys(title_words_clean))[:8]
+    topic_keywords = list(get_topic_profile(title).keywords)
     if topic_keywords:
-        paragraphs = re.findall(r"<p[^>]*>(.+?)</p>", body, re.IGNORECASE | re.DOTALL)
-        first_para = re.sub(r"<[^>]+>", "", paragraphs[0]) if paragraphs else ""
-        last_two = (
-            " ".join(re.sub(r"<[^>]+>", "", p) for p in paragraphs[-2:])
-            if len(paragraphs) >= 2
-            else ""
-        )
+        paragraphs = [p["text"] for p in doc.paragraphs if p["text"]]
+        first_para = paragraphs[0] if paragraphs else ""
+        last_two = " ".join(paragraphs[-2:]) if len(paragraphs) >= 2 else ""
         hit_first = sum(1 for k in topic_keywords if k in first_para.lower())
         hit_last = sum(1 for k in topic_keywords if k in last_two.lower())
         coverage = (hit_first + hit_last) / max(1, len(topic_keywords))
@@ -856,11 +838,8 @@ def review_article(article_id):
 
     # 19. Expert quotes check - ≥2 with real name/title/org
     if META_PROMPT_CHECKS["min_expert_quotes"] > 0:
-        blockquotes = re.findall(
-            r"<blockquote[^>]*>(.*?)</blockquote>", body, re.IGNORECASE | re.DOTALL
-        )
         valid_quotes = 0
-        for bq in blockquotes:
+        for bq in doc.blockquotes:
             # Check for pattern: "Quote" — Name, Title, Org  OR  <cite>— Dr. Name
             # Pattern matches: "— Dr. Name", "— Name Title", "— First Last"
             # Only em-dash and en-dash (not plain hyphen, which matches bullet lists)
@@ -891,14 +870,10 @@ def review_article(article_id):
 
     # 21. Kebab-case IDs on H2/H3 check
     if META_PROMPT_CHECKS["require_kebab_ids"]:
-        headings_with_id = re.findall(
-            r'<h[23][^>]*id=["\']([^"\']+)["\']', body, re.IGNORECASE
-        )
-        headings_without_id = len(
-            re.findall(r"<h[23](?![^>]*id=)[^>]*>", body, re.IGNORECASE)
-        )
-
-        invalid_ids = [h for h in headings_with_id if not KEBAB_PATTERN.match(h)]
+        heading_ids = rule_results["heading_ids"]
+        headings_with_id = heading_ids["ids"]
+        headings_without_id = len(heading_ids["missing"])
+        invalid_ids = heading_ids["not_kebab"]
 
         if headings_without_id > 0:
             warnings.append(
@@ -935,10 +910,9 @@ def review_article(article_id):
 
     # 24. Direct Answer opening check (50-70 words in first paragraph)
     if META_PROMPT_CHECKS["require_direct_answer"]:
-        first_p = re.search(r"<p[^>]*>(.+?)</p>", body, re.IGNORECASE | re.DOTALL)
+        first_p = doc.paragraphs[0] if doc.paragraphs else None
         if first_p:
-            intro_text = re.sub(r"<[^>]+>", "", first_p.group(1))
-            intro_words = len(intro_text.split())
+            intro_words = len(first_p["text"].split())
             if intro_words < 30:
                 warnings.append(
                     f"⚠️ DIRECT ANSWER: Opening paragraph only {intro_words} words (aim for 50-70)"
@@ -1092,6 +1066,11 @@ def review_article(article_id):
     }
 
 
+def review_messages(result) -> str:
+    """Errors then warnings, one per line (what the CLI prints for them)."""
+    return "\n".join(result.get("errors", []) + result.get("warnings", []))
+
+
 def print_review(result):
     """Print formatted review result"""
     status = "✅ PASS" if result["passed"] else "❌ FAIL"
@@ -1100,6 +1079,8 @@ def print_review(result):
     print(f"ARTICLE: {result['title'][:50]}")
     print(f"ID: {result['article_id']}")
     print(f"STATUS: {status}")
+    if result.get("from_cache"):
+        print("(cached review - article unchanged since last pass)")
     print(f"{'='*70}")
 
     print(f"\nCONTENT METRICS:")
@@ -1224,6 +1205,9 @@ def review_all(article_ids):
 
 
 if __name__ == "__main__":
+    if not SHOP or not TOKEN or not BLOG_ID:
+        raise SystemExit(CONFIG_ERROR)
+
     # Default: review the 10 new articles
     ARTICLE_IDS = [
         690513117502,
@@ -1238,9 +1222,14 @@ if __name__ == "__main__":
         690513412414,
     ]
 
+    # --no-cache forces every check to re-run
+    if "--no-cache" in sys.argv:
+        os.environ["AUDIT_CACHE_DISABLED"] = "1"
+    cli_ids = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+
     # Allow passing specific article IDs
-    if len(sys.argv) > 1:
-        ARTICLE_IDS = [int(aid) for aid in sys.argv[1:]]
+    if cli_ids:
+        ARTICLE_IDS = [int(aid) for aid in cli_ids]
 
     success = review_all(ARTICLE_IDS)
     sys.exit(0 if success else 1)
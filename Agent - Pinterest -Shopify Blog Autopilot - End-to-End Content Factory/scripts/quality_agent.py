@@ -9,13 +9,18 @@ Chạy: python quality_agent.py [--fix] [--article-id ID]
 import requests
 import os
 import re
+import sys
 import json
 import argparse
 from datetime import datetime
+from pathlib import Path
 from typing import Dict, List, Tuple, Optional
 from dataclasses import dataclass, field
 from enum import Enum
 
+sys.path.append(str(Path(__file__).parent.parent / "pipeline_v2"))
+from article_rules import parse_html
+
 # ========== SHOPIFY CONFIG ==========
 SHOP = os.getenv("SHOPIFY_SHOP", "the-rike-inc.myshopify.com")
 TOKEN = os.getenv("SHOPIFY_ACCESS_TOKEN", "")
@@ -345,8 +350,11 @@ class QualityAgent:
         if not html:
             return [Issue(Severity.CRITICAL, "Structure", "Không có nội dung")]
 
+        # One shared parse for every structure count below
+        doc = parse_html(html)
+
         # Count H2 headings
-        h2_count = len(re.findall(r"<h2[^>]*>", html, re.IGNORECASE))
+        h2_count = doc.count("h2")
 
         if h2_count == 0:
             issues.append(
@@ -371,10 +379,8 @@ class QualityAgent:
                 Issue(Severity.PASS, "Structure", f"Có {h2_count} H2 headings")
             )
 
-        # Count words (strip HTML)
-        text = re.sub(r"<[^>]+>", " ", html)
-        text = re.sub(r"\s+", " ", text).strip()
-        word_count = len(text.split())
+        # Count words (visible text only)
+        word_count = doc.word_count
 
         if word_count < QualityStandard.MIN_WORD_COUNT:
             issues.append(
@@ -389,7 +395,7 @@ class QualityAgent:
             issues.append(Issue(Severity.PASS, "Structure", f"Có {word_count} words"))
 
         # Check for lists (actionable content)
-        has_lists = bool(re.search(r"<[uo]l[^>]*>", html, re.IGNORECASE))
+        has_lists = doc.count("ul", "ol") > 0
         if not has_lists:
             issues.append(
                 Issue(
@@ -401,7 +407,7 @@ class QualityAgent:
             )
 
         # Check paragraphs
-        p_count = len(re.findall(r"<p[^>]*>", html, re.IGNORECASE))
+        p_count = doc.count("p")
         if p_count < QualityStandard.MIN_PARAGRAPHS:
             issues.append(
                 Issue(
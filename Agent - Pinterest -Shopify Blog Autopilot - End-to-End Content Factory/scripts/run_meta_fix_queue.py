@@ -31,6 +31,10 @@ SOURCE_BANK_PATHS = [
     ROOT_DIR / "SOURCE_BANK.json",
 ]
 
+sys.path.append(str(ROOT_DIR / "pipeline_v2"))
+from section_doc import Section, SectionDoc
+from topic_profile import get_topic_profile
+
 
 def load_env(paths: list[Path]) -> None:
     for path in paths:
@@ -173,40 +177,15 @@ def ensure_direct_answer(html: str, title: str) -> str:
     return f"<p>{paragraph}</p>\n" + html
 
 
-def ensure_key_terms_section(html: str, title: str) -> str:
+def ensure_key_terms_section(doc: SectionDoc, title: str) -> None:
     """Add Key Terms section if missing, with topic-specific definitions."""
-    if re.search(r"id=[\"']key-terms[\"']", html, re.IGNORECASE):
-        return html
-    if re.search(r"<h2[^>]*>\s*Key Terms\s*</h2>", html, re.IGNORECASE):
-        return html
+    if doc.findall(r"id=[\"']key-terms[\"']"):
+        return
+    if doc.find(r"^Key Terms$"):
+        return
 
-    # Extract meaningful words from title
-    stopwords = {
-        "the",
-        "a",
-        "an",
-        "and",
-        "or",
-        "for",
-        "to",
-        "of",
-        "in",
-        "on",
-        "with",
-        "how",
-        "make",
-        "making",
-        "diy",
-        "guide",
-        "tips",
-        "easy",
-        "best",
-        "home",
-    }
-    words = [
-        w for w in re.split(r"\W+", title.lower()) if len(w) > 3 and w not in stopwords
-    ]
-    terms = list(dict.fromkeys(words))[:6] or [
+    # Same topic terms the orchestrator's Key Terms section uses
+    terms = list(get_topic_profile(title).terms)[:6] or [
         "Technique",
         "Process",
         "Method",
@@ -221,8 +200,7 @@ def ensure_key_terms_section(html: str, title: str) -> str:
         items.append(f"<li><strong>{term_display}</strong> — {definition}</li>")
 
     items_html = "\n".join(items)
-    section = f'<h2 id="key-terms">Key Terms</h2>\n<ul>\n{items_html}\n</ul>'
-    return html + "\n" + section
+    doc.append(f'<h2 id="key-terms">Key Terms</h2>\n<ul>\n{items_html}\n</ul>')
 
 
 def ensure_external_link_rels(html: str) -> str:
@@ -250,17 +228,15 @@ def ensure_external_link_rels(html: str) -> str:
     )
 
 
-def ensure_sources_section(html: str) -> tuple[str, bool]:
-    if re.search(
-        r"<h2[^>]*>\s*Sources\s*(?:&amp;|&)\s*Further\s*Reading\s*</h2>",
-        html,
-        re.IGNORECASE,
-    ):
-        return html, False
-    section = (
+def ensure_sources_section(doc: SectionDoc) -> tuple[Section, bool]:
+    pattern = r"^Sources\s*(?:&amp;|&)\s*Further\s*Reading$"
+    section = doc.find(pattern)
+    if section is not None:
+        return section, False
+    doc.append(
         '<h2 id="sources-further-reading">Sources &amp; Further Reading</h2>\n<ul></ul>'
     )
-    return html + "\n" + section, True
+    return doc.find(pattern), True
 
 
 def _normalize_source_text(name: str, description: str, topic: str) -> str:
@@ -296,8 +272,8 @@ def fix_source_link_dashes(html: str) -> str:
     )
 
 
-def inject_sources(html: str, sources: list[dict[str, Any]], title: str) -> str:
-    html, _ = ensure_sources_section(html)
+def inject_sources(doc: SectionDoc, sources: list[dict[str, Any]], title: str) -> None:
+    section, _ = ensure_sources_section(doc)
     items = []
     topic = re.sub(r"[^a-zA-Z0-9\s-]", "", title).strip() or "the topic"
     for s in sources[:8]:
@@ -311,18 +287,20 @@ def inject_sources(html: str, sources: list[dict[str, Any]], title: str) -> str:
             f'<li><a href="{url}" target="_blank" rel="nofollow noopener">{link_text}</a></li>'
         )
     if not items:
-        return html
-    return re.sub(
-        r"(<h2[^>]*>\s*Sources\s*(?:&amp;|&)\s*Further\s*Reading\s*</h2>\s*<ul>)(.*?)</ul>",
+        return
+    content = re.sub(
+        r"^(\s*<ul>)(.*?)</ul>",
         lambda m: m.group(1) + "\n" + "\n".join(items) + "\n</ul>",
-        html,
+        section.content,
+        count=1,
         flags=re.IGNORECASE | re.DOTALL,
     )
+    doc.replace_content(section, content)
 
 
-def inject_stats(html: str, stats: list[dict[str, Any]], title: str) -> str:
+def inject_stats(doc: SectionDoc, stats: list[dict[str, Any]], title: str) -> None:
     if not stats:
-        return html
+        return
     block = ['<h2 id="evidence-notes">Evidence Notes</h2>', "<ul>"]
     for s in stats[:3]:
         stat = s.get("stat") or s.get("text") or ""
@@ -336,12 +314,12 @@ def inject_stats(html: str, stats: list[dict[str, Any]], title: str) -> str:
         )
         block.append(f"<li>{stat}{cite}</li>")
     block.append("</ul>")
-    return html + "\n" + "\n".join(block)
+    doc.append("\n".join(block))
 
 
-def inject_quotes(html: str, quotes: list[dict[str, Any]]) -> str:
+def inject_quotes(doc: SectionDoc, quotes: list[dict[str, Any]]) -> None:
     if not quotes:
-        return html
+        return
     blocks = ['<h2 id="quoted-guidance">Quoted Guidance</h2>']
     for q in quotes[:2]:
         quote = q.get("quote") or ""
@@ -363,7 +341,7 @@ def inject_quotes(html: str, quotes: list[dict[str, Any]]) -> str:
         blocks.append(
             f"<blockquote><p>“{quote}”</p><footer>{footer}{source}</footer></blockquote>"
         )
-    return html + "\n" + "\n".join(blocks)
+    doc.append("\n".join(blocks))
 
 
 def _fallback_sources(title: str) -> list[dict[str, str]]:
@@ -486,20 +464,23 @@ def process_one() -> dict[str, Any] | None:
             stats_list = []
             quotes_list = []
 
+        # Section injections edit one parsed document, serialized once
+        doc = SectionDoc.parse(body_html)
         if "Citations" in missing_categories:
             if not sources_list:
                 sources_list = _fallback_sources(title)
-            body_html = inject_sources(body_html, sources_list, title)
+            inject_sources(doc, sources_list, title)
         if "Statistics" in missing_categories:
             if not stats_list:
                 stats_list = _fallback_stats(title)
-            body_html = inject_stats(body_html, stats_list, title)
+            inject_stats(doc, stats_list, title)
         if "Expert Quotes" in missing_categories:
             if not quotes_list:
                 quotes_list = _fallback_quotes(title)
-            body_html = inject_quotes(body_html, quotes_list)
+            inject_quotes(doc, quotes_list)
+        ensure_key_terms_section(doc, title)
+        body_html = doc.to_html()
 
-        body_html = ensure_key_terms_section(body_html, title)
         body_html = ensure_heading_ids(body_html)
         body_html = ensure_external_link_rels(body_html)
 
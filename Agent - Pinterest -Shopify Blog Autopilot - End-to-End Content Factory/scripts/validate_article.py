@@ -20,11 +20,12 @@ import json
 import re
 import sys
 from pathlib import Path
-from bs4 import BeautifulSoup
+
+sys.path.append(str(Path(__file__).parent.parent / "pipeline_v2"))
+from article_rules import ArticleDocument, RULES, parse_html
 
 # Regex patterns
 YEAR_RE = re.compile(r"\b(19|20)\d{2}\b")
-KEBAB_RE = re.compile(r"^[a-z0-9]+(?:-[a-z0-9]+)*$")
 STAT_MARKER_RE = re.compile(r"\[EVID:STAT_\d+\]")
 QUOTE_MARKER_RE = re.compile(r"\[EVID:QUOTE_\d+\]")
 
@@ -51,9 +52,7 @@ def load_config():
 
 def word_count_from_html(html: str) -> int:
     """Extract word count from HTML content."""
-    soup = BeautifulSoup(html, "html.parser")
-    text = soup.get_text(" ", strip=True)
-    return len([w for w in re.split(r"\s+", text) if w])
+    return parse_html(html or "").word_count
 
 
 def fail(errors: list, msg: str):
@@ -112,64 +111,42 @@ def validate_schema_not_in_html(body_html: str, errors: list):
         fail(errors, "Schema JSON-LD appears inside body_html (not allowed)")
 
 
-def validate_headings(soup: BeautifulSoup, errors: list) -> list:
+def validate_headings(doc: ArticleDocument, errors: list) -> list:
     """Validate all H2/H3 have unique kebab-case ids."""
-    ids = []
-    for tag in soup.find_all(["h2", "h3"]):
-        heading_id = tag.get("id")
-        heading_text = tag.get_text(strip=True)[:60]
-
-        if not heading_id:
-            fail(errors, f"Missing id on heading: {heading_text}")
-        else:
-            if not KEBAB_RE.match(heading_id):
-                fail(errors, f"Heading id not kebab-case: {heading_id}")
-            ids.append(heading_id)
-
-    if len(ids) != len(set(ids)):
+    result = RULES["heading_ids"].check(doc)
+    for heading_text in result["missing"]:
+        fail(errors, f"Missing id on heading: {heading_text}")
+    for heading_id in result["not_kebab"]:
+        fail(errors, f"Heading id not kebab-case: {heading_id}")
+    if result["duplicate"]:
         fail(errors, "Duplicate heading ids found")
 
-    return ids
+    return result["ids"]
 
 
-def validate_links(soup: BeautifulSoup, errors: list):
+def validate_links(doc: ArticleDocument, errors: list):
     """Validate all outbound links are absolute HTTPS with proper rel attributes."""
-    for a in soup.find_all("a"):
-        href = (a.get("href") or "").strip()
-
-        # Skip internal anchors
-        if href.startswith("#"):
-            continue
-
-        if not href.startswith("https://"):
-            fail(errors, f"Non-HTTPS or non-absolute link: {href}")
-
-        rel = a.get("rel") or []
-        rel_set = (
-            {r.lower() for r in rel}
-            if isinstance(rel, list)
-            else set(str(rel).lower().split())
-        )
-
-        if "nofollow" not in rel_set or "noopener" not in rel_set:
-            fail(errors, f"Link missing rel nofollow+noopener: {href}")
+    result = RULES["link_attributes"].check(doc)
+    for href in result["non_https"]:
+        fail(errors, f"Non-HTTPS or non-absolute link: {href}")
+    for href in result["missing_rel"]:
+        fail(errors, f"Link missing rel nofollow+noopener: {href}")
 
 
 def validate_sources_section(
-    soup: BeautifulSoup, min_citations: int, errors: list
+    doc: ArticleDocument, min_citations: int, errors: list
 ) -> int:
     """Validate sources section has minimum required citations."""
-    sources_h2 = soup.find(id="sources")
-    if not sources_h2:
+    section = doc.section_index(lambda h: h["id"] == "sources")
+    if section < 0:
         fail(errors, 'Missing <h2 id="sources"> section')
         return 0
 
-    sources_links = 0
-    for sib in sources_h2.find_all_next():
-        if sib.name == "h2" and sib.get("id") != "sources":
-            break
-        if sib.name == "a" and (sib.get("href") or "").startswith("https://"):
-            sources_links += 1
+    sources_links = sum(
+        1
+        for link in doc.links_in_section(section)
+        if link["href"].startswith("https://")
+    )
 
     if sources_links < min_citations:
         fail(errors, f"Need >={min_citations} sources links, found {sources_links}")
@@ -177,9 +154,9 @@ def validate_sources_section(
     return sources_links
 
 
-def validate_quotes(soup: BeautifulSoup, min_quotes: int, errors: list) -> int:
+def validate_quotes(doc: ArticleDocument, min_quotes: int, errors: list) -> int:
     """Validate minimum number of blockquote elements for expert quotes."""
-    quotes_count = len(soup.find_all("blockquote"))
+    quotes_count = doc.count("blockquote")
     if quotes_count < min_quotes:
         fail(
             errors,
@@ -196,23 +173,16 @@ def validate_stats_markers(body_html: str, min_stats: int, errors: list) -> int:
     return stats_count
 
 
-def validate_images(soup: BeautifulSoup, errors: list) -> int:
+def validate_images(doc: ArticleDocument, errors: list) -> int:
     """Validate all images have alt text and HTTPS src."""
-    images = soup.find_all("img")
-    image_count = 0
-
-    for img in images:
-        src = img.get("src", "")
-        alt = img.get("alt", "")
-
+    for img in doc.images:
+        src = img["src"]
         if not src.startswith("https://"):
             fail(errors, f"Image src not HTTPS: {src[:50]}")
-        if not alt or alt.strip() == "":
+        if not img["alt"].strip():
             fail(errors, f"Image missing alt text: {src[:50]}")
 
-        image_count += 1
-
-    return image_count
+    return len(doc.images)
 
 
 def validate_word_count(body_html: str, config: dict, errors: list) -> int:
@@ -287,22 +257,22 @@ def main(payload_path: str):
 
     validate_schema_not_in_html(body_html, errors)
 
-    soup = BeautifulSoup(body_html, "html.parser")
+    doc = parse_html(body_html)
 
-    validate_headings(soup, errors)
-    validate_links(soup, errors)
+    validate_headings(doc, errors)
+    validate_links(doc, errors)
 
     sources_links = validate_sources_section(
-        soup, content_config.get("min_citations", 5), errors
+        doc, content_config.get("min_citations", 5), errors
     )
 
-    quotes_count = validate_quotes(soup, content_config.get("min_quotes", 2), errors)
+    quotes_count = validate_quotes(doc, content_config.get("min_quotes", 2), errors)
 
     stats_count = validate_stats_markers(
         body_html, content_config.get("min_stats", 3), errors
     )
 
-    image_count = validate_images(soup, errors)
+    image_count = validate_images(doc, errors)
     word_count = validate_word_count(body_html, config, errors)
 
     validate_evidence_ledger(payload, errors)